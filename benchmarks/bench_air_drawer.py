@@ -0,0 +1,96 @@
+# benchmarks/bench_air_drawer.py
+"""
+Per-frame cost of AirDrawer: compositing and panning, against the previous full-frame implementation.
+Allocations are measured with tracemalloc, see benchmarks.run.allocated_per_call.
+
+    python -m benchmarks.bench_air_drawer
+"""
+import itertools
+import math
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.run import allocated_per_call
+from modules.draw_utils import AirDrawer
+
+
+WIDTH, HEIGHT = 1280, 720
+FRAMES = 200
+
+
+class LegacyAirDrawer:
+    """The pre-optimization implementation: full-frame masks and warpAffine on every MOVE."""
+
+    def __init__(self, width, height):
+        self.canvas = np.zeros((height, width, 3), np.uint8)
+        self.last_point = None
+
+    def draw(self, frame, x, y, mode):
+        if mode == "DRAW":
+            if self.last_point is None:
+                self.last_point = (x, y)
+            cv2.line(self.canvas, self.last_point, (x, y), (0, 0, 255), 5)
+            self.last_point = (x, y)
+        elif mode == "ERASE":
+            cv2.circle(self.canvas, (x, y), 40, (0, 0, 0), -1)
+            self.last_point = None
+        elif mode == "MOVE":
+            if self.last_point is None:
+                self.last_point = (x, y)
+            dx = x - self.last_point[0]
+            dy = y - self.last_point[1]
+            M = np.float32([[1, 0, dx], [0, 1, dy]])
+            self.canvas = cv2.warpAffine(self.canvas, M, (self.canvas.shape[1], self.canvas.shape[0]))
+            self.last_point = (x, y)
+        else:
+            self.last_point = None
+        return frame
+
+    def overlay_on_frame(self, frame):
+        mask = self.canvas.astype(bool)
+        frame[mask] = cv2.addWeighted(frame, 0.6, self.canvas, 0.8, 0)[mask]
+        return frame
+
+
+def sketch(drawer, frame):
+    """A 300-point doodle in the middle of the screen."""
+    for i in range(300):
+        t = i / 20
+        drawer.draw(frame, int(640 + 200 * math.cos(t)), int(360 + 120 * math.sin(1.5 * t)), "DRAW")
+    drawer.draw(frame, 0, 0, "NONE")
+
+
+def measure(drawer, frame, mode):
+    """Returns (ms per frame, bytes allocated per frame)."""
+    def step(i):
+        if mode == "MOVE":
+            drawer.draw(frame, 640 + int(20 * math.sin(i / 10)), 360, "MOVE")
+        drawer.overlay_on_frame(frame)
+
+    frames = itertools.count()
+    allocated = allocated_per_call(lambda: step(next(frames)))
+    t0 = time.perf_counter()
+    for i in range(FRAMES):
+        step(i)
+    elapsed = (time.perf_counter() - t0) / FRAMES
+    return elapsed * 1000, allocated
+
+
+def main():
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 255, (HEIGHT, WIDTH, 3), dtype=np.uint8)
+
+    print(f"{'implementation':<16} {'mode':<8} {'ms/frame':>9} {'alloc KiB/frame':>16}")
+    for name, cls in (("legacy", LegacyAirDrawer), ("current", AirDrawer)):
+        for mode in ("OVERLAY", "MOVE"):
+            drawer = cls(WIDTH, HEIGHT)
+            frame = background.copy()
+            sketch(drawer, frame)
+            ms, alloc = measure(drawer, frame, mode)
+            print(f"{name:<16} {mode:<8} {ms:>9.2f} {alloc / 1024:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/bench_inference_service.py
+"""
+What sharing detectors between streams costs: a detector that serves several streams runs in
+static image mode, i.e. palm detection on every frame, where a detector of its own tracks the
+hands from the previous frame. Needs MediaPipe and a clip with hands in it (synthetic frames
+have none, so both modes would run palm detection on every frame):
+
+    python -m benchmarks.bench_inference_service hands.mp4 [--frames 300] [--scale 0.5]
+
+Prints the model time per frame of each mode, and the frames per second that a pool of
+shared detectors has to spare for comparison with one tracking detector per stream.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from modules.frame_source import open_source
+from modules.hand_detector import HandDetector
+
+
+def load_frames(spec, count):
+    source = open_source(spec)
+    frames = []
+    try:
+        while len(frames) < count:
+            success, frame = source.read()
+            if not success:
+                break
+            frames.append(frame.copy())
+    finally:
+        source.release()
+    return frames
+
+
+def measure(frames, static_image_mode, scale):
+    """Returns (per-frame model times in ms, frames with hands found)."""
+    detector = HandDetector(inference_scale=scale, static_image_mode=static_image_mode)
+    detector.warmup(background=False)
+    times, found = [], 0
+    for frame in frames:
+        t0 = time.perf_counter()
+        detector.find_hands(frame, draw=False)
+        times.append((time.perf_counter() - t0) * 1000)
+        found += len(detector.handedness) > 0
+    return np.array(times), found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("source", help="video file, image directory or camera index")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--scale", type=float, default=1.0, help="inference scale of both detectors")
+    args = parser.parse_args()
+
+    frames = load_frames(args.source, args.frames)
+    print(f"{len(frames)} frames from {args.source}, inference scale {args.scale}")
+    print(f"{'mode':<22} {'p50 ms':>8} {'p95 ms':>8} {'FPS':>7} {'hands found':>12}")
+    means = {}
+    for name, static in (("tracking (dedicated)", False), ("static (shared)", True)):
+        times, found = measure(frames, static, args.scale)
+        means[static] = times.mean()
+        p50, p95 = np.percentile(times, (50, 95))
+        print(f"{name:<22} {p50:>8.2f} {p95:>8.2f} {1000 / times.mean():>7.1f} {found:>6}/{len(frames)}")
+    print(f"Sharing costs {means[True] / means[False]:.2f}x model time per frame: a pool of P shared "
+          f"detectors serves as many frames as {means[False] / means[True]:.2f} * P tracking ones.")
+
+
+if __name__ == "__main__":
+    main()
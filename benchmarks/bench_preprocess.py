@@ -0,0 +1,52 @@
+# benchmarks/bench_preprocess.py
+"""
+Per-frame cost of preparing a camera frame for display and hand detection: the previous
+flip + cvtColor copies against FramePreprocessor's reused buffers.
+Allocations are measured with tracemalloc, see benchmarks.run.allocated_per_call.
+
+    python -m benchmarks.bench_preprocess
+"""
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.run import allocated_per_call
+from modules.preprocess import FramePreprocessor
+
+
+FRAMES = 200
+RESOLUTIONS = ((1280, 720), (1920, 1080))
+
+
+def legacy(frame):
+    """main.py flipped the frame, then HandDetector converted the flipped copy to RGB."""
+    display = cv2.flip(frame, 1)
+    rgb = cv2.cvtColor(display, cv2.COLOR_BGR2RGB)
+    return display, rgb
+
+
+def measure(step, frame):
+    """Returns (ms per frame, bytes allocated per frame)."""
+    allocated = allocated_per_call(lambda: step(frame))
+    t0 = time.perf_counter()
+    for _ in range(FRAMES):
+        step(frame)
+    elapsed = (time.perf_counter() - t0) / FRAMES
+    return elapsed * 1000, allocated
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'implementation':<22} {'resolution':<11} {'ms/frame':>9} {'alloc KiB/frame':>16}")
+    for w, h in RESOLUTIONS:
+        frame = rng.integers(0, 255, (h, w, 3), dtype=np.uint8)
+        for name, step in (("legacy flip+cvtColor", legacy),
+                           ("preprocessor (rgb)", FramePreprocessor(rgb=True).process),
+                           ("preprocessor (bgr)", FramePreprocessor(rgb=False).process)):
+            ms, alloc = measure(step, frame)
+            print(f"{name:<22} {f'{w}x{h}':<11} {ms:>9.2f} {alloc / 1024:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/bench_scene_store.py
+"""
+Scene persistence: what journaling adds to a drag on the frame loop, how long compaction
+takes on the writer thread, and how fast a saved scene is restored into a ShapeManager
+(memory-mapped snapshot) as the scene grows.
+
+    python -m benchmarks.bench_scene_store
+"""
+import shutil
+import tempfile
+import time
+
+from benchmarks.synthetic import build_scene
+from modules.scene_store import SceneStore
+from modules.shape_utils import ShapeManager
+
+
+SCENE_SIZES = (1000, 10000, 50000)
+MOVES = 20000
+
+
+def drag_us(manager, shape):
+    """Microseconds per move_shape call dragging `shape` back and forth."""
+    pos, dx = (400, 400), 1
+    t0 = time.perf_counter()
+    for _ in range(MOVES):
+        if not 300 < pos[0] < 500:
+            dx = -dx
+        pos = manager.move_shape(shape, pos[0] + dx, pos[1], pos)
+    return (time.perf_counter() - t0) / MOVES * 1e6
+
+
+def main():
+    root = tempfile.mkdtemp(prefix="visiontouch_scene_")
+    try:
+        manager = build_scene(1000)
+        square = next(s for s in manager.shapes if s["type"] == "square")
+        plain = drag_us(manager, square)
+        store = SceneStore(f"{root}/drag")
+        store.attach(manager)
+        journaled = drag_us(manager, square)
+        store.close()
+        print(f"move_shape {plain:.2f} us, journaled {journaled:.2f} us "
+              f"({store.stats()['ops_written']} records for {MOVES} moves after coalescing)")
+
+        print(f"{'shapes':>8} {'points':>10} {'compact ms':>11} {'restore ms':>11}")
+        for n in SCENE_SIZES:
+            path = f"{root}/scene{n}"
+            manager = build_scene(n, stroke_len=100)
+            store = SceneStore(path)
+            store.attach(manager)
+            # Journal the whole scene as if it had been built interactively
+            for shape in manager.shapes:
+                store.record("add", shape)
+            t0 = time.perf_counter()
+            store.close()  # compacts: every shape is in the journal only
+            compact_ms = (time.perf_counter() - t0) * 1000
+            points = sum(len(s["points"]) for s in manager.shapes if s["type"] == "draw")
+
+            t0 = time.perf_counter()
+            restored = ShapeManager(manager.width, manager.height)
+            SceneStore(path).restore(restored)
+            restore_ms = (time.perf_counter() - t0) * 1000
+            assert len(restored.shapes) == n
+            print(f"{n:>8} {points:>10} {compact_ms:>11.1f} {restore_ms:>11.1f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# benchmarks/bench_select_shape.py
+"""
+Hit-testing cost of ShapeManager.select_shape as the scene grows, against the old linear scan.
+
+    python -m benchmarks.bench_select_shape
+"""
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import build_scene, query_points
+
+
+SHAPE_COUNTS = (10, 100, 1000, 10000)
+QUERIES = 2000
+
+
+def linear_select(shapes, px, py):
+    """The pre-index implementation: reverse scan over every shape."""
+    for shape in reversed(shapes):
+        if shape["type"] in ["square", "pentagon", "hexagon"]:
+            if shape["x"] <= px <= shape["x"] + shape["size"] and shape["y"] <= py <= shape["y"] + shape["size"]:
+                return shape
+        elif shape["type"] in ["circle", "triangle", "star"]:
+            cx, cy = shape["x"] + shape["size"] // 2, shape["y"] + shape["size"] // 2
+            if (px - cx)**2 + (py - cy)**2 <= (shape["size"] // 2)**2:
+                return shape
+        elif shape["type"] == "draw":
+            pts = np.array(shape["points"].points)
+            if len(pts) > 0:
+                x_min, y_min = np.min(pts[:, 0]), np.min(pts[:, 1])
+                x_max, y_max = np.max(pts[:, 0]), np.max(pts[:, 1])
+                if x_min <= px <= x_max and y_min <= py <= y_max:
+                    return shape
+    return None
+
+
+def time_queries(fn, points):
+    t0 = time.perf_counter()
+    for px, py in points:
+        fn(px, py)
+    return (time.perf_counter() - t0) / len(points)
+
+
+def main():
+    points = query_points(QUERIES)
+
+    print(f"{'shapes':>8} {'linear us':>12} {'indexed us':>12} {'speedup':>9}")
+    for n in SHAPE_COUNTS:
+        manager = build_scene(n)
+        # Same answer from both implementations
+        for px, py in points[:200]:
+            assert linear_select(manager.shapes, px, py) is manager.select_shape(px, py)
+
+        linear_points = points if n <= 1000 else points[:200]
+        linear = time_queries(lambda px, py: linear_select(manager.shapes, px, py), linear_points)
+        indexed = time_queries(manager.select_shape, points)
+        print(f"{n:>8} {linear * 1e6:>12.1f} {indexed * 1e6:>12.1f} {linear / indexed:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
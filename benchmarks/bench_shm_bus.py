@@ -0,0 +1,82 @@
+# benchmarks/bench_shm_bus.py
+"""
+Cost of the shared-memory hand bus: publish() and read time per frame in one process, and the
+publish-to-read latency seen by subscribers in other processes while frames arrive at camera
+rate (each subscriber spins on the head sequence number, see LandmarkSubscriber.wait).
+
+    python -m benchmarks.bench_shm_bus
+"""
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import HEIGHT, WIDTH, landmark_sequence
+from modules.gestures import GestureEvent
+from modules.hand_features import to_pixels
+from modules.shm_bus import LandmarkPublisher, LandmarkSubscriber
+
+
+NAME = f"visiontouch_bench_{os.getpid()}"
+FRAMES = 20000
+LATENCY_FRAMES = 300
+SUBSCRIBERS = 3
+
+
+def events(t):
+    return [GestureEvent("pinch_move", "left", (640, 360), t),
+            GestureEvent("zoom", None, ((600, 360), (700, 360)), t, 1.2)]
+
+
+def subscriber(name, ready, results):
+    bus = LandmarkSubscriber(name)
+    ready.set()
+    latencies = []
+    while len(latencies) < LATENCY_FRAMES:
+        for frame in bus.wait(timeout=2.0, interval=0):
+            latencies.append(time.perf_counter() - frame.timestamp)
+    results.put((latencies, bus.missed))
+    bus.close()
+
+
+def main():
+    seq, handedness = landmark_sequence(1)
+    landmarks = to_pixels(seq[0], WIDTH, HEIGHT)
+    with LandmarkPublisher(NAME) as publisher:
+        bus = LandmarkSubscriber(NAME)
+        t0 = time.perf_counter()
+        for i in range(FRAMES):
+            publisher.publish(landmarks, handedness, events(i), True, WIDTH, HEIGHT)
+        publish_us = (time.perf_counter() - t0) / FRAMES * 1e6
+
+        t0 = time.perf_counter()
+        for _ in range(FRAMES):
+            bus.latest()
+        read_us = (time.perf_counter() - t0) / FRAMES * 1e6
+        bus.close()
+        print(f"publish {publish_us:.1f} us/frame, read {read_us:.1f} us/frame "
+              f"({publisher.dtype.itemsize} bytes per frame)")
+
+        ctx = multiprocessing.get_context("spawn")
+        results = ctx.Queue()
+        readies = [ctx.Event() for _ in range(SUBSCRIBERS)]
+        procs = [ctx.Process(target=subscriber, args=(NAME, ready, results)) for ready in readies]
+        for p in procs:
+            p.start()
+        for ready in readies:
+            ready.wait()
+        for i in range(LATENCY_FRAMES + 10):
+            publisher.publish(landmarks, handedness, events(i), True, WIDTH, HEIGHT)
+            time.sleep(1 / 60)
+        for _ in procs:
+            latencies, missed = results.get()
+            us = np.array(latencies) * 1e6
+            print(f"subscriber latency p50 {np.percentile(us, 50):.0f} us, p99 {np.percentile(us, 99):.0f} us, "
+                  f"missed {missed}")
+        for p in procs:
+            p.join()
+
+
+if __name__ == "__main__":
+    main()
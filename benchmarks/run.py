@@ -0,0 +1,400 @@
+# benchmarks/run.py
+"""
+Benchmark suite for the gesture and shape subsystems. Needs no camera, window or model:
+everything is driven by the synthetic generators in benchmarks/synthetic.py.
+
+    python -m benchmarks.run                           # run all, save benchmarks/results/<git rev>.json
+    python -m benchmarks.run -k select_shape           # only matching benchmarks
+    python -m benchmarks.run --compare benchmarks/results/abc123.json --threshold 0.15
+
+With --compare the run fails (exit code 1) when any benchmark's median is more than
+`threshold` slower than in the baseline file.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from benchmarks import synthetic
+from modules.draw_utils import AirDrawer
+from modules.gestures import GestureEvent
+from modules.hand_features import fingers_up, pinch_state, results_to_arrays, to_pixels, to_positions
+from modules.preprocess import FramePreprocessor
+from modules.scene_store import SceneStore
+from modules.shape_utils import ShapeManager
+from modules.shm_bus import LandmarkPublisher, LandmarkSubscriber
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+# (name, setup); setup() returns the zero-argument callable that is timed, or a
+# (callable, cleanup) pair when the benchmark holds resources that must be released
+BENCHMARKS = []
+
+
+def benchmark(name, params=(None,)):
+    """Register setup(param) once per parameter value as "name[param]"."""
+    def register(setup):
+        for param in params:
+            full_name = name if param is None else f"{name}[{param}]"
+            BENCHMARKS.append((full_name, lambda p=param: setup(p) if p is not None else setup()))
+        return setup
+    return register
+
+
+# ------------------------------------------------------------
+# Hand landmarks
+# ------------------------------------------------------------
+
+@benchmark("results_to_arrays", params=(1, 2))
+def _results_to_arrays(n_hands):
+    seq, handedness = synthetic.landmark_sequence(1, n_hands)
+    results = synthetic.mediapipe_results(seq[0], handedness)
+    return lambda: results_to_arrays(results)
+
+
+@benchmark("find_positions", params=(2,))
+def _find_positions(n_hands):
+    # What HandDetector.find_positions does after find_hands: scale to pixels, build the dicts
+    seq, handedness = synthetic.landmark_sequence(1, n_hands)
+    return lambda: to_positions(to_pixels(seq[0], synthetic.WIDTH, synthetic.HEIGHT), handedness)
+
+
+@benchmark("pinch_state", params=(2,))
+def _pinch_state(n_hands):
+    seq, _ = synthetic.landmark_sequence(1, n_hands)
+    px = to_pixels(seq[0], synthetic.WIDTH, synthetic.HEIGHT)
+    return lambda: pinch_state(px)
+
+
+@benchmark("fingers_up", params=(2,))
+def _fingers_up(n_hands):
+    seq, handedness = synthetic.landmark_sequence(1, n_hands)
+    px = to_pixels(seq[0], synthetic.WIDTH, synthetic.HEIGHT)
+    return lambda: fingers_up(px, handedness)
+
+
+# ------------------------------------------------------------
+# ShapeManager
+# ------------------------------------------------------------
+
+@benchmark("select_shape", params=(10, 100, 1000, 10000))
+def _select_shape(n_shapes):
+    manager = synthetic.build_scene(n_shapes)
+    points = synthetic.query_points(256)
+    state = {"i": 0}
+
+    def step():
+        state["i"] = (state["i"] + 1) % len(points)
+        manager.select_shape(*points[state["i"]])
+    return step
+
+
+@benchmark("move_shape.square", params=(1000,))
+def _move_square(n_shapes):
+    manager = synthetic.build_scene(n_shapes, types=("square",))
+    shape = manager.shapes[0]
+    state = {"pos": (400, 400), "dx": 1}
+
+    def step():
+        x, y = state["pos"]
+        if not 300 < x < 500:
+            state["dx"] = -state["dx"]
+        state["pos"] = manager.move_shape(shape, x + state["dx"], y, state["pos"])
+    return step
+
+
+@benchmark("move_shape.stroke", params=(100, 10000))
+def _move_stroke(stroke_len):
+    manager = synthetic.build_scene(0)
+    shape = manager.add_stroke(synthetic.stroke_points(stroke_len, 300, 300))
+    state = {"pos": (400, 400), "dx": 1}
+
+    def step():
+        x, y = state["pos"]
+        if not 300 < x < 500:
+            state["dx"] = -state["dx"]
+        state["pos"] = manager.move_shape(shape, x + state["dx"], y, state["pos"])
+    return step
+
+
+@benchmark("draw_shapes", params=(10, 100, 1000))
+def _draw_shapes(n_shapes):
+    manager = synthetic.build_scene(n_shapes, types=synthetic.SHAPE_TYPES[:-1])
+    frame = synthetic.frame()
+    return lambda: manager.draw_shapes(frame, manager.shapes)
+
+
+@benchmark("draw_shape.stroke", params=(100, 1000, 10000))
+def _draw_stroke(stroke_len):
+    manager = synthetic.build_scene(0)
+    shape = manager.add_stroke(synthetic.stroke_points(stroke_len, 300, 300))
+    frame = synthetic.frame()
+    return lambda: manager.draw_shape(frame, shape)
+
+
+@benchmark("draw_ui.idle", params=(10, 100, 1000))
+def _draw_ui_idle(n_shapes):
+    manager = synthetic.build_scene(n_shapes)
+    background = synthetic.frame()
+    frame = background.copy()
+    manager.draw_ui(frame)
+    return lambda: manager.draw_ui(frame)
+
+
+@benchmark("draw_ui.drag", params=(10, 100, 1000))
+def _draw_ui_drag(n_shapes):
+    manager = synthetic.build_scene(n_shapes, types=synthetic.SHAPE_TYPES[:-1])
+    frame = synthetic.frame()
+    manager.selected_left = manager.shapes[-1]
+    manager.draw_ui(frame)
+    state = {"pos": (400, 400), "dx": 2}
+
+    def step():
+        x, y = state["pos"]
+        if not 300 < x < 500:
+            state["dx"] = -state["dx"]
+        state["pos"] = manager.move_shape(manager.selected_left, x + state["dx"], y, state["pos"])
+        manager.draw_ui(frame)
+    return step
+
+
+@benchmark("draw_ui.add", params=(100, 1000))
+def _draw_ui_add(n_shapes):
+    # A new shape every frame: the dirty-rectangle path
+    manager = synthetic.build_scene(n_shapes, types=synthetic.SHAPE_TYPES[:-1])
+    frame = synthetic.frame()
+    manager.draw_ui(frame)
+
+    def step():
+        manager.add_shape("circle")
+        manager.draw_ui(frame)
+    return step
+
+
+# ------------------------------------------------------------
+# AirDrawer
+# ------------------------------------------------------------
+
+@benchmark("overlay_on_frame", params=(300,))
+def _overlay(n_points):
+    drawer = AirDrawer(synthetic.WIDTH, synthetic.HEIGHT)
+    frame = synthetic.frame()
+    for x, y in synthetic.sketch_path(n_points):
+        drawer.draw(frame, x, y, "DRAW")
+    return lambda: drawer.overlay_on_frame(frame)
+
+
+# ------------------------------------------------------------
+# Frame preparation
+# ------------------------------------------------------------
+
+@benchmark("preprocess", params=("rgb", "bgr"))
+def _preprocess(model_input):
+    preprocessor = FramePreprocessor(rgb=model_input == "rgb")
+    frame = synthetic.frame()
+    return lambda: preprocessor.process(frame)
+
+
+# ------------------------------------------------------------
+# Shared-memory hand bus
+# ------------------------------------------------------------
+
+def _bus_frame():
+    seq, handedness = synthetic.landmark_sequence(1)
+    landmarks = to_pixels(seq[0], synthetic.WIDTH, synthetic.HEIGHT)
+    events = [GestureEvent("pinch_move", "left", (640, 360), 0.0),
+              GestureEvent("zoom", None, ((600, 360), (700, 360)), 0.0, 1.2)]
+    return landmarks, handedness, events
+
+
+@benchmark("shm_bus.publish")
+def _bus_publish():
+    publisher = LandmarkPublisher(f"visiontouch_bench_{os.getpid()}")
+    landmarks, handedness, events = _bus_frame()
+    return (lambda: publisher.publish(landmarks, handedness, events, True, synthetic.WIDTH, synthetic.HEIGHT),
+            publisher.close)
+
+
+@benchmark("shm_bus.read")
+def _bus_read():
+    publisher = LandmarkPublisher(f"visiontouch_bench_{os.getpid()}")
+    publisher.publish(*_bus_frame(), True, synthetic.WIDTH, synthetic.HEIGHT)
+    subscriber = LandmarkSubscriber(publisher.name)
+
+    def close():
+        subscriber.close()
+        publisher.close()
+    return subscriber.latest, close
+
+
+# ------------------------------------------------------------
+# Scene persistence
+# ------------------------------------------------------------
+
+@benchmark("scene_store.move", params=(1000,))
+def _journaled_move(n_shapes):
+    root = tempfile.mkdtemp(prefix="visiontouch_bench_")
+    manager = synthetic.build_scene(n_shapes, types=("square",))
+    store = SceneStore(root)
+    store.attach(manager)
+    shape = manager.shapes[0]
+    state = {"pos": (400, 400), "dx": 1}
+
+    def step():
+        x, y = state["pos"]
+        if not 300 < x < 500:
+            state["dx"] = -state["dx"]
+        state["pos"] = manager.move_shape(shape, x + state["dx"], y, state["pos"])
+
+    def close():
+        store.close()
+        shutil.rmtree(root, ignore_errors=True)
+    return step, close
+
+
+@benchmark("scene_store.restore", params=(1000, 10000))
+def _restore(n_shapes):
+    root = tempfile.mkdtemp(prefix="visiontouch_bench_")
+    manager = synthetic.build_scene(n_shapes, stroke_len=100)
+    store = SceneStore(root)
+    store.attach(manager)
+    for shape in manager.shapes:
+        store.record("add", shape)
+    store.close()
+
+    def step():
+        SceneStore(root).restore(ShapeManager(synthetic.WIDTH, synthetic.HEIGHT))
+    return step, lambda: shutil.rmtree(root, ignore_errors=True)
+
+
+# ------------------------------------------------------------
+# Runner
+# ------------------------------------------------------------
+
+def time_benchmark(step, min_time=0.2, rounds=5):
+    """Median and best seconds per call over `rounds` rounds of an auto-calibrated call count."""
+    step()  # warm-up
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            step()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time / rounds or number >= 1 << 20:
+            break
+        number *= 2
+
+    per_call = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            step()
+        per_call.append((time.perf_counter() - t0) / number)
+    return {"median_us": statistics.median(per_call) * 1e6, "min_us": min(per_call) * 1e6,
+            "calls": number * rounds}
+
+
+def allocated_per_call(step, calls=20):
+    """Mean bytes allocated per call, temporaries included (NumPy and OpenCV arrays are traced)."""
+    step()  # warm-up
+    tracemalloc.start()
+    total = 0
+    for _ in range(calls):
+        start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        step()
+        # Peak traced memory above the starting point counts every temporary, even if freed again
+        total += tracemalloc.get_traced_memory()[1] - start
+    tracemalloc.stop()
+    return total / calls
+
+
+def git_label():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(__file__), check=True)
+        return rev.stdout.strip() or "local"
+    except (OSError, subprocess.CalledProcessError):
+        return "local"
+
+
+def compare(results, baseline, threshold):
+    """Print the ratio against the baseline; return the names that regressed."""
+    regressions = []
+    print(f"\n{'benchmark':<28} {'baseline us':>12} {'now us':>10} {'ratio':>7}")
+    for name, now in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        ratio = now["median_us"] / before["median_us"] if before["median_us"] else float("inf")
+        flag = "  REGRESSION" if ratio > 1 + threshold else ""
+        print(f"{name:<28} {before['median_us']:>12.2f} {now['median_us']:>10.2f} {ratio:>6.2f}x{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="VisionTouch benchmark suite")
+    parser.add_argument("-k", "--filter", help="only run benchmarks whose name contains this")
+    parser.add_argument("--label", help="name of this run (default: current git revision)")
+    parser.add_argument("--out", help="results file (default: benchmarks/results/<label>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed slowdown before a benchmark counts as regressed (default 0.15)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds spent timing each benchmark")
+    args = parser.parse_args(argv)
+
+    label = args.label or git_label()
+    results = {}
+    print(f"{'benchmark':<28} {'median us':>12} {'min us':>10} {'calls':>8}")
+    for name, setup in BENCHMARKS:
+        if args.filter and args.filter not in name:
+            continue
+        step, cleanup = setup(), None
+        if isinstance(step, tuple):
+            step, cleanup = step
+        try:
+            res = time_benchmark(step, min_time=args.min_time)
+        finally:
+            if cleanup is not None:
+                cleanup()
+        results[name] = res
+        print(f"{name:<28} {res['median_us']:>12.2f} {res['min_us']:>10.2f} {res['calls']:>8}")
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{label}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump({
+            "label": label,
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "machine": platform.machine(),
+            "results": results,
+        }, f, indent=2)
+    print(f"\nSaved {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+# benchmarks/synthetic.py
+"""Deterministic synthetic inputs for the benchmarks: hand landmarks, MediaPipe-like results, frames and scenes."""
+import math
+import random
+from types import SimpleNamespace
+
+import numpy as np
+
+from modules.hand_features import LABELS, NUM_LANDMARKS
+from modules.shape_utils import ShapeManager
+
+
+WIDTH, HEIGHT = 1280, 720
+SHAPE_TYPES = ("square", "circle", "triangle", "star", "pentagon", "hexagon", "draw")
+
+
+def landmark_sequence(n_frames, n_hands=2, seed=0):
+    """
+    Normalized (n_frames, n_hands, 21, 3) landmarks of hands drifting across the frame,
+    with handedness codes (n_hands,). Every 20 frames the index tip touches the thumb (pinch).
+    """
+    rng = np.random.default_rng(seed)
+    base = rng.normal(0, 0.04, (n_hands, NUM_LANDMARKS, 3)).astype(np.float32)
+    base[..., 2] *= 0.1
+    t = np.arange(n_frames, dtype=np.float32)[:, None]
+    centers = np.stack([
+        0.5 + 0.3 * np.cos(t / 40 + np.arange(n_hands)),
+        0.5 + 0.2 * np.sin(t / 25 + np.arange(n_hands)),
+    ], axis=-1)  # (n_frames, n_hands, 2)
+    seq = np.repeat(base[None], n_frames, axis=0)
+    seq[..., :2] += centers[:, :, None, :]
+    pinching = (np.arange(n_frames) // 20) % 2 == 1
+    seq[pinching, :, 8, :] = seq[pinching, :, 4, :] + 0.005
+    handedness = (np.arange(n_hands) % 2).astype(np.int8)
+    return seq, handedness
+
+
+def mediapipe_results(landmarks, handedness):
+    """Object with the attributes of a MediaPipe Hands result, for the result conversion code."""
+    return SimpleNamespace(
+        multi_hand_landmarks=[
+            SimpleNamespace(landmark=[SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in hand])
+            for hand in landmarks.tolist()
+        ],
+        multi_handedness=[
+            SimpleNamespace(classification=[SimpleNamespace(label=LABELS[code])]) for code in handedness.tolist()
+        ],
+    )
+
+
+def frame(seed=0):
+    return np.random.default_rng(seed).integers(0, 255, (HEIGHT, WIDTH, 3), dtype=np.uint8)
+
+
+def stroke_points(length, x=0, y=0):
+    t = np.arange(length)
+    return np.stack([x + 100 + 80 * np.cos(t / 20), y + 100 + 80 * np.sin(t / 30)], axis=1).astype(np.int32)
+
+
+def build_scene(n_shapes, stroke_len=200, seed=0, types=SHAPE_TYPES):
+    """ShapeManager with n_shapes random shapes; strokes are added unsimplified with stroke_len points."""
+    random.seed(seed)
+    manager = ShapeManager(WIDTH, HEIGHT)
+    for _ in range(n_shapes):
+        shape_type = random.choice(types)
+        if shape_type == "draw":
+            x, y = random.randint(0, WIDTH - 200), random.randint(0, HEIGHT - 200)
+            manager.add_stroke(stroke_points(stroke_len, x, y), (255, 255, 255))
+        else:
+            manager.add_shape(shape_type)
+    return manager
+
+
+def query_points(n, seed=1):
+    rng = random.Random(seed)
+    return [(rng.randint(0, WIDTH - 1), rng.randint(0, HEIGHT - 1)) for _ in range(n)]
+
+
+def sketch_path(n_points, cx=WIDTH // 2, cy=HEIGHT // 2):
+    return [(int(cx + 200 * math.cos(i / 20)), int(cy + 120 * math.sin(1.5 * i / 20))) for i in range(n_points)]
@@ -1,178 +1,276 @@
+import time
+T_START = time.perf_counter()  # time to first frame is measured from here
+
 import os
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
 
-import cv2
-import math
-import time
-from modules.hand_detector import HandDetector
-from modules.shape_utils import ShapeManager
-
+import argparse
+import sys
+import traceback
+# OpenCV, MediaPipe and the app modules are imported where they are used, after argument
+# parsing, so --help is instant and only the subsystems a run needs get loaded
 
-def is_pinch(hand):
-    x1, y1 = hand["landmarks"][8][1], hand["landmarks"][8][2]
-    x2, y2 = hand["landmarks"][4][1], hand["landmarks"][4][2]
-    dist = math.hypot(x2 - x1, y2 - y1)
-    return dist < 40, (int((x1 + x2) // 2), int((y1 + y2) // 2))
 
+WINDOW_NAME = "VisionTouch - Shape Sandbox"
 
-def distance(p1, p2):
-    return math.hypot(p2[0] - p1[0], p2[1] - p1[1])
 
+def cleanup(step, what):
+    """Run one shutdown step; a failure is reported so that the remaining steps still run."""
+    try:
+        step()
+    except Exception:
+        print(f"Error while {what}:", file=sys.stderr)
+        traceback.print_exc()
 
-def main():
-    cap = cv2.VideoCapture(0)
-    cap.set(3, 1280)
-    cap.set(4, 720)
 
-    detector = HandDetector(detection_conf=0.7, track_conf=0.7)
-    shapes = ShapeManager(1280, 720)
+def publish(publisher, img, sandbox, landmarks, handedness, measured):
+    from modules.hand_features import mirror_handedness
 
-    window_name = "VisionTouch - Shape Sandbox"
-    cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
-    cv2.setWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+    # Handedness as the user sees it, matching the hands of the gesture events
+    h, w = img.shape[:2]
+    publisher.publish(landmarks, mirror_handedness(handedness), sandbox.events, measured, w, h)
 
-    pinch_cooldown = 0
-    draw_cooldown_start = None
-    draw_cooldown_duration = 3  # seconds
 
-    # Zoom state
-    zoom_active = False
-    zoom_start_dist = None
-    zoom_shape = None
-    original_size = None
+def run_sequential(source, detector, sandbox, sink, profiler, max_frames=None, hud=False, governor=None,
+                   publisher=None):
+    from modules.preprocess import FramePreprocessor
 
+    preprocessor = FramePreprocessor.for_detector(detector)
+    frames = 0
+    t_start = time.perf_counter()
     while True:
-        success, frame = cap.read()
+        profiler.start_frame()
+        with profiler.stage("read"):
+            success, frame = source.read()
         if not success:
             break
 
-        frame = cv2.flip(frame, 1)
-        img = detector.find_hands(frame, draw=False)
-        hands = detector.find_positions(img, draw=False)
-
-        # Fix mirroring issue
-        for h in hands:
-            h["label"] = "Right" if h["label"] == "Left" else "Left"
-
-        current_time = time.time()
-
-        # Handle draw cooldown countdown
-        if draw_cooldown_start:
-            elapsed = current_time - draw_cooldown_start
-            if elapsed < draw_cooldown_duration:
-                remaining = int(draw_cooldown_duration - elapsed + 1)
-                cv2.putText(img, f"🖊️ Drawing starts in {remaining}s", (420, 360),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 3)
-            else:
-                # Start drawing after cooldown completes
-                shapes.drawing = True
-                shapes.current_draw = {"type": "draw", "points": [], "color": shapes._random_color()}
-                draw_cooldown_start = None
-
-        # Detect left and right hand
-        left_hand = next((h for h in hands if h["label"] == "Left"), None)
-        right_hand = next((h for h in hands if h["label"] == "Right"), None)
-
-        # Detect pinch for each hand
-        left_pinch, left_center = is_pinch(left_hand) if left_hand else (False, None)
-        right_pinch, right_center = is_pinch(right_hand) if right_hand else (False, None)
-
-        # -------------------------
-        # ✅ FIXED ZOOM BEHAVIOUR
-        # -------------------------
-        # Two-hand pinch only triggers zoom if both hands are pinching *the same shape*
-        if left_pinch and right_pinch:
-            shape_left = shapes.selected_left
-            shape_right = shapes.selected_right
-
-            if shape_left is not None and shape_left is shape_right:
-                # Zoom on the same shape
-                cv2.line(img, left_center, right_center, (255, 255, 0), 3)
-                dist_now = distance(left_center, right_center)
-
-                if not zoom_active:
-                    zoom_active = True
-                    zoom_start_dist = dist_now
-                    zoom_shape = shape_left
-                    if zoom_shape:
-                        original_size = zoom_shape["size"]
-                else:
-                    if zoom_shape:
-                        scale = dist_now / zoom_start_dist
-                        new_size = int(original_size * scale)
-                        zoom_shape["size"] = max(30, min(new_size, 400))  # clamp
-                        cv2.putText(img, f"Zoom: {int(scale * 100)}%", (40, 120),
-                                    cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 3)
-            else:
-                # If both hands are pinching different shapes → move independently
-                zoom_active = False
-                zoom_shape = None
-                zoom_start_dist = None
-        else:
-            zoom_active = False
-            zoom_start_dist = None
-            zoom_shape = None
-            original_size = None
-
-        # --- NORMAL INTERACTIONS --- #
-        for label, hand in [("left", left_hand), ("right", right_hand)]:
-            if not hand:
-                setattr(shapes, f"selected_{label}", None)
-                continue
-
-            pinch, center = is_pinch(hand)
-            if pinch:
-                cv2.circle(img, center, 12, (0, 255, 255), -1)
-
-                # Drawing mode active
-                if shapes.drawing:
-                    shapes.current_draw["points"].append(center)
-                    continue
-
-                # Button click
-                if pinch_cooldown <= 0 and not draw_cooldown_start:
-                    clicked = shapes.check_button_click(*center)
-                    if clicked:
-                        if clicked == "draw":
-                            draw_cooldown_start = time.time()  # start 3s countdown
-                        else:
-                            shapes.add_shape(clicked)
-                        pinch_cooldown = 25
-
-                # Move shapes
-                selected = getattr(shapes, f"selected_{label}")
-                last_pos = getattr(shapes, f"last_{label}_pos")
-                if selected is None:
-                    shape = shapes.select_shape(*center)
-                    if shape:
-                        setattr(shapes, f"selected_{label}", shape)
-                        setattr(shapes, f"last_{label}_pos", center)
-                else:
-                    new_pos = shapes.move_shape(selected, *center, last_pos)
-                    setattr(shapes, f"last_{label}_pos", new_pos)
-                    if shapes.remove_shape_if_in_bin(selected):
-                        setattr(shapes, f"selected_{label}", None)
-            else:
-                # If drawing and pinch released → finish
-                if shapes.drawing:
-                    shapes.finish_draw()
-                setattr(shapes, f"selected_{label}", None)
-                setattr(shapes, f"last_{label}_pos", None)
-
-        pinch_cooldown = max(0, pinch_cooldown - 1)
-
-        img = shapes.draw_ui(img)
-        cv2.putText(img, "Pinch to Add / Move / Draw / Delete | Two-Hand Pinch = Resize", (40, 700),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-
-        cv2.imshow(window_name, img)
-
-        if cv2.waitKey(1) & 0xFF == 27:
+        with profiler.stage("preprocess"):
+            img, model_input = preprocessor.process(frame)
+        with profiler.stage("find_hands"):
+            detector.find_hands(model_input, draw=False)
+        with profiler.stage("landmarks"):
+            landmarks, handedness = detector.find_arrays(img)
+
+        with profiler.stage("gesture"):
+            sandbox.process(img, landmarks, handedness, detector.measured)
+        if publisher is not None:
+            with profiler.stage("publish"):
+                publish(publisher, img, sandbox, landmarks, handedness, detector.measured)
+        with profiler.stage("draw_ui"):
+            img = sandbox.render(img)
+        if hud:
+            profiler.draw_hud(img)
+            if governor is not None:
+                governor.draw_hud(img)
+        frames += 1
+        with profiler.stage("display"):
+            keep_going = sink.show(img)
+        profiler.end_frame()
+        if governor is not None:
+            # Budget the processing, not the wait for the camera's next frame
+            governor.update(profiler.stages["frame"].last - profiler.stages["read"].last)
+        if frames == 1:
+            profiler.mark("first_frame")
+        if not keep_going or (max_frames and frames >= max_frames):
             break
 
-    cap.release()
-    cv2.destroyAllWindows()
+    elapsed = time.perf_counter() - t_start
+    print(f"Sequential: {frames} frames at {frames / elapsed if elapsed > 0 else 0:.1f} FPS")
+    profiler.print_summary()
+
+
+def run_pipelined(source, detector, sandbox, sink, profiler, max_frames=None, hud=False, governor=None,
+                  publisher=None):
+    from modules.pipeline import Pipeline
+    from modules.preprocess import FramePreprocessor
+
+    # Up to five frames are in flight (capturing, queued, inferring, queued, rendering); each
+    # buffer set goes back to the preprocessor once the pipeline releases its frame
+    preprocessor = FramePreprocessor.for_detector(detector, slots=6)
+
+    def capture():
+        success, frame = source.read()
+        return preprocessor.process(frame) if success else None
+
+    def infer(frame):
+        img, model_input = frame
+        detector.find_hands(model_input, draw=False)
+        return (*detector.find_arrays(img), detector.measured)
+
+    def render(frame, hands):
+        img = frame[0]
+        with profiler.stage("gesture"):
+            sandbox.process(img, *hands)
+        if publisher is not None:
+            with profiler.stage("publish"):
+                publish(publisher, img, sandbox, *hands)
+        with profiler.stage("draw_ui"):
+            img = sandbox.render(img)
+        if hud:
+            profiler.draw_hud(img)
+            if governor is not None:
+                governor.draw_hud(img)
+        with profiler.stage("display"):
+            keep_going = sink.show(img)
+        if "first_frame" not in profiler.marks:
+            profiler.mark("first_frame")
+        if governor is not None:
+            # The stages overlap: the slower of inference and rendering sets the frame rate
+            governor.update(max(profiler.stages["inference"].last,
+                                profiler.stages["render"].last if "render" in profiler.stages else 0.0))
+        return keep_going
+
+    pipeline = Pipeline(capture, infer, render, profiler=profiler, release=preprocessor.release)
+    report = pipeline.run(max_frames=max_frames)
+    print(f"Pipelined: {report['frames']} frames at {report['fps']:.1f} FPS")
+    profiler.print_summary()
+    for name, queue in report["queues"].items():
+        print(f"  queue {name:<8} depth mean {queue['depth_mean']:.2f}, max {queue['depth_max']:g}, "
+              f"dropped {queue['dropped']}")
+
+
+def run_host(spec, sessions, inference_pool=0):
+    from modules.session_host import SessionHost
+
+    sources = spec["source"].split(",") if spec["source"] else [None]
+    specs = [{**spec, "source": sources[i % len(sources)]} for i in range(sessions)]
+    host = SessionHost(specs, inference_pool=inference_pool)
+    reports, totals = host.run()
+    SessionHost.print_report(reports, totals)
+    if host.inference_stats:
+        s = host.inference_stats
+        mode = "one per session, tracking" if s["affinity"] else "shared, detecting every frame"
+        print(f"  shared inference: {s['pool_size']} detectors ({mode}), {s['requests']} frames, "
+              f"wait p95 {s['wait_p95_ms']:.2f} ms")
+    return totals["failed"] == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VisionTouch shape sandbox")
+    parser.add_argument("--source",
+                        help="camera index (default 0), video file, image directory or 'synthetic[:N]'")
+    parser.add_argument("--loop", action="store_true", help="loop video files and image directories")
+    parser.add_argument("--headless", action="store_true", help="do not open a window")
+    parser.add_argument("--record", metavar="PATH", help="write the rendered frames to a video file")
+    parser.add_argument("--max-frames", type=int, help="stop after this many frames")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="run capture, inference and rendering on separate threads")
+    parser.add_argument("--record-landmarks", metavar="PATH", help="log detected landmarks to a file")
+    parser.add_argument("--replay-landmarks", metavar="PATH",
+                        help="replay a landmark log instead of running hand detection")
+    parser.add_argument("--inference-scale", type=float, default=1.0,
+                        help="downscale factor of the frame fed to hand detection, e.g. 0.5")
+    parser.add_argument("--roi", action="store_true",
+                        help="only run hand detection around the hands tracked in the previous frame")
+    parser.add_argument("--infer-every", type=int, default=1, metavar="N",
+                        help="run hand detection every N frames and predict landmarks in between")
+    parser.add_argument("--target-fps", type=float,
+                        help="adapt the detection skip rate to hold this frame rate")
+    parser.add_argument("--no-stroke-smoothing", dest="smooth_strokes", action="store_false",
+                        help="keep air-drawn strokes unsmoothed (One Euro smoothing is on by default)")
+    parser.add_argument("--frame-budget", type=float, metavar="MS",
+                        help="step inference resolution, model complexity, hand count and overlay "
+                             "detail down (and back up) to keep frame processing within MS")
+    parser.add_argument("--publish", nargs="?", const="visiontouch_hands", metavar="NAME",
+                        help="publish landmarks and gesture events to other local processes through "
+                             "shared memory NAME (see modules/shm_bus.py)")
+    parser.add_argument("--scene", metavar="DIR",
+                        help="restore the shapes and drawings saved in DIR and keep saving every change there")
+    parser.add_argument("--hud", action="store_true", help="show per-stage frame timings on screen")
+    parser.add_argument("--telemetry-out", metavar="PATH",
+                        help="write per-stage timing percentiles to a .json or .csv file")
+    parser.add_argument("--sessions", type=int, default=1, metavar="N",
+                        help="host N independent headless sessions in a process pool, one per core; "
+                             "--source may list one source per session, comma separated")
+    parser.add_argument("--shared-inference", type=int, default=0, metavar="POOL",
+                        help="with --sessions: run the sessions as threads sharing POOL detectors")
+    args = parser.parse_args()
+    if args.sessions > 1:
+        # Hosted sessions are headless and report through SessionHost only
+        single = [flag for flag, value in (
+            ("--pipeline", args.pipeline), ("--hud", args.hud), ("--scene", args.scene),
+            ("--publish", args.publish), ("--record-landmarks", args.record_landmarks),
+            ("--record", args.record), ("--telemetry-out", args.telemetry_out)) if value]
+        if single:
+            parser.error(f"{', '.join(single)} cannot be combined with --sessions")
+    elif args.shared_inference:
+        parser.error("--shared-inference needs --sessions N with N > 1")
+
+    spec = {
+        "source": args.source,
+        "loop": args.loop,
+        "max_frames": args.max_frames,
+        "replay_landmarks": args.replay_landmarks,
+        "inference_scale": args.inference_scale,
+        "roi": args.roi,
+        "infer_every": args.infer_every,
+        "target_fps": args.target_fps,
+        "smooth_strokes": args.smooth_strokes,
+        "frame_budget": args.frame_budget / 1000 if args.frame_budget else None,
+    }
+    if args.sessions > 1:
+        if not run_host(spec, args.sessions, args.shared_inference):
+            sys.exit(1)
+        return
+
+    from modules.frame_source import NullSink, RecordingSink, WindowSink
+    from modules.session_host import open_session
+    from modules.telemetry import FrameProfiler
+
+    profiler = FrameProfiler(started=T_START)
+    source, detector, sandbox = open_session(spec)
+    writer = None
+    if args.record_landmarks:
+        from modules.landmark_log import LandmarkLogWriter, LandmarkRecorder
+        writer = LandmarkLogWriter(args.record_landmarks)
+        detector = LandmarkRecorder(detector, writer)
+
+    if args.record:
+        sink = RecordingSink(args.record)
+    elif args.headless:
+        sink = NullSink()
+    else:
+        sink = WindowSink(WINDOW_NAME)
+
+    governor = None
+    if spec["frame_budget"]:
+        from modules.governor import QualityGovernor
+        governor = QualityGovernor(spec["frame_budget"], detector, sandbox.shapes,
+                                   on_change=lambda event: print(QualityGovernor.describe(event)))
+    publisher = None
+    if args.publish:
+        from modules.shm_bus import LandmarkPublisher
+        publisher = LandmarkPublisher(args.publish)
+    store = None
+    if args.scene:
+        from modules.scene_store import SceneStore
+        store = SceneStore(args.scene)
+        restored = store.restore(sandbox.shapes)
+        store.attach(sandbox.shapes)
+        print(f"  scene        {restored} shapes restored from {args.scene}")
+    profiler.mark("ready")
+
+    run = run_pipelined if args.pipeline else run_sequential
+    try:
+        run(source, detector, sandbox, sink, profiler, max_frames=args.max_frames, hud=args.hud,
+            governor=governor, publisher=publisher)
+    finally:
+        if publisher is not None:
+            cleanup(publisher.close, "closing the landmark bus")
+        if store is not None:
+            cleanup(store.close, f"saving the scene to {args.scene}")
+        if governor is not None:
+            s = governor.stats()
+            print(f"  quality      level {s['level']}, {s['downgrades']} downgrades, {s['upgrades']} upgrades")
+            profiler.extra["quality"] = {**s, "events": list(governor.events)}
+        if args.telemetry_out:
+            cleanup(lambda: profiler.export(args.telemetry_out), f"writing {args.telemetry_out}")
+        cleanup(source.release, "releasing the frame source")
+        cleanup(sink.close, "closing the display")
+        if writer:
+            cleanup(writer.close, "closing the landmark log")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
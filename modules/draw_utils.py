@@ -2,20 +2,85 @@
 import cv2
 import numpy as np
 
+
 class AirDrawer:
-    def __init__(self, width, height):
-        self.canvas = np.zeros((height, width, 3), np.uint8)
-        self.last_point = None
+    LINE_THICKNESS = 5
+    ERASER_RADIUS = 40
+    TILE = 256
+
+    def __init__(self, width, height, max_tiles=64):
+        self.size = (width, height)
+        # The canvas is unbounded but sparse: TILE x TILE tiles keyed by tile coordinate,
+        # allocated when ink first reaches them. At most max_tiles are kept (see _evict).
+        self.tiles = {}
+        self.max_tiles = max_tiles
+        # Tile-space box (x0, y0, x1, y1, exclusive) that may hold ink, per tile
+        self._ink = {}
+        self.last_point = None  # screen coordinates
+        # Screen position of the canvas origin; MOVE only changes this instead of warping the canvas
+        self.offset = (0, 0)
+        # Scratch buffers for overlay_on_frame(), sliced to the size of the composited region
+        self._blend = np.empty(self.TILE * self.TILE * 3, np.uint8)
+        self._mask = np.empty(self.TILE * self.TILE * 3, np.uint8)
+
+    def _to_canvas(self, x, y):
+        return x - self.offset[0], y - self.offset[1]
+
+    def _tiles_in(self, x0, y0, x1, y1):
+        """Coordinates of the tiles overlapping the canvas-space box (x0, y0, x1, y1)."""
+        t = self.TILE
+        for ty in range(y0 // t, (y1 - 1) // t + 1):
+            for tx in range(x0 // t, (x1 - 1) // t + 1):
+                yield tx, ty
+
+    def _evict(self):
+        """Drop the tiles farthest from the screen centre until at most max_tiles are left."""
+        w, h = self.size
+        cx, cy = self._to_canvas(w // 2, h // 2)
+        cx, cy = cx // self.TILE, cy // self.TILE
+        while len(self.tiles) > self.max_tiles:
+            key = max(self.tiles, key=lambda k: max(abs(k[0] - cx), abs(k[1] - cy)))
+            del self.tiles[key]
+            del self._ink[key]
 
     def draw(self, frame, x, y, mode):
         if mode == "DRAW":
             if self.last_point is None:
                 self.last_point = (x, y)
-            cv2.line(self.canvas, self.last_point, (x, y), (0, 0, 255), 5)  # red
+            pad = self.LINE_THICKNESS // 2 + 1
+            p1, p2 = self._to_canvas(*self.last_point), self._to_canvas(x, y)
+            x0, y0 = min(p1[0], p2[0]) - pad, min(p1[1], p2[1]) - pad
+            x1, y1 = max(p1[0], p2[0]) + pad + 1, max(p1[1], p2[1]) + pad + 1
+            t = self.TILE
+            for key in self._tiles_in(x0, y0, x1, y1):
+                tile = self.tiles.get(key)
+                if tile is None:
+                    tile = self.tiles[key] = np.zeros((t, t, 3), np.uint8)
+                ox, oy = key[0] * t, key[1] * t
+                cv2.line(tile, (p1[0] - ox, p1[1] - oy), (p2[0] - ox, p2[1] - oy), (0, 0, 255),
+                         self.LINE_THICKNESS)  # red
+                box = (max(0, x0 - ox), max(0, y0 - oy), min(t, x1 - ox), min(t, y1 - oy))
+                ink = self._ink.get(key)
+                if ink is not None:
+                    box = (min(ink[0], box[0]), min(ink[1], box[1]), max(ink[2], box[2]), max(ink[3], box[3]))
+                self._ink[key] = box
+            if len(self.tiles) > self.max_tiles:
+                self._evict()
             self.last_point = (x, y)
 
         elif mode == "ERASE":
-            cv2.circle(self.canvas, (x, y), 40, (0, 0, 0), -1)
+            # Only tiles that exist can hold ink; those left empty are freed
+            cx, cy = self._to_canvas(x, y)
+            r = self.ERASER_RADIUS
+            for key in list(self._tiles_in(cx - r, cy - r, cx + r + 1, cy + r + 1)):
+                tile = self.tiles.get(key)
+                if tile is None:
+                    continue
+                cv2.circle(tile, (cx - key[0] * self.TILE, cy - key[1] * self.TILE), r, (0, 0, 0), -1)
+                x0, y0, x1, y1 = self._ink[key]
+                if not tile[y0:y1, x0:x1].any():
+                    del self.tiles[key]
+                    del self._ink[key]
             self.last_point = None
 
         elif mode == "MOVE":
@@ -23,8 +88,7 @@ class AirDrawer:
                 self.last_point = (x, y)
             dx = x - self.last_point[0]
             dy = y - self.last_point[1]
-            M = np.float32([[1, 0, dx], [0, 1, dy]])
-            self.canvas = cv2.warpAffine(self.canvas, M, (self.canvas.shape[1], self.canvas.shape[0]))
+            self.offset = (self.offset[0] + dx, self.offset[1] + dy)
             self.last_point = (x, y)
 
         else:
@@ -33,10 +97,41 @@ class AirDrawer:
         return frame
 
     def overlay_on_frame(self, frame):
-        mask = self.canvas.astype(bool)
-        frame[mask] = cv2.addWeighted(frame, 0.6, self.canvas, 0.8, 0)[mask]
+        """
+        Blend the canvas ink onto the frame in place. Only the screen regions covered by the
+        ink boxes of visible tiles are touched, through preallocated buffers.
+        """
+        if not self.tiles:
+            return frame
+        fh, fw = frame.shape[:2]
+        ox, oy = self.offset
+        t = self.TILE
+        for key in self._tiles_in(-ox, -oy, fw - ox, fh - oy):
+            tile = self.tiles.get(key)
+            if tile is None:
+                continue
+            # Ink box on screen, clipped to the frame, and the matching tile region
+            sx, sy = key[0] * t + ox, key[1] * t + oy
+            bx0, by0, bx1, by1 = self._ink[key]
+            x0, y0 = max(0, bx0 + sx), max(0, by0 + sy)
+            x1, y1 = min(fw, bx1 + sx), min(fh, by1 + sy)
+            if x0 >= x1 or y0 >= y1:
+                continue
+
+            src = tile[y0 - sy:y1 - sy, x0 - sx:x1 - sx]
+            dst = frame[y0:y1, x0:x1]
+            n = (y1 - y0) * (x1 - x0) * 3
+            blend = self._blend[:n].reshape(y1 - y0, x1 - x0, 3)
+            mask = self._mask[:n].reshape(y1 - y0, x1 - x0, 3)
+
+            cv2.addWeighted(dst, 0.6, src, 0.8, 0, dst=blend)
+            # Per-channel mask, as before: only channels with ink are blended
+            cv2.compare(src, 0, cv2.CMP_NE, dst=mask)
+            cv2.copyTo(blend, mask, dst)
         return frame
 
     def clear(self):
-        self.canvas[:] = 0
+        self.tiles = {}
+        self._ink = {}
         self.last_point = None
+        self.offset = (0, 0)
@@ -0,0 +1,194 @@
+# modules/frame_source.py
+import os
+import time
+
+import cv2
+import numpy as np
+
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class FrameSource:
+    """
+    Where frames come from. read() mirrors cv2.VideoCapture.read(): (success, frame).
+    """
+
+    def read(self):
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+
+class CameraSource(FrameSource):
+    def __init__(self, index=0, width=1280, height=720):
+        self.cap = cv2.VideoCapture(index)
+        self.cap.set(3, width)
+        self.cap.set(4, height)
+
+    def read(self):
+        return self.cap.read()
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    def __init__(self, path, loop=False):
+        if not os.path.isfile(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self.loop = loop
+        self.cap = cv2.VideoCapture(path)
+
+    def read(self):
+        success, frame = self.cap.read()
+        if not success and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, frame = self.cap.read()
+        return success, frame
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirSource(FrameSource):
+    """Reads the images of a directory in name order."""
+
+    def __init__(self, path, loop=False):
+        self.files = sorted(
+            os.path.join(path, f) for f in os.listdir(path)
+            if f.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not self.files:
+            raise ValueError(f"No images found in {path}")
+        self.loop = loop
+        self.index = 0
+
+    def read(self):
+        if self.index >= len(self.files):
+            if not self.loop:
+                return False, None
+            self.index = 0
+        frame = cv2.imread(self.files[self.index])
+        self.index += 1
+        return frame is not None, frame
+
+
+class SyntheticSource(FrameSource):
+    """
+    Generated frames: a noisy background with a moving bright blob.
+    Runs as fast as it is read unless fps is given.
+    """
+
+    def __init__(self, width=1280, height=720, count=None, fps=None, seed=0):
+        self.width = width
+        self.height = height
+        self.count = count
+        self.fps = fps
+        self.index = 0
+        rng = np.random.default_rng(seed)
+        self.background = rng.integers(0, 60, (height, width, 3), dtype=np.uint8)
+        self._next_time = None
+
+    def read(self):
+        if self.count is not None and self.index >= self.count:
+            return False, None
+
+        if self.fps:
+            now = time.perf_counter()
+            if self._next_time is None:
+                self._next_time = now
+            elif now < self._next_time:
+                time.sleep(self._next_time - now)
+            self._next_time += 1.0 / self.fps
+
+        frame = self.background.copy()
+        t = self.index / 30.0
+        cx = int(self.width / 2 + self.width / 3 * np.cos(t))
+        cy = int(self.height / 2 + self.height / 3 * np.sin(2 * t))
+        cv2.circle(frame, (cx, cy), 60, (180, 200, 230), -1)
+        self.index += 1
+        return True, frame
+
+
+def open_source(spec, width=1280, height=720, loop=False):
+    """
+    Build a frame source from a command-line spec:
+        "0", "1", ...   -> camera index
+        "synthetic"     -> generated frames ("synthetic:500" stops after 500 frames)
+        a directory     -> images in that directory
+        anything else   -> video file
+    """
+    spec = str(spec)
+    if spec.isdigit():
+        return CameraSource(int(spec), width, height)
+    if spec.startswith("synthetic"):
+        _, _, count = spec.partition(":")
+        return SyntheticSource(width, height, count=int(count) if count else None)
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, loop=loop)
+    return VideoFileSource(spec, loop=loop)
+
+
+class FrameSink:
+    """
+    Where rendered frames go. show() returns False when the loop should stop.
+    """
+
+    def show(self, img):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class WindowSink(FrameSink):
+    def __init__(self, name, fullscreen=True):
+        self.name = name
+        cv2.namedWindow(name, cv2.WINDOW_NORMAL)
+        if fullscreen:
+            cv2.setWindowProperty(name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+
+    def show(self, img):
+        cv2.imshow(self.name, img)
+        return not (cv2.waitKey(1) & 0xFF == 27)
+
+    def close(self):
+        cv2.destroyWindow(self.name)
+
+
+class NullSink(FrameSink):
+    """Discards frames; only counts them."""
+
+    def __init__(self):
+        self.frames = 0
+
+    def show(self, img):
+        self.frames += 1
+        return True
+
+
+class RecordingSink(FrameSink):
+    """Writes frames to a video file instead of showing them."""
+
+    def __init__(self, path, fps=30, fourcc="mp4v"):
+        self.path = path
+        self.fps = fps
+        self.fourcc = cv2.VideoWriter_fourcc(*fourcc)
+        self.writer = None
+        self.frames = 0
+
+    def show(self, img):
+        if self.writer is None:
+            h, w = img.shape[:2]
+            self.writer = cv2.VideoWriter(self.path, self.fourcc, self.fps, (w, h))
+        self.writer.write(img)
+        self.frames += 1
+        return True
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
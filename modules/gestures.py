@@ -0,0 +1,163 @@
+# modules/gestures.py
+import math
+import time
+
+import numpy as np
+
+from modules.hand_features import LEFT, PINCH_THRESHOLD, RIGHT, mirror_handedness, pinch_state, to_pixels
+
+
+PINCH_RELEASE = 55  # pixels; a pinch only ends once the finger tips are this far apart
+
+HANDS = (("left", LEFT), ("right", RIGHT))
+
+
+class GestureEvent:
+    """
+    One gesture event:
+        pinch_start, pinch_move, pinch_end  hand = "left"/"right", pos = pinch center
+        click                               emitted with pinch_start
+        zoom_start, zoom, zoom_end          hand = None, pos = (left center, right center),
+                                            value = distance ratio to the start of the zoom
+    """
+
+    __slots__ = ("type", "hand", "pos", "t", "value")
+
+    def __init__(self, type, hand, pos, t, value=None):
+        self.type = type
+        self.hand = hand
+        self.pos = pos
+        self.t = t
+        self.value = value
+
+    def __repr__(self):
+        value = "" if self.value is None else f", {self.value:.3f}"
+        return f"GestureEvent({self.type}, {self.hand}, {self.pos}{value})"
+
+
+class _Hand:
+    __slots__ = ("pinching", "pending_since", "center", "lost_since")
+
+    def __init__(self):
+        self.pinching = False
+        self.pending_since = None  # when the raw state started to disagree with `pinching`
+        self.center = None
+        self.lost_since = None
+
+
+class GestureEngine:
+    """
+    Turns per-frame hand landmark arrays into gesture events.
+
+    A pinch starts below pinch_threshold and only ends above release_threshold (hysteresis);
+    either change must persist for `debounce` seconds before it is reported, and a hand that
+    disappears ends its pinch after `lost_timeout` seconds. All timing is in seconds, so the
+    behaviour does not depend on the frame rate, and each frame costs the same per hand.
+
+    update() takes pixel landmarks and handedness codes as seen by the user (i.e. mirrored
+    already) and returns the events of that frame.
+    """
+
+    def __init__(self, pinch_threshold=PINCH_THRESHOLD, release_threshold=PINCH_RELEASE,
+                 debounce=0.04, lost_timeout=0.15, require_measured=False):
+        """
+        require_measured: when landmarks are predicted instead of measured (see InferenceScheduler),
+        only move pinch centers; pinches start and end on measured frames only.
+        """
+        self.pinch_threshold = pinch_threshold
+        self.release_threshold = release_threshold
+        self.debounce = debounce
+        self.lost_timeout = lost_timeout
+        self.require_measured = require_measured
+        self.hands = {label: _Hand() for label, _ in HANDS}
+        self.zoom_start_dist = None
+
+    def pinching(self, hand):
+        return self.hands[hand].pinching
+
+    def center(self, hand):
+        return self.hands[hand].center
+
+    def _transition(self, state, raw, now):
+        """Debounced pinch state change; returns True when `pinching` flips this frame."""
+        if raw == state.pinching:
+            state.pending_since = None
+            return False
+        if state.pending_since is None:
+            state.pending_since = now
+        if now - state.pending_since < self.debounce:
+            return False
+        state.pinching = raw
+        state.pending_since = None
+        return True
+
+    def update(self, landmarks, handedness, t=None, measured=True):
+        now = time.perf_counter() if t is None else t
+        events = []
+        frozen = self.require_measured and not measured
+
+        # A pinching hand has to open past the release threshold to stop pinching
+        thresholds = np.where(
+            handedness == LEFT,
+            self.release_threshold if self.hands["left"].pinching else self.pinch_threshold,
+            self.release_threshold if self.hands["right"].pinching else self.pinch_threshold)
+        pinching, centers = pinch_state(landmarks, thresholds)
+
+        for label, code in HANDS:
+            state = self.hands[label]
+            idx = (handedness == code).nonzero()[0]
+
+            if not len(idx):
+                if state.lost_since is None:
+                    state.lost_since = now
+                if state.pinching and now - state.lost_since >= self.lost_timeout:
+                    state.pinching = False
+                    state.pending_since = None
+                    events.append(GestureEvent("pinch_end", label, state.center, now))
+                continue
+
+            i = idx[0]
+            state.lost_since = None
+            state.center = tuple(centers[i].tolist())
+            if not frozen:
+                if self._transition(state, bool(pinching[i]), now):
+                    if state.pinching:
+                        events.append(GestureEvent("pinch_start", label, state.center, now))
+                        events.append(GestureEvent("click", label, state.center, now))
+                    else:
+                        events.append(GestureEvent("pinch_end", label, state.center, now))
+                        continue
+            if state.pinching:
+                events.append(GestureEvent("pinch_move", label, state.center, now))
+
+        left, right = self.hands["left"], self.hands["right"]
+        if left.pinching and right.pinching:
+            pos = (left.center, right.center)
+            d = math.hypot(right.center[0] - left.center[0], right.center[1] - left.center[1])
+            if self.zoom_start_dist is None:
+                self.zoom_start_dist = max(d, 1.0)
+                events.append(GestureEvent("zoom_start", None, pos, now, 1.0))
+            else:
+                events.append(GestureEvent("zoom", None, pos, now, d / self.zoom_start_dist))
+        elif self.zoom_start_dist is not None:
+            self.zoom_start_dist = None
+            events.append(GestureEvent("zoom_end", None, None, now))
+        return events
+
+
+def replay_log(path, width=1280, height=720, swap_hands=True, **engine_args):
+    """
+    Run a GestureEngine over a recorded landmark log (see landmark_log) using the recorded
+    timestamps; returns the list of (frame index, event). swap_hands: swap Left/Right like
+    Sandbox does for the mirrored camera frame.
+    """
+    from modules.landmark_log import LandmarkLog
+    log = LandmarkLog(path)
+    engine = GestureEngine(**engine_args)
+    out = []
+    for i in range(len(log)):
+        t, lms, handedness = log.frame(i)
+        if swap_hands:
+            handedness = mirror_handedness(handedness)
+        out.extend((i, e) for e in engine.update(to_pixels(lms, width, height), handedness, t))
+    return out
@@ -0,0 +1,185 @@
+# modules/governor.py
+import time
+from collections import deque
+
+import cv2
+
+
+# Quality levels from best to cheapest. Every knob is "higher = better"; a level caps the
+# value the session was configured with, so level 0 leaves the configuration untouched.
+#   inference_scale   downscale of the frame fed to the hand model
+#   model_complexity  MediaPipe Hands model (1 = full, 0 = lite)
+#   max_hands         hands the model looks for; 1 disables two-hand zoom
+#   ui_detail         ShapeManager overlay detail (see ShapeManager.set_ui_detail)
+QUALITY_LEVELS = [
+    {"inference_scale": 1.0, "model_complexity": 1, "max_hands": 2, "ui_detail": 2},
+    {"inference_scale": 0.75, "model_complexity": 1, "max_hands": 2, "ui_detail": 2},
+    {"inference_scale": 0.75, "model_complexity": 0, "max_hands": 2, "ui_detail": 1},
+    {"inference_scale": 0.5, "model_complexity": 0, "max_hands": 2, "ui_detail": 1},
+    {"inference_scale": 0.5, "model_complexity": 0, "max_hands": 1, "ui_detail": 0},
+]
+
+DETECTOR_KNOBS = ("inference_scale", "model_complexity", "max_hands")
+
+
+def configurable_detector(detector):
+    """First detector along the .detector wrapper chain that supports configure(), or None."""
+    while detector is not None:
+        if hasattr(detector, "configure"):
+            return detector
+        detector = getattr(detector, "detector", None)
+    return None
+
+
+class QualityGovernor:
+    """
+    Holds a frame-time budget by stepping quality knobs down and back up.
+
+    update() is fed the measured processing time of every frame. Its EWMA has to stay over
+    the budget for `downgrade_after` seconds before quality drops one level, and under
+    budget * headroom for `upgrade_after` seconds before it rises again; between the two
+    thresholds nothing changes. When an upgrade is followed straight away by a downgrade
+    the upgrade wait doubles (up to max_upgrade_after), so a level that cannot hold the
+    budget is not retried every few seconds.
+
+    Every change is returned by update() as an event dict, kept in `events`, passed to
+    on_change and counted in stats().
+    """
+
+    def __init__(self, budget, detector=None, shapes=None, levels=QUALITY_LEVELS,
+                 downgrade_after=1.0, upgrade_after=3.0, max_upgrade_after=60.0, headroom=0.75,
+                 on_change=None):
+        """
+        budget:    target processing time per frame, in seconds.
+        detector:  detector (or wrapper) whose inference_scale / model_complexity / max_hands follow
+                   the level; detectors without configure() are left alone (e.g. replayed landmarks).
+        shapes:    ShapeManager whose ui_detail follows the level.
+        headroom:  fraction of the budget the frame time must stay under before upgrading.
+        """
+        self.budget = budget
+        self.detector = configurable_detector(detector)
+        self.shapes = shapes
+        self.levels = levels
+        self.downgrade_after = downgrade_after
+        self.upgrade_after = upgrade_after
+        self.max_upgrade_after = max_upgrade_after
+        self.headroom = headroom
+        self.on_change = on_change
+
+        # Configured values; the levels cap them
+        self.base = dict(self.detector.settings()) if self.detector is not None else {}
+        if shapes is not None:
+            self.base["ui_detail"] = shapes.ui_detail
+        self.knobs = dict(self.base)
+
+        self.level = 0
+        self.frame_time = None  # EWMA of the processing time, seconds
+        self.events = deque(maxlen=100)
+        self.downgrades = 0
+        self.upgrades = 0
+        self.time_at_level = [0.0] * len(levels)
+        self._over_since = None
+        self._under_since = None
+        self._upgrade_wait = upgrade_after
+        self._last_upgrade = None
+        self._last_update = None
+
+    def _knobs_for(self, level):
+        limits = self.levels[level]
+        return {name: min(value, limits[name]) if name in limits else value
+                for name, value in self.base.items()}
+
+    def _apply(self, knobs):
+        if self.detector is not None:
+            self.detector.configure(**{k: knobs[k] for k in DETECTOR_KNOBS if k in knobs})
+        if self.shapes is not None and "ui_detail" in knobs:
+            self.shapes.set_ui_detail(knobs["ui_detail"])
+
+    def _change(self, level, now, reason):
+        knobs = self._knobs_for(level)
+        changed = {k: (self.knobs[k], v) for k, v in knobs.items() if self.knobs[k] != v}
+        event = {
+            "t": now,
+            "previous": self.level,
+            "level": level,
+            "direction": "down" if level > self.level else "up",
+            "reason": reason,
+            "frame_ms": self.frame_time * 1000,
+            "budget_ms": self.budget * 1000,
+            "knobs": changed,
+        }
+        if level > self.level:
+            self.downgrades += 1
+            # Straight back down after an upgrade: that level cannot hold the budget, wait longer
+            if self._last_upgrade is not None and now - self._last_upgrade < self._upgrade_wait:
+                self._upgrade_wait = min(self._upgrade_wait * 2, self.max_upgrade_after)
+            else:
+                self._upgrade_wait = self.upgrade_after
+        else:
+            self.upgrades += 1
+            self._last_upgrade = now
+
+        self._apply(knobs)
+        self.knobs = knobs
+        self.level = level
+        # Start measuring the new level from scratch
+        self.frame_time = None
+        self._over_since = None
+        self._under_since = None
+        self.events.append(event)
+        if self.on_change is not None:
+            self.on_change(event)
+        return event
+
+    def update(self, frame_time, now=None):
+        """Feed one frame's processing time (seconds); returns the change event, or None."""
+        now = time.perf_counter() if now is None else now
+        if self._last_update is not None:
+            self.time_at_level[self.level] += now - self._last_update
+        self._last_update = now
+        self.frame_time = frame_time if self.frame_time is None else 0.9 * self.frame_time + 0.1 * frame_time
+
+        if self.frame_time > self.budget:
+            self._under_since = None
+            if self._over_since is None:
+                self._over_since = now
+            held = now - self._over_since
+            if held >= self.downgrade_after and self.level < len(self.levels) - 1:
+                return self._change(self.level + 1, now, f"over budget for {held:.1f} s")
+        elif self.frame_time < self.budget * self.headroom:
+            self._over_since = None
+            if self._under_since is None:
+                self._under_since = now
+            held = now - self._under_since
+            if held >= self._upgrade_wait and self.level > 0:
+                return self._change(self.level - 1, now, f"under {self.headroom:.0%} of budget for {held:.1f} s")
+        else:
+            self._over_since = None
+            self._under_since = None
+        return None
+
+    def stats(self):
+        return {
+            "level": self.level,
+            "knobs": dict(self.knobs),
+            "frame_ms": self.frame_time * 1000 if self.frame_time is not None else None,
+            "budget_ms": self.budget * 1000,
+            "downgrades": self.downgrades,
+            "upgrades": self.upgrades,
+            "upgrade_wait": self._upgrade_wait,
+            "seconds_per_level": list(self.time_at_level),
+        }
+
+    @staticmethod
+    def describe(event):
+        """One-line description of a change event."""
+        knobs = ", ".join(f"{k} {old} -> {new}" for k, (old, new) in event["knobs"].items())
+        return (f"quality level {event['previous']} -> {event['level']} "
+                f"(frame {event['frame_ms']:.1f} ms, budget {event['budget_ms']:.1f} ms, {event['reason']})"
+                f"{': ' + knobs if knobs else ''}")
+
+    def draw_hud(self, img, origin=(40, 140)):
+        frame_ms = self.frame_time * 1000 if self.frame_time is not None else 0.0
+        cv2.putText(img, f"quality {self.level}/{len(self.levels) - 1}  {frame_ms:5.1f} / {self.budget * 1000:.1f} ms",
+                    origin, cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 255, 255), 1)
+        return img
@@ -1,53 +1,249 @@
 # modules/hand_detector.py
+import threading
+
 import cv2
-import mediapipe as mp
+import numpy as np
+
+from modules.hand_features import empty_landmarks, mirror_handedness, results_to_arrays, to_pixels, to_positions
 
 class HandDetector:
-    def __init__(self, detection_conf=0.7, track_conf=0.7, max_hands=2):
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
+    """
+    MediaPipe Hands wrapper. MediaPipe is imported and the model built on first use, or in the
+    background by warmup() so that loading overlaps other start-up work (e.g. opening the camera).
+    """
+
+    measured = True  # every frame goes through the model (see InferenceScheduler)
+
+    def __init__(self, detection_conf=0.7, track_conf=0.7, max_hands=2, model_complexity=1,
+                 inference_scale=1.0, roi_tracking=False, roi_padding=0.3, redetect_interval=30,
+                 static_image_mode=False, raw_rgb_input=False):
+        """
+        model_complexity:  MediaPipe Hands model, 1 = full or 0 = lite (faster, less accurate).
+        inference_scale:   run the model on a frame downscaled by this factor (e.g. 0.5).
+        roi_tracking:      once hands are found, only feed the padded box around them to the model.
+        roi_padding:       padding around the tracked hands, relative to the box size.
+        redetect_interval: run full-frame detection at least every N frames so new hands are found.
+        static_image_mode: detect in every frame without tracking from the previous one; needed when
+                           one detector serves frames of several streams (see InferenceService).
+        raw_rgb_input:     find_hands() gets the unmirrored camera frame already converted to RGB
+                           (see FramePreprocessor); landmarks and handedness are mirrored
+                           arithmetically so they match the mirrored display frame.
+        """
+        self._model_args = dict(
+            static_image_mode=static_image_mode,
             max_num_hands=max_hands,
+            model_complexity=model_complexity,
             min_detection_confidence=detection_conf,
             min_tracking_confidence=track_conf
         )
-        self.mp_draw = mp.solutions.drawing_utils
+        self.mp_hands = None
+        self.hands = None
+        self._warmup_thread = None
+        # Model rebuilt by configure(), swapped in by the thread that runs the model
+        self._replacement = None
+        self._generation = 0
+        self._replacement_lock = threading.Lock()
         self.results = None
+        # Normalized (n_hands, 21, 3) landmarks and handedness codes of the last processed frame
+        self.norm_landmarks, self.handedness = empty_landmarks()
+
+        self.inference_scale = inference_scale
+        self.roi_tracking = roi_tracking
+        self.roi_padding = roi_padding
+        self.redetect_interval = redetect_interval
+        self.raw_rgb_input = raw_rgb_input
+        self.roi = None  # (x0, y0, x1, y1) pixel box used for the last frame, None = full frame
+        self._frames_since_full = 0
+        self._input_landmarks = self.norm_landmarks  # last landmarks relative to the model input
+        self._small = None  # reused resize / color conversion outputs
+        self._rgb = None
+
+    def _load_model(self):
+        import mediapipe as mp
+        self.mp_hands = mp.solutions.hands
+        self.hands = self.mp_hands.Hands(**self._model_args)
+
+    def _warmup(self):
+        self._load_model()
+        # The first process() call initializes the graph; do it on a blank frame
+        self.hands.process(np.zeros((64, 64, 3), np.uint8))
+
+    def warmup(self, background=True):
+        """Import MediaPipe, build the model and run it once; returns immediately when background."""
+        if self.hands is not None or self._warmup_thread is not None:
+            return
+        if not background:
+            self._warmup()
+            return
+        self._warmup_thread = threading.Thread(target=self._warmup, name="hand-model-warmup", daemon=True)
+        self._warmup_thread.start()
+
+    def _ensure_model(self):
+        if self._warmup_thread is not None:
+            self._warmup_thread.join()
+            self._warmup_thread = None
+        if self.hands is None:
+            self._load_model()
+
+    def settings(self):
+        """Current quality settings, as accepted by configure()."""
+        return {
+            "inference_scale": self.inference_scale,
+            "model_complexity": self._model_args["model_complexity"],
+            "max_hands": self._model_args["max_num_hands"],
+        }
+
+    def configure(self, inference_scale=None, model_complexity=None, max_hands=None):
+        """
+        Change quality settings while running (see QualityGovernor). The inference scale applies
+        from the next frame; a model change is built and warmed up on a background thread, and
+        the current model keeps serving frames until it is ready.
+        """
+        if inference_scale is not None:
+            self.inference_scale = inference_scale
+        args = dict(self._model_args)
+        if model_complexity is not None:
+            args["model_complexity"] = model_complexity
+        if max_hands is not None:
+            args["max_num_hands"] = max_hands
+        if args == self._model_args:
+            return
+        self._model_args = args
+        if self.hands is None and self._warmup_thread is None:
+            return  # not loaded yet: the first use builds it with the new arguments
+        with self._replacement_lock:
+            self._generation += 1
+            generation = self._generation
+        threading.Thread(target=self._build_replacement, args=(args, generation),
+                         name="hand-model-rebuild", daemon=True).start()
+
+    def _build_replacement(self, args, generation):
+        import mediapipe as mp
+        hands = mp.solutions.hands.Hands(**args)
+        hands.process(np.zeros((64, 64, 3), np.uint8))
+        with self._replacement_lock:
+            if generation == self._generation:
+                hands, self._replacement = self._replacement, hands
+        # Left over: a superseded build, or an earlier replacement that was never swapped in
+        if hands is not None:
+            hands.close()
+
+    def _swap_model(self):
+        with self._replacement_lock:
+            hands, self._replacement = self._replacement, None
+        if hands is not None:
+            old, self.hands = self.hands, hands
+            old.close()
+
+    @staticmethod
+    def _reuse(buf, h, w):
+        if buf is None or buf.shape[:2] != (h, w):
+            buf = np.empty((h, w, 3), np.uint8)
+        return buf
+
+    def _process(self, img):
+        """Run the model on a BGR image (RGB with raw_rgb_input); returns landmarks normalized to it."""
+        if self.inference_scale < 1.0:
+            h, w = img.shape[:2]
+            sh, sw = max(1, round(h * self.inference_scale)), max(1, round(w * self.inference_scale))
+            self._small = self._reuse(self._small, sh, sw)
+            img = cv2.resize(img, (sw, sh), dst=self._small, interpolation=cv2.INTER_AREA)
+        return self._run_model(img)
+
+    def _run_model(self, img):
+        """(landmarks, handedness) of the model input as it is, landmarks normalized to it."""
+        self._ensure_model()
+        if self._replacement is not None:
+            self._swap_model()
+        if not self.raw_rgb_input:
+            self._rgb = self._reuse(self._rgb, *img.shape[:2])
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        self.results = self.hands.process(img)
+        return results_to_arrays(self.results)
+
+    def _tracking_box(self, w, h):
+        """Padded pixel box around the hands of the previous frame, or None."""
+        lms = self._input_landmarks
+        if not len(lms):
+            return None
+        x_min, y_min = lms[..., 0].min(), lms[..., 1].min()
+        x_max, y_max = lms[..., 0].max(), lms[..., 1].max()
+        pad = self.roi_padding * max(x_max - x_min, y_max - y_min)
+        x0, y0 = int(max(0.0, x_min - pad) * w), int(max(0.0, y_min - pad) * h)
+        x1, y1 = int(min(1.0, x_max + pad) * w), int(min(1.0, y_max + pad) * h)
+        if x1 - x0 < 32 or y1 - y0 < 32:
+            return None
+        return x0, y0, x1, y1
 
     def find_hands(self, img, draw=True):
         """
-        Process the provided image (BGR). IMPORTANT: pass the raw (unflipped) frame here.
+        Process the provided image: the mirrored BGR frame that is displayed, or with
+        raw_rgb_input the unmirrored RGB model input (drawing is then skipped).
         """
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        self.results = self.hands.process(img_rgb)
+        h, w = img.shape[:2]
+        n_tracked = len(self._input_landmarks)
+
+        box = None
+        if self.roi_tracking and self._frames_since_full < self.redetect_interval:
+            box = self._tracking_box(w, h)
 
-        if draw and self.results and self.results.multi_hand_landmarks:
-            for hand_lms in self.results.multi_hand_landmarks:
-                self.mp_draw.draw_landmarks(img, hand_lms, self.mp_hands.HAND_CONNECTIONS)
+        landmarks, handedness = empty_landmarks()
+        if box is not None:
+            x0, y0, x1, y1 = box
+            landmarks, handedness = self._process(img[y0:y1, x0:x1])
+            # Map crop-normalized coordinates back to the full frame
+            cw, ch = x1 - x0, y1 - y0
+            landmarks[..., 0] = (landmarks[..., 0] * cw + x0) / w
+            landmarks[..., 1] = (landmarks[..., 1] * ch + y0) / h
+            landmarks[..., 2] *= cw / w
+            self._frames_since_full += 1
+
+        # Tracking lost (or not tracking yet): fall back to full-frame detection
+        if box is None or len(landmarks) < n_tracked:
+            box = None
+            landmarks, handedness = self._process(img)
+            self._frames_since_full = 0
+
+        self.roi = box
+        self._input_landmarks = landmarks
+        if self.raw_rgb_input:
+            # The model saw the unmirrored frame: mirror x and swap Left/Right instead of the pixels
+            landmarks = landmarks.copy()
+            landmarks[..., 0] = 1.0 - landmarks[..., 0]
+            handedness = mirror_handedness(handedness)
+            draw = False
+        self.norm_landmarks, self.handedness = landmarks, handedness
+
+        if draw and len(landmarks):
+            self._draw_landmarks(img)
         return img
 
+    def _draw_landmarks(self, img):
+        # Drawn from the full-frame arrays: self.results may be relative to a crop
+        px, _ = self.find_arrays(img)
+        pts = px[..., :2].astype(int).tolist()
+        for hand in pts:
+            for a, b in self.mp_hands.HAND_CONNECTIONS:
+                cv2.line(img, tuple(hand[a]), tuple(hand[b]), (255, 255, 255), 2)
+            for x, y in hand:
+                cv2.circle(img, (x, y), 4, (0, 0, 255), -1)
+
+    def find_arrays(self, img):
+        """
+        Returns (landmarks, handedness) of the last processed frame:
+        landmarks is a (n_hands, 21, 3) float32 array, x/y in pixel coordinates of img,
+        handedness a (n_hands,) int8 array of hand_features.LEFT / RIGHT.
+        """
+        h, w = img.shape[:2]
+        return to_pixels(self.norm_landmarks, w, h), self.handedness
+
     def find_positions(self, img, draw=False):
         """
         Returns list of hands; each hand is dict:
             { "label": "Right"/"Left", "landmarks": [ (id, x, y), ... ] }
         Coordinates (x,y) are pixel coordinates in the SAME IMAGE you passed to find_hands().
         """
-        all_hands = []
-        if not self.results or not self.results.multi_hand_landmarks:
-            return all_hands
-
-        for hand_idx, hand_lms in enumerate(self.results.multi_hand_landmarks):
-            h, w, _ = img.shape
-            lm_list = []
-            for id, lm in enumerate(hand_lms.landmark):
-                cx, cy = int(lm.x * w), int(lm.y * h)
-                lm_list.append((id, cx, cy))
-
-            # Handedness label from Mediapipe (corresponds to the image passed)
-            label = self.results.multi_handedness[hand_idx].classification[0].label
-            all_hands.append({"label": label, "landmarks": lm_list})
-
-        return all_hands
+        return to_positions(*self.find_arrays(img))
 
     def fingers_up(self, hand):
         """
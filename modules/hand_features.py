@@ -0,0 +1,92 @@
+# modules/hand_features.py
+"""
+Array representation of detected hands and gesture features computed for all hands at once.
+
+landmarks:  (n_hands, 21, 3) float32 array of (x, y, z)
+handedness: (n_hands,) int8 array of LEFT / RIGHT codes
+"""
+import numpy as np
+
+
+NUM_LANDMARKS = 21
+LEFT, RIGHT = 0, 1
+LABELS = ("Left", "Right")
+LABEL_CODES = {"Left": LEFT, "Right": RIGHT}
+
+THUMB_IP, THUMB_TIP, INDEX_TIP = 3, 4, 8
+FINGER_TIPS = np.array([8, 12, 16, 20])
+FINGER_PIPS = FINGER_TIPS - 2
+
+PINCH_THRESHOLD = 40  # pixels
+
+
+def empty_landmarks():
+    return np.zeros((0, NUM_LANDMARKS, 3), np.float32), np.zeros(0, np.int8)
+
+
+def results_to_arrays(results):
+    """
+    Convert MediaPipe hand results to normalized (landmarks, handedness) arrays.
+    This is the only per-landmark Python loop; everything downstream works on the arrays.
+    """
+    if not results or not results.multi_hand_landmarks:
+        return empty_landmarks()
+    landmarks = np.array(
+        [[(lm.x, lm.y, lm.z) for lm in hand_lms.landmark] for hand_lms in results.multi_hand_landmarks],
+        np.float32,
+    )
+    handedness = np.array(
+        [LABEL_CODES[h.classification[0].label] for h in results.multi_handedness], np.int8
+    )
+    return landmarks, handedness
+
+
+def to_pixels(landmarks, width, height):
+    """Scale normalized landmarks to pixel coordinates (x, y truncated like int(); z untouched)."""
+    px = landmarks * np.array([width, height, 1], np.float32)
+    np.trunc(px[..., :2], out=px[..., :2])
+    return px
+
+
+def to_positions(landmarks, handedness):
+    """Legacy find_positions() output: [{"label": ..., "landmarks": [(id, x, y), ...]}, ...]."""
+    all_hands = []
+    for lms, code in zip(landmarks.astype(int).tolist(), handedness.tolist()):
+        all_hands.append({
+            "label": LABELS[code],
+            "landmarks": [(i, x, y) for i, (x, y, _) in enumerate(lms)],
+        })
+    return all_hands
+
+
+def mirror_handedness(handedness):
+    """Swap Left/Right codes."""
+    return (1 - handedness).astype(np.int8)
+
+
+def landmark_distance(landmarks, a, b):
+    """2D distance between landmarks a and b of every hand -> (n_hands,)."""
+    d = landmarks[:, b, :2] - landmarks[:, a, :2]
+    return np.hypot(d[:, 0], d[:, 1])
+
+
+def pinch_state(landmarks, threshold=PINCH_THRESHOLD):
+    """
+    Pinch test for every hand; threshold (pixels) is a scalar or one value per hand.
+    Returns (pinching (n_hands,) bool, centers (n_hands, 2) int32) where the center is
+    the midpoint of the thumb and index tips.
+    """
+    pinching = landmark_distance(landmarks, THUMB_TIP, INDEX_TIP) < threshold
+    centers = ((landmarks[:, THUMB_TIP, :2] + landmarks[:, INDEX_TIP, :2]) // 2).astype(np.int32)
+    return pinching, centers
+
+
+def fingers_up(landmarks, handedness):
+    """
+    Finger state of every hand -> (n_hands, 5) uint8, [thumb, index, middle, ring, pinky], 1 = up.
+    Same rules as HandDetector.fingers_up: thumb by x depending on handedness, others tip.y < pip.y.
+    """
+    thumb_x, ip_x = landmarks[:, THUMB_TIP, 0], landmarks[:, THUMB_IP, 0]
+    thumb = np.where(handedness == RIGHT, thumb_x < ip_x, thumb_x > ip_x)
+    others = landmarks[:, FINGER_TIPS, 1] < landmarks[:, FINGER_PIPS, 1]
+    return np.column_stack([thumb, others]).astype(np.uint8)
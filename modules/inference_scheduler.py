@@ -0,0 +1,122 @@
+# modules/inference_scheduler.py
+import time
+
+import numpy as np
+
+from modules.hand_features import to_pixels, to_positions
+
+
+class InferenceScheduler:
+    """
+    Wraps a HandDetector and only runs the model every N frames (or sooner when hands move fast).
+    In between, landmarks are predicted with a constant-velocity model so callers still get a
+    landmark set every frame. `measured` tells whether the last frame came from the model.
+
+    With a target_fps the skip rate adapts: it grows while the loop runs slower than the target
+    and shrinks again once there is headroom.
+    """
+
+    def __init__(self, detector, every_n=2, target_fps=None, max_skip=4,
+                 motion_threshold=1.5, adjust_every=15, clock=time.perf_counter):
+        """
+        every_n:          run the model on every N-th frame (1 = every frame).
+        target_fps:       adapt every_n to hold this frame rate (None = fixed every_n).
+        max_skip:         upper bound for every_n when adapting.
+        motion_threshold: hand speed (frame widths per second) above which the model runs every frame.
+        adjust_every:     frames between skip-rate adjustments.
+        clock:            returns the current time in seconds; frame times and velocities use it.
+        """
+        self.detector = detector
+        self.every_n = every_n
+        self.target_fps = target_fps
+        self.max_skip = max_skip
+        self.motion_threshold = motion_threshold
+        self.adjust_every = adjust_every
+        self.clock = clock
+
+        self.measured = False
+        self.norm_landmarks = detector.norm_landmarks
+        self.handedness = detector.handedness
+
+        self._frames_since_inference = every_n  # run on the first frame
+        self._last = None      # (t, landmarks, handedness) of the latest measurement
+        self._velocity = None  # normalized units per second, same shape as landmarks
+        self._last_call = None
+        self._frame_time = None  # EWMA of seconds between frames
+        self._frames_since_adjust = 0
+        self.inferences = 0
+        self.predictions = 0
+
+    def _speed(self):
+        """Fastest landmark speed of the tracked hands (normalized units per second)."""
+        if self._velocity is None or not len(self._velocity):
+            return 0.0
+        return float(np.abs(self._velocity[..., :2]).max())
+
+    def _adapt(self, now):
+        if self._last_call is not None:
+            dt = now - self._last_call
+            self._frame_time = dt if self._frame_time is None else 0.9 * self._frame_time + 0.1 * dt
+        self._last_call = now
+
+        if not self.target_fps or not self._frame_time:
+            return
+        self._frames_since_adjust += 1
+        if self._frames_since_adjust < self.adjust_every:
+            return
+        self._frames_since_adjust = 0
+
+        fps = 1.0 / self._frame_time
+        if fps < self.target_fps * 0.95 and self.every_n < self.max_skip:
+            self.every_n += 1
+        elif fps > self.target_fps * 1.15 and self.every_n > 1:
+            self.every_n -= 1
+
+    def _measure(self, img, draw, now):
+        img = self.detector.find_hands(img, draw=draw)
+        landmarks, handedness = self.detector.norm_landmarks, self.detector.handedness
+
+        self._velocity = None
+        if self._last is not None:
+            t_prev, prev, prev_hands = self._last
+            # Velocity only when the same hands are visible in the same order
+            if now > t_prev and np.array_equal(prev_hands, handedness):
+                self._velocity = (landmarks - prev) / (now - t_prev)
+        self._last = (now, landmarks, handedness)
+
+        self.norm_landmarks, self.handedness = landmarks, handedness
+        self.measured = True
+        self.inferences += 1
+        self._frames_since_inference = 1
+        return img
+
+    def _predict(self, now):
+        t_last, landmarks, handedness = self._last
+        if self._velocity is not None:
+            landmarks = landmarks + self._velocity * (now - t_last)
+        self.norm_landmarks, self.handedness = landmarks, handedness
+        self.measured = False
+        self.predictions += 1
+        self._frames_since_inference += 1
+
+    @property
+    def raw_rgb_input(self):
+        return getattr(self.detector, "raw_rgb_input", False)
+
+    def find_hands(self, img, draw=True):
+        now = self.clock()
+        self._adapt(now)
+
+        due = self._frames_since_inference >= self.every_n
+        fast = self._speed() > self.motion_threshold
+        if self._last is None or due or fast:
+            return self._measure(img, draw, now)
+        self._predict(now)
+        return img
+
+    def find_arrays(self, img):
+        h, w = img.shape[:2]
+        return to_pixels(self.norm_landmarks, w, h), self.handedness
+
+    def find_positions(self, img, draw=False):
+        return to_positions(*self.find_arrays(img))
@@ -0,0 +1,133 @@
+# modules/inference_service.py
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from modules.hand_detector import HandDetector
+from modules.telemetry import RollingHistogram
+
+
+class _Request:
+    __slots__ = ("session", "image", "future", "t_submit")
+
+    def __init__(self, session, image):
+        self.session = session
+        self.image = image
+        self.future = Future()
+        self.t_submit = time.perf_counter()
+
+
+class InferenceService:
+    """
+    Hand inference shared by several streams.
+
+    submit() queues a frame (or ROI crop) and returns a Future of its
+    (norm_landmarks, handedness). Each detector of a pool of pool_size runs on its own thread
+    and takes the next queued request as soon as it is free, so N streams need pool_size
+    models instead of N and no request waits while a detector is idle.
+
+    detector_factory() must return an object with the detector protocol used here:
+    find_hands(img, draw=False) plus norm_landmarks / handedness attributes. Frames from
+    different streams go through the same detector, so real models must be created with
+    tracking between frames disabled (HandDetector(static_image_mode=True)), which runs palm
+    detection on every frame.
+
+    With affinity=True every session is served by one detector (session % pool_size) instead,
+    so a pool with a detector per session can keep tracking hands between frames.
+    """
+
+    def __init__(self, detector_factory, pool_size=2, affinity=False):
+        self.detectors = [detector_factory() for _ in range(pool_size)]
+        self.affinity = affinity
+
+        shared = queue.Queue()
+        self._queues = [queue.Queue() if affinity else shared for _ in self.detectors]
+        self._closed = False
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.wait = RollingHistogram()   # seconds from submit() until a detector picks the request up
+
+        self._threads = [threading.Thread(target=self._worker_loop, args=(det, q), name=f"inference-{i}",
+                                          daemon=True)
+                         for i, (det, q) in enumerate(zip(self.detectors, self._queues))]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, image, session=None):
+        request = _Request(session, image)
+        with self._lock:
+            if self._closed:
+                request.future.set_exception(RuntimeError("InferenceService is closed"))
+            elif self.affinity:
+                key = session if isinstance(session, int) else hash(session)
+                self._queues[key % len(self._queues)].put(request)
+            else:
+                self._queues[0].put(request)
+        return request.future
+
+    def infer(self, image, session=None, timeout=None):
+        """Blocking submit(): (norm_landmarks, handedness) of the image."""
+        return self.submit(image, session).result(timeout)
+
+    def _worker_loop(self, detector, requests):
+        while True:
+            request = requests.get()
+            if request is None:
+                break
+            with self._lock:
+                self.requests += 1
+                self.wait.add(time.perf_counter() - request.t_submit)
+            if not request.future.set_running_or_notify_cancel():
+                continue
+            try:
+                detector.find_hands(request.image, draw=False)
+                request.future.set_result((detector.norm_landmarks.copy(), detector.handedness.copy()))
+            except Exception as e:
+                request.future.set_exception(e)
+
+    def stats(self):
+        p50, p95, _ = self.wait.percentiles()
+        return {
+            "pool_size": len(self.detectors),
+            "affinity": self.affinity,
+            "requests": self.requests,
+            "wait_p50_ms": p50 * 1000,
+            "wait_p95_ms": p95 * 1000,
+        }
+
+    def close(self):
+        """Finish the queued requests and stop the threads."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            for requests in self._queues:
+                requests.put(None)  # behind every queued request
+        for t in self._threads:
+            t.join(timeout=2)
+
+
+class ServiceDetector(HandDetector):
+    """
+    HandDetector for one stream whose model runs on a shared InferenceService: the stream's own
+    inference_scale and roi_tracking apply before its frame (or crop) is submitted, and
+    find_hands() blocks until the service returns the landmarks. Drawing is not supported.
+    Takes BGR frames (the display frame, see FramePreprocessor).
+    """
+
+    def __init__(self, service, session=None, timeout=None, **options):
+        super().__init__(**options)
+        self.service = service
+        self.session = session
+        self.timeout = timeout
+
+    def warmup(self, background=True):
+        pass  # the service's detectors hold the model
+
+    def _run_model(self, img):
+        return self.service.infer(img, self.session, self.timeout)
+
+    def find_hands(self, img, draw=True):
+        return super().find_hands(img, draw=False)
@@ -0,0 +1,149 @@
+# modules/landmark_log.py
+import struct
+import time
+
+import numpy as np
+
+from modules.hand_features import NUM_LANDMARKS, empty_landmarks, to_pixels, to_positions
+
+
+MAGIC = b"VTLM"
+VERSION = 1
+HEADER = struct.Struct("<4sHH8x")  # magic, version, max_hands -> 16 bytes
+
+
+def record_dtype(max_hands):
+    """One frame: timestamp, hand count, handedness codes (-1 = empty slot), landmarks (x, y, z)."""
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("n_hands", "u1"),
+        ("handedness", "i1", (max_hands,)),
+        ("landmarks", "<f4", (max_hands, NUM_LANDMARKS, 3)),
+    ])
+
+
+class LandmarkLogWriter:
+    """
+    Appends fixed-size binary frame records to a landmark log file.
+    Landmarks are stored normalized, exactly as MediaPipe reports them for the image it was given.
+    """
+
+    def __init__(self, path, max_hands=2):
+        self.path = path
+        self.max_hands = max_hands
+        self.dtype = record_dtype(max_hands)
+        self._record = np.zeros(1, self.dtype)
+        self.frames = 0
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, max_hands))
+
+    def write(self, landmarks, handedness, timestamp=None):
+        """Append one frame of normalized (n_hands, 21, 3) landmarks and handedness codes."""
+        rec = self._record
+        n = min(len(handedness), self.max_hands)
+        rec["timestamp"] = time.time() if timestamp is None else timestamp
+        rec["n_hands"] = n
+        rec["handedness"] = -1
+        rec["landmarks"] = 0
+        rec["handedness"][0, :n] = handedness[:n]
+        rec["landmarks"][0, :n] = landmarks[:n]
+        self.file.write(self._record.tobytes())
+        self.frames += 1
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LandmarkLog:
+    """Read-only, memory-mapped view of a landmark log."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, version, max_hands = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a landmark log")
+        if version != VERSION:
+            raise ValueError(f"Unsupported landmark log version {version}")
+        self.path = path
+        self.max_hands = max_hands
+        self.records = np.memmap(path, dtype=record_dtype(max_hands), mode="r", offset=HEADER.size)
+
+    def __len__(self):
+        return len(self.records)
+
+    def frame(self, index):
+        """Return (timestamp, landmarks (n, 21, 3), handedness (n,)) of one frame."""
+        rec = self.records[index]
+        n = int(rec["n_hands"])
+        return float(rec["timestamp"]), rec["landmarks"][:n], rec["handedness"][:n]
+
+
+class LandmarkRecorder:
+    """Wraps a HandDetector and logs every processed frame."""
+
+    def __init__(self, detector, writer):
+        self.detector = detector
+        self.writer = writer
+
+    @property
+    def measured(self):
+        return self.detector.measured
+
+    @property
+    def raw_rgb_input(self):
+        return getattr(self.detector, "raw_rgb_input", False)
+
+    def find_hands(self, img, draw=True):
+        img = self.detector.find_hands(img, draw=draw)
+        self.norm_landmarks, self.handedness = self.detector.norm_landmarks, self.detector.handedness
+        self.writer.write(self.norm_landmarks, self.handedness)
+        return img
+
+    def find_arrays(self, img):
+        return self.detector.find_arrays(img)
+
+    def find_positions(self, img, draw=False):
+        return self.detector.find_positions(img, draw=draw)
+
+
+class ReplayDetector:
+    """
+    Drop-in replacement for HandDetector that replays a landmark log instead of running a model.
+    Each find_hands() call advances one frame; after the last frame no hands are reported
+    (or the log restarts when loop=True).
+    """
+
+    measured = True
+
+    def __init__(self, path, loop=False):
+        self.log = LandmarkLog(path)
+        self.loop = loop
+        self.index = 0
+        self.finished = len(self.log) == 0
+        self.norm_landmarks, self.handedness = empty_landmarks()
+
+    def find_hands(self, img, draw=True):
+        if self.index >= len(self.log):
+            if self.loop and len(self.log):
+                self.index = 0
+            else:
+                self.finished = True
+                self.norm_landmarks, self.handedness = empty_landmarks()
+                return img
+        _, self.norm_landmarks, self.handedness = self.log.frame(self.index)
+        self.index += 1
+        return img
+
+    def find_arrays(self, img):
+        h, w = img.shape[:2]
+        return to_pixels(self.norm_landmarks, w, h), self.handedness
+
+    def find_positions(self, img, draw=False):
+        return to_positions(*self.find_arrays(img))
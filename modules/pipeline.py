@@ -0,0 +1,200 @@
+# modules/pipeline.py
+import threading
+import time
+from collections import deque
+
+from modules.telemetry import FrameProfiler
+
+
+class LatestQueue:
+    """
+    Bounded queue that keeps only the newest items.
+    put() never blocks: when full, the oldest item is dropped, counted and passed to on_drop.
+    """
+
+    def __init__(self, maxsize=1, on_drop=None):
+        self.maxsize = maxsize
+        self.on_drop = on_drop
+        self.items = deque()
+        self.dropped = 0
+        self.closed = False
+        self._cond = threading.Condition()
+
+    def put(self, item):
+        dropped = None
+        with self._cond:
+            if len(self.items) >= self.maxsize:
+                dropped = self.items.popleft()
+                self.dropped += 1
+            self.items.append(item)
+            self._cond.notify()
+        if dropped is not None and self.on_drop is not None:
+            self.on_drop(dropped)
+
+    def get(self, timeout=None):
+        """Return the next item, or None once the queue is closed and empty (or on timeout)."""
+        with self._cond:
+            if not self.items and not self.closed:
+                self._cond.wait(timeout)
+            if not self.items:
+                return None
+            return self.items.popleft()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def drain(self):
+        """Remove and return every queued item."""
+        with self._cond:
+            items = list(self.items)
+            self.items.clear()
+        return items
+
+    def qsize(self):
+        return len(self.items)
+
+
+class Frame:
+    """A captured frame travelling through the pipeline."""
+
+    __slots__ = ("index", "image", "t_capture", "result")
+
+    def __init__(self, index, image, t_capture):
+        self.index = index
+        self.image = image
+        self.t_capture = t_capture
+        self.result = None
+
+
+class Pipeline:
+    """
+    Capture -> inference -> render pipeline.
+
+    capture() runs on its own thread and returns the next frame (or None when the source ends).
+    infer(image) runs on a worker thread and returns whatever render needs.
+    render(image, result) runs on the thread calling run() (cv2.imshow must stay on the main
+    thread) and returns False to stop.
+
+    Between stages only the newest frame is kept, so a slow stage makes the earlier one
+    drop stale frames instead of building up latency.
+
+    release(image), if given, is called exactly once for every captured image when the pipeline
+    is done with it: after it was rendered, dropped by a queue or left over at stop(). Capture
+    can reuse its buffers from then on.
+    """
+
+    def __init__(self, capture, infer, render, queue_size=1, profiler=None, release=None):
+        self.capture = capture
+        self.infer = infer
+        self.render = render
+        self.release = release
+
+        self.frames = LatestQueue(queue_size, on_drop=self._release)
+        self.results = LatestQueue(queue_size, on_drop=self._release)
+        # Stage timings; "latency" is capture-to-rendered (glass-to-glass minus display).
+        # "queue.frames" and "queue.results" gauges hold the depth each put() found: 0 while
+        # the next stage keeps up, queue_size when it is behind and a frame gets dropped.
+        self.profiler = profiler or FrameProfiler()
+
+        self.running = False
+        self._threads = []
+        self._t_start = None
+        self._rendered = 0
+
+    def _release(self, frame):
+        if self.release is not None:
+            self.release(frame.image)
+
+    def _capture_loop(self):
+        index = 0
+        while self.running:
+            t0 = time.perf_counter()
+            image = self.capture()
+            if image is None:
+                break
+            t1 = time.perf_counter()
+            self.profiler.record("capture", t1 - t0)
+            self.profiler.sample("queue.frames", self.frames.qsize())
+            self.frames.put(Frame(index, image, t1))
+            index += 1
+        self.frames.close()
+
+    def _inference_loop(self):
+        while self.running:
+            frame = self.frames.get(timeout=0.5)
+            if frame is None:
+                if self.frames.closed:
+                    break
+                continue
+            t0 = time.perf_counter()
+            frame.result = self.infer(frame.image)
+            self.profiler.record("inference", time.perf_counter() - t0)
+            self.profiler.sample("queue.results", self.results.qsize())
+            self.results.put(frame)
+        self.results.close()
+
+    def start(self):
+        self.running = True
+        self._t_start = time.perf_counter()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="inference", daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+
+    def stop(self):
+        self.running = False
+        self.frames.close()
+        self.results.close()
+        # Frames still queued are never rendered; releasing them also wakes a capture()
+        # waiting for a free buffer
+        for frame in self.frames.drain() + self.results.drain():
+            self._release(frame)
+        for t in self._threads:
+            t.join(timeout=2)
+        for frame in self.frames.drain() + self.results.drain():
+            self._release(frame)
+        self._threads = []
+
+    def run(self, max_frames=None):
+        """Run until the source ends, render() returns False or max_frames are rendered."""
+        self.start()
+        try:
+            while self.running:
+                frame = self.results.get(timeout=0.5)
+                if frame is None:
+                    if self.results.closed:
+                        break
+                    continue
+                t0 = time.perf_counter()
+                try:
+                    keep_going = self.render(frame.image, frame.result)
+                finally:
+                    self._release(frame)
+                t1 = time.perf_counter()
+                self.profiler.record("render", t1 - t0)
+                self.profiler.record("latency", t1 - frame.t_capture)
+                self._rendered += 1
+                if keep_going is False or (max_frames and self._rendered >= max_frames):
+                    break
+        finally:
+            self.stop()
+        return self.report()
+
+    def report(self):
+        """Per-stage latency, queue depths (mean and max seen by put) and the rendered FPS so far."""
+        elapsed = time.perf_counter() - self._t_start if self._t_start else 0.0
+        gauges = self.profiler.gauge_summary()
+        queues = {}
+        for name, queue in (("frames", self.frames), ("results", self.results)):
+            depth = gauges.get("queue." + name, {"mean": 0.0, "max": 0.0})
+            queues[name] = {"depth_mean": depth["mean"], "depth_max": depth["max"], "dropped": queue.dropped}
+        return {
+            "fps": self._rendered / elapsed if elapsed > 0 else 0.0,
+            "frames": self._rendered,
+            "stages": self.profiler.summary(),
+            "queues": queues,
+        }
@@ -0,0 +1,71 @@
+# modules/preprocess.py
+import threading
+
+import cv2
+import numpy as np
+
+
+class FramePreprocessor:
+    """
+    Turns a camera frame into the mirrored BGR display frame and the model input, writing into
+    preallocated buffers: after the first frame of a given size, process() allocates nothing.
+
+    With rgb=True the model input is the unmirrored frame converted to RGB, taken straight from
+    the camera frame so it needs no flip of its own; the detector (HandDetector with
+    raw_rgb_input=True) mirrors the landmarks arithmetically instead. Otherwise the model input
+    is the display frame itself.
+
+    With slots=1 the one buffer set is overwritten by every call, for loops that are done with a
+    frame before preparing the next. With more slots the buffer sets are lent out, for frames in
+    flight between pipeline threads: process() takes a free set, waiting while every set is in
+    use, and the frame stays valid until release() hands its set back.
+    """
+
+    def __init__(self, rgb=False, slots=1):
+        self.rgb = rgb
+        self.slots = slots
+        self._buffers = []  # (display, rgb or None) per slot
+        self._slot_of = {}  # id(display) -> slot
+        self._free = []
+        self._shape = None
+        self._cond = threading.Condition()
+
+    @classmethod
+    def for_detector(cls, detector, slots=1):
+        return cls(rgb=getattr(detector, "raw_rgb_input", False), slots=slots)
+
+    def _allocate(self, frame):
+        # Sets still lent out from the previous size are dropped when released
+        self._buffers = [(np.empty_like(frame), np.empty_like(frame) if self.rgb else None)
+                         for _ in range(self.slots)]
+        self._slot_of = {id(display): i for i, (display, _) in enumerate(self._buffers)}
+        self._free = list(range(self.slots))
+        self._shape = frame.shape
+
+    def _acquire(self, frame):
+        with self._cond:
+            if frame.shape != self._shape:
+                self._allocate(frame)
+            if self.slots == 1:
+                return self._buffers[0]
+            while not self._free:
+                self._cond.wait()
+            return self._buffers[self._free.pop()]
+
+    def release(self, frame):
+        """Hand back the buffers of a (display, model input) pair returned by process()."""
+        with self._cond:
+            slot = self._slot_of.get(id(frame[0]))
+            if slot is not None and self.slots > 1 and slot not in self._free:
+                self._free.append(slot)
+                self._cond.notify()
+
+    def process(self, frame):
+        """Returns (mirrored BGR display frame, model input)."""
+        display, rgb = self._acquire(frame)
+
+        cv2.flip(frame, 1, dst=display)
+        if rgb is None:
+            return display, display
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+        return display, rgb
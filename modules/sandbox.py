@@ -0,0 +1,151 @@
+# modules/sandbox.py
+import time
+
+import cv2
+
+from modules.gestures import GestureEngine
+from modules.hand_features import mirror_handedness
+from modules.shape_utils import ShapeManager
+
+
+class Sandbox:
+    """
+    Gesture state of one shape sandbox session.
+    Call update() once per frame with the mirrored frame and the hand arrays found in it
+    (see HandDetector.find_arrays). Hand input goes through a GestureEngine; the sandbox
+    only reacts to its events.
+    """
+
+    def __init__(self, width=1280, height=720, require_measured_pinch=False):
+        """
+        require_measured_pinch: when landmarks are predicted instead of measured
+        (see InferenceScheduler), pinches only start and end on measured frames.
+        """
+        self.shapes = ShapeManager(width, height)
+        self.gestures = GestureEngine(require_measured=require_measured_pinch)
+
+        self.button_cooldown = 0.8  # seconds between two button presses
+        self.button_ready_at = 0.0
+        self.draw_cooldown_start = None
+        self.draw_cooldown_duration = 3  # seconds
+
+        # Zoom state
+        self.zoom_shape = None
+        self.zoom_base = None  # zoom ratio when zoom_shape was grabbed by both hands
+        self.original_size = None
+
+        self.events = []  # GestureEvents of the last processed frame
+        self._handlers = {
+            "click": self._on_click,
+            "pinch_move": self._on_pinch_move,
+            "pinch_end": self._on_pinch_end,
+            "zoom_start": self._on_zoom,
+            "zoom": self._on_zoom,
+            "zoom_end": self._on_zoom_end,
+        }
+
+    def update(self, img, landmarks, handedness, measured=True, t=None):
+        self.process(img, landmarks, handedness, measured, t)
+        return self.render(img)
+
+    def process(self, img, landmarks, handedness, measured=True, t=None):
+        """Gesture logic for one frame; draws the gesture feedback (pinch dots, zoom line) onto img."""
+        now = time.perf_counter() if t is None else t
+
+        # Handle draw cooldown countdown
+        if self.draw_cooldown_start is not None:
+            elapsed = now - self.draw_cooldown_start
+            if elapsed < self.draw_cooldown_duration:
+                remaining = int(self.draw_cooldown_duration - elapsed + 1)
+                cv2.putText(img, f"🖊️ Drawing starts in {remaining}s", (420, 360),
+                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 3)
+            else:
+                # Start drawing after cooldown completes
+                self.shapes.start_draw()
+                self.draw_cooldown_start = None
+
+        # Fix mirroring issue
+        handedness = mirror_handedness(handedness)
+        self.events = self.gestures.update(landmarks, handedness, now, measured)
+        for event in self.events:
+            handler = self._handlers.get(event.type)
+            if handler is not None:
+                handler(img, event)
+
+    def _on_click(self, img, event):
+        shapes = self.shapes
+        if shapes.drawing or self.draw_cooldown_start is not None or event.t < self.button_ready_at:
+            return
+        clicked = shapes.check_button_click(*event.pos)
+        if clicked:
+            if clicked == "draw":
+                self.draw_cooldown_start = event.t  # start 3s countdown
+            else:
+                shapes.add_shape(clicked)
+            self.button_ready_at = event.t + self.button_cooldown
+
+    def _on_pinch_move(self, img, event):
+        shapes = self.shapes
+        label, center = event.hand, event.pos
+        cv2.circle(img, center, 12, (0, 255, 255), -1)
+
+        # Drawing mode active
+        if shapes.drawing:
+            shapes.add_draw_point(center, event.t)
+            return
+
+        # Move shapes
+        selected = getattr(shapes, f"selected_{label}")
+        if selected is None:
+            shape = shapes.select_shape(*center)
+            if shape:
+                setattr(shapes, f"selected_{label}", shape)
+                setattr(shapes, f"last_{label}_pos", center)
+        else:
+            last_pos = getattr(shapes, f"last_{label}_pos")
+            new_pos = shapes.move_shape(selected, *center, last_pos)
+            setattr(shapes, f"last_{label}_pos", new_pos)
+            if shapes.remove_shape_if_in_bin(selected):
+                setattr(shapes, f"selected_{label}", None)
+
+    def _on_pinch_end(self, img, event):
+        shapes = self.shapes
+        # If drawing and pinch released → finish
+        if shapes.drawing:
+            shapes.finish_draw()
+        setattr(shapes, f"selected_{event.hand}", None)
+        setattr(shapes, f"last_{event.hand}_pos", None)
+
+    def _on_zoom(self, img, event):
+        # Two-hand pinch only zooms while both hands hold *the same shape*
+        shape = self.shapes.selected_left
+        if shape is None or shape is not self.shapes.selected_right or "size" not in shape:
+            self._on_zoom_end(img, event)
+            return
+        if shape is not self.zoom_shape:
+            self.zoom_shape = shape
+            self.zoom_base = event.value
+            self.original_size = shape["size"]
+
+        left_center, right_center = event.pos
+        cv2.line(img, left_center, right_center, (255, 255, 0), 3)
+        scale = event.value / self.zoom_base
+        if event.type == "zoom" and scale != 1.0:
+            new_size = int(self.original_size * scale)
+            self.shapes.resize_shape(shape, max(30, min(new_size, 400)))  # clamp
+            cv2.putText(img, f"Zoom: {int(scale * 100)}%", (40, 120),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 3)
+
+    def _on_zoom_end(self, img, event):
+        self.zoom_shape = None
+        self.zoom_base = None
+        self.original_size = None
+
+    def render(self, img):
+        """Draw the shapes and UI on top of the frame."""
+        img = self.shapes.draw_ui(img)
+        if self.shapes.ui_detail == 0:
+            return img
+        cv2.putText(img, "Pinch to Add / Move / Draw / Delete | Two-Hand Pinch = Resize", (40, 700),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        return img
@@ -0,0 +1,428 @@
+# modules/scene_store.py
+"""
+Persistent scene: an append-only operation journal plus periodic columnar snapshots.
+
+A store directory holds
+    snapshot-NNNNNN/   the scene at the start of journal NNNNNN, one .npy file per column,
+                       complete once meta.json exists (it is written last)
+    journal-NNNNNN.vtj operations after that snapshot
+
+Opening a store memory-maps the newest complete snapshot and replays the journals from its
+generation on. Compaction writes snapshot N+1 from the writer thread's copy of the scene,
+starts journal N+1 and only then deletes generation N, so a crash at any point leaves a
+complete snapshot and every journal written since.
+
+Journal records are RECORD (op, shape type, id, x, y, size, color) = 21 bytes; a stroke
+record is followed by `size` (x, y) int32 points. A torn record at the end of a journal
+(crash while writing) is dropped.
+"""
+import json
+import os
+import queue
+import shutil
+import struct
+import sys
+import threading
+
+import numpy as np
+
+
+MAGIC = b"VTSJ"
+VERSION = 1
+HEADER = struct.Struct("<4sH2x")
+RECORD = struct.Struct("<BBIiiiBBB")
+
+ADD, MOVE, RESIZE, DELETE, STROKE = range(5)
+OPS = {"add": ADD, "move": MOVE, "resize": RESIZE, "delete": DELETE}
+SHAPE_TYPES = ("square", "circle", "triangle", "star", "pentagon", "hexagon", "draw")
+TYPE_CODES = {name: i for i, name in enumerate(SHAPE_TYPES)}
+DRAW = TYPE_CODES["draw"]
+
+_COMPACT = object()
+_CLOSE = object()
+
+# Snapshot columns, one row per shape in draw order. Strokes keep x/y = their offset,
+# size = their point count, and their untranslated points in
+# points[point_offsets[i]:point_offsets[i + 1]] together with the min / max / sum of them.
+COLUMNS = ("ids", "types", "pos", "sizes", "colors", "point_offsets", "points",
+           "stroke_min", "stroke_max", "stroke_sum")
+
+
+def _journal_path(root, gen):
+    return os.path.join(root, f"journal-{gen:06d}.vtj")
+
+
+def _snapshot_path(root, gen):
+    return os.path.join(root, f"snapshot-{gen:06d}")
+
+
+def _generations(root, prefix):
+    gens = []
+    for name in os.listdir(root):
+        if name.startswith(prefix):
+            stem = name[len(prefix):].split(".")[0]
+            if stem.isdigit():
+                gens.append(int(stem))
+    return sorted(gens)
+
+
+def _apply(scene, op, type_code, shape_id, x, y, size, color, raw=None, stats=None):
+    """Apply one operation to a scene dict: id -> [type, x, y, size, color, raw points, stats]."""
+    if op == ADD or op == STROKE:
+        scene[shape_id] = [type_code, x, y, size, color, raw, stats]
+    elif op == DELETE:
+        scene.pop(shape_id, None)
+    else:
+        entry = scene.get(shape_id)
+        if entry is None:
+            return
+        if op == MOVE:
+            entry[1], entry[2] = x, y
+        elif op == RESIZE:
+            entry[3] = size
+
+
+def read_journal(path, scene):
+    """Replay a journal into `scene`; returns (length of its valid part in bytes, operations)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        return 0, 0
+    magic, version = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a scene journal")
+    pos = HEADER.size
+    count = 0
+    while pos + RECORD.size <= len(data):
+        op, type_code, shape_id, x, y, size, b, g, r = RECORD.unpack_from(data, pos)
+        end = pos + RECORD.size
+        raw = None
+        if op == STROKE:
+            if end + size * 8 > len(data):
+                break
+            raw = np.frombuffer(data, np.int32, size * 2, end).reshape(-1, 2)
+            end += size * 8
+        elif op > STROKE:
+            break
+        _apply(scene, op, type_code, shape_id, x, y, size, (b, g, r), raw)
+        pos = end
+        count += 1
+    return pos, count
+
+
+def _encode(item):
+    op, type_code, shape_id, x, y, size, color, raw = item
+    record = RECORD.pack(op, type_code, shape_id, x, y, size, *color)
+    if raw is None:
+        return record
+    return record + np.ascontiguousarray(raw, "<i4").tobytes()
+
+
+def coalesce(ops):
+    """
+    Drop moves and resizes that a later one of the same shape overrides before any other
+    operation on it; a drag then costs one journal record per batch instead of one per frame.
+    """
+    out = []
+    pending = {}  # (op, id) -> index in out
+    for item in ops:
+        op, shape_id = item[0], item[2]
+        if op == MOVE or op == RESIZE:
+            index = pending.get((op, shape_id))
+            if index is not None:
+                out[index] = item
+                continue
+            pending[(op, shape_id)] = len(out)
+        else:
+            pending.pop((MOVE, shape_id), None)
+            pending.pop((RESIZE, shape_id), None)
+        out.append(item)
+    return out
+
+
+class SceneStore:
+    """
+    Keeps a ShapeManager's scene on disk.
+
+        store = SceneStore("scene/")
+        store.restore(shapes)   # load the saved scene into the ShapeManager
+        store.attach(shapes)    # journal every change from now on
+        ...
+        store.close()           # flush, compact and stop the writer
+
+    The frame loop only puts a small tuple on a queue per change. A writer thread appends the
+    operations to the journal (coalescing drags, flushing once per batch) and keeps its own
+    copy of the scene, from which it writes a snapshot every `compact_every` operations, on
+    compact() and on close(). The frame loop never waits for the disk.
+    """
+
+    def __init__(self, path, compact_every=20000, durable=False):
+        """durable: fsync the journal after every batch (survives power loss, not just crashes)."""
+        self.path = path
+        self.compact_every = compact_every
+        self.durable = durable
+        os.makedirs(path, exist_ok=True)
+
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._journal = None
+        self._manager = None
+        self.ops_written = 0
+        self.compactions = 0
+        self.error = None  # exception that stopped the writer thread
+        self._error_logged = False
+        self._ops_since_compact = 0  # journaled operations not in a snapshot yet
+        self._load()
+
+    # ------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------
+    def _load(self):
+        snapshots = [g for g in _generations(self.path, "snapshot-")
+                     if os.path.exists(os.path.join(_snapshot_path(self.path, g), "meta.json"))]
+        base = snapshots[-1] if snapshots else 0
+        self.generation = base
+        self._scene = self._load_snapshot(base) if snapshots else {}
+
+        self._journal_length = 0  # valid bytes of the newest journal, 0 = start a new one
+        for gen in _generations(self.path, "journal-"):
+            if gen >= base:
+                self._journal_length, ops = read_journal(_journal_path(self.path, gen), self._scene)
+                self._ops_since_compact += ops
+                self.generation = gen
+
+    def _load_snapshot(self, gen):
+        root = _snapshot_path(self.path, gen)
+        cols = {name: np.load(os.path.join(root, name + ".npy"), mmap_mode="r") for name in COLUMNS}
+        n = len(cols["ids"])
+        if not n:
+            return {}
+        offsets = cols["point_offsets"]
+        points = cols["points"].view(np.ndarray)  # still file-backed; slicing a memmap costs ~5 us more
+        types = cols["types"].tolist()
+        is_stroke = np.asarray(cols["types"]) == DRAW
+        # Point slices and bounds only for strokes; the points themselves stay on disk until drawn
+        raws = [None] * n
+        stats = [None] * n
+        rows = np.flatnonzero(is_stroke).tolist()
+        if rows:
+            # Column by column: tolist() of an (n, 2) array would build a short-lived list per row
+            starts, ends = offsets[:-1][is_stroke].tolist(), offsets[1:][is_stroke].tolist()
+            lo = zip(*cols["stroke_min"][is_stroke].T.tolist())
+            hi = zip(*cols["stroke_max"][is_stroke].T.tolist())
+            total = zip(*cols["stroke_sum"][is_stroke].T.tolist())
+            for i, start, end, stroke_lo, stroke_hi, stroke_total in zip(rows, starts, ends, lo, hi, total):
+                raws[i] = points[start:end]
+                if end > start:
+                    stats[i] = (stroke_lo, stroke_hi, stroke_total)
+        xs, ys = cols["pos"].T.tolist()
+        return {
+            shape_id: [t, x, y, size, color, raw, st]
+            for shape_id, t, x, y, size, color, raw, st in zip(
+                cols["ids"].tolist(), types, xs, ys, cols["sizes"].tolist(), zip(*cols["colors"].T.tolist()),
+                raws, stats)
+        }
+
+    def __len__(self):
+        return len(self._scene)
+
+    def restore(self, manager):
+        """Replace the ShapeManager's scene with the stored one; returns the number of shapes."""
+        from modules.stroke import Stroke
+
+        shapes, bboxes = [], []
+        for shape_id, (type_code, x, y, size, color, raw, stats) in self._scene.items():
+            if type_code == DRAW:
+                stroke = Stroke.from_raw(raw, (x, y), stats)
+                shapes.append({"type": "draw", "points": stroke, "color": color, "id": shape_id})
+                bboxes.append(stroke.bbox())
+            else:
+                shapes.append({"x": x, "y": y, "size": size, "color": color, "type": SHAPE_TYPES[type_code],
+                               "id": shape_id})
+                bboxes.append((x, y, x + size, y + size))
+        manager.load_shapes(shapes, bboxes)
+        return len(shapes)
+
+    # ------------------------------------------------------------
+    # Journaling (frame loop side)
+    # ------------------------------------------------------------
+    def attach(self, manager):
+        """Journal every change of the ShapeManager from now on (starts the writer thread)."""
+        if self._thread is not None:
+            raise RuntimeError("SceneStore is already attached")
+        self._open_journal()
+        self._manager = manager
+        manager.observer = self.record
+        self._thread = threading.Thread(target=self._run, name="scene-store", daemon=True)
+        self._thread.start()
+
+    def record(self, op, shape):
+        """
+        ShapeManager observer: queue one operation. Only copies the values it needs.
+        Once the writer thread has failed, prints its error (once) and stops journaling; the
+        frame loop carries on and close() and stats() report the error.
+        """
+        if self.error is not None:
+            self._detach()
+            if not self._error_logged:
+                self._error_logged = True
+                print(f"Scene journal {self.path} stopped, changes are no longer saved: {self.error!r}",
+                      file=sys.stderr)
+            return
+        code = OPS[op]
+        shape_id = shape["id"]
+        if code == DELETE:
+            self._queue.put((DELETE, 0, shape_id, 0, 0, 0, (0, 0, 0), None))
+            return
+        if shape["type"] == "draw":
+            stroke = shape["points"]
+            x, y = stroke.offset
+            if code == ADD:
+                raw = stroke.raw.copy()
+                self._queue.put((STROKE, DRAW, shape_id, x, y, len(raw), shape["color"], raw))
+                return
+            self._queue.put((code, DRAW, shape_id, x, y, 0, (0, 0, 0), None))
+            return
+        self._queue.put((code, TYPE_CODES[shape["type"]], shape_id, int(shape["x"]), int(shape["y"]),
+                         int(shape["size"]), shape["color"] if code == ADD else (0, 0, 0), None))
+
+    def compact(self):
+        """Ask the writer thread to write a snapshot now."""
+        self._queue.put(_COMPACT)
+
+    def _detach(self):
+        if self._manager is not None and self._manager.observer == self.record:
+            self._manager.observer = None
+
+    def close(self):
+        """
+        Write out everything queued, compact if anything changed, and stop the writer.
+        Raises the writer thread's error, if it failed.
+        """
+        if self._thread is None:
+            return
+        self._detach()
+        self._queue.put(_CLOSE)
+        self._thread.join()
+        self._thread = None
+        if self.error is not None:
+            raise self.error
+
+    # ------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------
+    def _open_journal(self):
+        path = _journal_path(self.path, self.generation)
+        if self._journal_length:
+            # Continue the newest journal, cutting off a torn last record
+            self._journal = open(path, "r+b")
+            self._journal.truncate(self._journal_length)
+            self._journal.seek(0, os.SEEK_END)
+        else:
+            self._journal = open(path, "wb")
+            self._journal.write(HEADER.pack(MAGIC, VERSION))
+            self._journal.flush()
+        self._journal_length = 0
+
+    def _run(self):
+        try:
+            while True:
+                batch = [self._queue.get()]
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                ops = [item for item in batch if item is not _COMPACT and item is not _CLOSE]
+                if ops:
+                    self._write(coalesce(ops))
+                stop = _CLOSE in batch
+                if (_COMPACT in batch or self._ops_since_compact >= self.compact_every
+                        or (stop and self._ops_since_compact)):
+                    self._compact()
+                if stop:
+                    break
+        except Exception as e:  # reported by close()
+            self.error = e
+        finally:
+            self._journal.close()
+
+    def _write(self, ops):
+        self._journal.write(b"".join(_encode(item) for item in ops))
+        self._journal.flush()
+        if self.durable:
+            os.fsync(self._journal.fileno())
+        for op, type_code, shape_id, x, y, size, color, raw in ops:
+            _apply(self._scene, op, type_code, shape_id, x, y, size, color, raw)
+        self.ops_written += len(ops)
+        self._ops_since_compact += len(ops)
+
+    def _compact(self):
+        gen = self.generation + 1
+        self._write_snapshot(_snapshot_path(self.path, gen))
+        self._journal.close()
+        self.generation = gen
+        self._open_journal()
+        # Generation gen is complete: everything older is redundant
+        for old in _generations(self.path, "snapshot-"):
+            if old < gen:
+                shutil.rmtree(_snapshot_path(self.path, old), ignore_errors=True)
+        for old in _generations(self.path, "journal-"):
+            if old < gen:
+                try:
+                    os.remove(_journal_path(self.path, old))
+                except OSError:
+                    pass
+        self.compactions += 1
+        self._ops_since_compact = 0
+
+    def _write_snapshot(self, root):
+        os.makedirs(root, exist_ok=True)
+        scene = self._scene
+        n = len(scene)
+        entries = list(scene.values())
+        types = np.array([e[0] for e in entries], np.uint8).reshape(n)
+        is_stroke = types == DRAW
+        strokes = [e[5] for e in entries if e[0] == DRAW]
+        lengths = np.zeros(n, np.int64)
+        lengths[is_stroke] = [len(raw) for raw in strokes]
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        points = np.concatenate(strokes) if strokes else np.zeros((0, 2), np.int32)
+
+        # Bounds of every stroke in one pass over the flat buffer
+        stroke_min = np.zeros((n, 2), np.int32)
+        stroke_max = np.zeros((n, 2), np.int32)
+        stroke_sum = np.zeros((n, 2), np.int64)
+        # (reduceat needs non-empty segments: empty strokes keep zeros and are told apart by length)
+        has_points = is_stroke & (lengths > 0)
+        if has_points.any():
+            starts = offsets[:-1][has_points]
+            stroke_min[has_points] = np.minimum.reduceat(points, starts, axis=0)
+            stroke_max[has_points] = np.maximum.reduceat(points, starts, axis=0)
+            stroke_sum[has_points] = np.add.reduceat(points.astype(np.int64), starts, axis=0)
+
+        cols = {
+            "ids": np.fromiter(scene.keys(), np.uint32, n),
+            "types": types,
+            "pos": np.array([(e[1], e[2]) for e in entries], np.int32).reshape(n, 2),
+            "sizes": np.array([e[3] for e in entries], np.int32).reshape(n),
+            "colors": np.array([e[4] for e in entries], np.uint8).reshape(n, 3),
+            "point_offsets": offsets,
+            "points": points.astype(np.int32, copy=False),
+            "stroke_min": stroke_min,
+            "stroke_max": stroke_max,
+            "stroke_sum": stroke_sum,
+        }
+        for name, array in cols.items():
+            np.save(os.path.join(root, name + ".npy"), array)
+        with open(os.path.join(root, "meta.json"), "w") as f:
+            json.dump({"version": VERSION, "shapes": n, "points": int(len(points))}, f)
+
+    def stats(self):
+        return {
+            "shapes": len(self._scene),
+            "generation": self.generation,
+            "ops_written": self.ops_written,
+            "compactions": self.compactions,
+            "error": None if self.error is None else repr(self.error),
+        }
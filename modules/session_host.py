@@ -0,0 +1,265 @@
+# modules/session_host.py
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from modules.frame_source import NullSink, RecordingSink, open_source
+from modules.preprocess import FramePreprocessor
+from modules.sandbox import Sandbox
+from modules.telemetry import FrameProfiler
+
+
+WIDTH, HEIGHT = 1280, 720
+
+# Keys of a session spec and their defaults; a spec is a plain dict so it can be sent to a worker
+SESSION_DEFAULTS = {
+    "source": None,             # see open_source(); None = camera 0, or synthetic frames when replaying
+    "loop": False,
+    "max_frames": None,
+    "replay_landmarks": None,
+    "inference_scale": 1.0,
+    "roi": False,
+    "infer_every": 1,
+    "target_fps": None,
+    "smooth_strokes": True,
+    "record": None,
+    "frame_budget": None,       # seconds; step quality down and up to hold it (see QualityGovernor)
+}
+
+
+def open_session(spec, detector=None):
+    """
+    Build the (source, detector, sandbox) of one session from a spec dict.
+    detector: use this instead of building one (e.g. a ServiceDetector of a shared service).
+    """
+    spec = {**SESSION_DEFAULTS, **spec}
+    source_spec = spec["source"]
+    if spec["replay_landmarks"] and detector is None:
+        from modules.landmark_log import LandmarkLog, ReplayDetector
+        # Without an explicit source, draw the replayed gestures on one synthetic frame per log entry
+        if source_spec is None:
+            source_spec = f"synthetic:{len(LandmarkLog(spec['replay_landmarks']))}"
+        detector = ReplayDetector(spec["replay_landmarks"])
+    elif detector is None:
+        from modules.hand_detector import HandDetector
+        detector = HandDetector(detection_conf=0.7, track_conf=0.7,
+                                inference_scale=spec["inference_scale"], roi_tracking=spec["roi"],
+                                raw_rgb_input=True)
+        # Load the model while the camera opens
+        detector.warmup()
+    source = open_source(source_spec or "0", WIDTH, HEIGHT, loop=spec["loop"])
+
+    scheduled = spec["infer_every"] > 1 or spec["target_fps"] is not None
+    if scheduled:
+        from modules.inference_scheduler import InferenceScheduler
+        detector = InferenceScheduler(detector, every_n=spec["infer_every"], target_fps=spec["target_fps"])
+
+    sandbox = Sandbox(WIDTH, HEIGHT, require_measured_pinch=scheduled)
+    sandbox.shapes.stroke_params["smoothing"] = spec["smooth_strokes"]
+    return source, detector, sandbox
+
+
+def available_cores():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def pin_to_core(core):
+    """Pin the calling process to one core; returns False where the OS does not support it."""
+    if core is None or not hasattr(os, "sched_setaffinity"):
+        return False
+    try:
+        os.sched_setaffinity(0, {core})
+    except OSError:
+        return False
+    return True
+
+
+def run_session(index, spec, core=None, detector=None):
+    """
+    Worker entry point: run one headless session to the end of its source (or max_frames)
+    and return its metrics. Everything is built inside the worker; nothing is shared.
+    """
+    started = time.perf_counter()
+    pinned = pin_to_core(core)
+    if core is not None:
+        # One session per core: keep OpenCV from spreading each session over every core
+        cv2.setNumThreads(1)
+
+    source, detector, sandbox = open_session(spec, detector)
+    preprocessor = FramePreprocessor.for_detector(detector)
+    sink = RecordingSink(spec["record"]) if spec.get("record") else NullSink()
+    profiler = FrameProfiler(started=started)
+    max_frames = spec.get("max_frames")
+    governor = None
+    if spec.get("frame_budget"):
+        from modules.governor import QualityGovernor
+        governor = QualityGovernor(spec["frame_budget"], detector, sandbox.shapes)
+
+    frames = 0
+    t_start = time.perf_counter()
+    try:
+        while True:
+            profiler.start_frame()
+            success, frame = source.read()
+            if not success:
+                break
+            t_read = time.perf_counter()
+            img, model_input = preprocessor.process(frame)
+            detector.find_hands(model_input, draw=False)
+            landmarks, handedness = detector.find_arrays(img)
+            sandbox.update(img, landmarks, handedness, detector.measured)
+            sink.show(img)
+            profiler.end_frame()
+            if governor is not None:
+                governor.update(time.perf_counter() - t_read)
+            if not frames:
+                profiler.mark("first_frame")
+            frames += 1
+            if max_frames and frames >= max_frames:
+                break
+    finally:
+        source.release()
+        sink.close()
+    elapsed = time.perf_counter() - t_start
+
+    return {
+        "session": index,
+        "pid": os.getpid(),
+        "core": core if pinned else None,
+        "frames": frames,
+        "seconds": elapsed,
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+        "frame_ms": profiler.summary().get("frame", {}),
+        "time_to_first_frame": profiler.marks.get("first_frame"),
+        "quality": governor.stats() if governor is not None else None,
+    }
+
+
+def guarded_session(index, spec, core=None, detector=None):
+    """
+    run_session() that reports a failure instead of raising it, so one broken session does not
+    take the other sessions' reports down with it. The traceback goes to stderr.
+    """
+    try:
+        return run_session(index, spec, core, detector)
+    except Exception as e:
+        print(f"Session {index} failed:", file=sys.stderr)
+        traceback.print_exc()
+        return {
+            "session": index,
+            "pid": os.getpid(),
+            "core": None,
+            "frames": 0,
+            "seconds": 0.0,
+            "fps": 0.0,
+            "frame_ms": {},
+            "time_to_first_frame": None,
+            "quality": None,
+            "error": repr(e),
+        }
+
+
+def aggregate(reports, wall_seconds=None):
+    """
+    Totals over all sessions: summed throughput, and the frame-time spread across sessions.
+    wall_fps counts every session's frames against the host's wall-clock time (process start-up included).
+    Failed sessions (see guarded_session) are counted but left out of the spread.
+    """
+    ok = [r for r in reports if not r.get("error")]
+    frame_ms = [r["frame_ms"] for r in ok if r["frame_ms"]]
+    frames = sum(r["frames"] for r in reports)
+    return {
+        "sessions": len(reports),
+        "failed": len(reports) - len(ok),
+        "frames": frames,
+        "total_fps": sum(r["fps"] for r in reports),
+        "wall_fps": frames / wall_seconds if wall_seconds else 0.0,
+        "min_fps": min((r["fps"] for r in ok), default=0.0),
+        "mean_frame_ms": sum(s["mean_ms"] for s in frame_ms) / len(frame_ms) if frame_ms else 0.0,
+        "worst_p95_ms": max((s["p95_ms"] for s in frame_ms), default=0.0),
+        "worst_p99_ms": max((s["p99_ms"] for s in frame_ms), default=0.0),
+    }
+
+
+class SessionHost:
+    """
+    Runs independent sessions in a process pool, one process per session, each pinned to a
+    core (round-robin over the cores this process may use). Every session owns its source,
+    detector and shapes, so throughput scales with cores instead of sharing one GIL.
+
+    With inference_pool > 0 the sessions instead run as threads of this process and share an
+    InferenceService of that many detectors, trading isolation for fewer model instances.
+    Each session keeps its own inference scale and ROI tracking.
+    """
+
+    def __init__(self, specs, processes=None, pin_cores=True, inference_pool=0):
+        self.specs = [{**SESSION_DEFAULTS, **spec} for spec in specs]
+        self.processes = processes or len(self.specs)
+        self.pin_cores = pin_cores
+        self.inference_pool = inference_pool
+        self.inference_stats = None
+
+    def run(self):
+        """Run every session to completion; returns (per-session reports, aggregate)."""
+        if self.inference_pool:
+            return self._run_shared()
+        cores = available_cores()
+        jobs = [(i, spec, cores[i % len(cores)] if self.pin_cores else None)
+                for i, spec in enumerate(self.specs)]
+        # spawn: MediaPipe and OpenCV keep threads that do not survive fork()
+        ctx = multiprocessing.get_context("spawn")
+        t0 = time.perf_counter()
+        with ctx.Pool(self.processes) as pool:
+            reports = pool.starmap(guarded_session, jobs)
+        return reports, aggregate(reports, time.perf_counter() - t0)
+
+    def _run_shared(self):
+        from modules.hand_detector import HandDetector
+        from modules.inference_service import InferenceService, ServiceDetector
+
+        # Detectors shared between streams cannot track hands from one frame to the next and run
+        # palm detection on every frame; with a detector per session each keeps its own stream
+        dedicated = self.inference_pool >= len(self.specs)
+        service = InferenceService(
+            lambda: HandDetector(detection_conf=0.7, track_conf=0.7, static_image_mode=not dedicated),
+            pool_size=self.inference_pool, affinity=dedicated)
+
+        def session(job):
+            index, spec = job
+            detector = ServiceDetector(service, index, inference_scale=spec["inference_scale"],
+                                       roi_tracking=spec["roi"])
+            return guarded_session(index, spec, detector=detector)
+
+        t0 = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(len(self.specs)) as pool:
+                reports = list(pool.map(session, enumerate(self.specs)))
+        finally:
+            service.close()
+        self.inference_stats = service.stats()
+        return reports, aggregate(reports, time.perf_counter() - t0)
+
+    @staticmethod
+    def print_report(reports, totals):
+        for r in reports:
+            if r.get("error"):
+                print(f"  session {r['session']:<3} failed: {r['error']}")
+                continue
+            core = "-" if r["core"] is None else r["core"]
+            ttff = r["time_to_first_frame"]
+            print(f"  session {r['session']:<3} core {core:<3} {r['frames']:>6} frames  "
+                  f"{r['fps']:7.1f} FPS  p95 {r['frame_ms'].get('p95_ms', 0.0):6.2f} ms  "
+                  f"first frame {'-' if ttff is None else f'{ttff * 1000:.0f} ms'}"
+                  + (f"  quality level {r['quality']['level']} ({r['quality']['downgrades']} down, "
+                     f"{r['quality']['upgrades']} up)" if r.get("quality") else ""))
+        print(f"Host: {totals['sessions']} sessions, {totals['frames']} frames, "
+              f"{totals['total_fps']:.1f} FPS total, {totals['wall_fps']:.1f} FPS wall clock "
+              f"(slowest session {totals['min_fps']:.1f} FPS, worst p95 {totals['worst_p95_ms']:.2f} ms)"
+              + (f", {totals['failed']} failed" if totals["failed"] else ""))
@@ -1,99 +1,220 @@
-from OpenGL.GL import *
-from OpenGL.GLU import *
-import pygame
-from pygame.locals import *
-import math
+import threading
+import time
+
+import numpy as np
+
+
+SHAPE_SIZE = 0.5  # half-extent of every shape before its own scale
+SPHERE_SLICES = 32
+
+# Unit cube: vertex v has x/y/z = -1 where bit 0/1/2 of v is set, else +1
+CUBE_VERTICES = np.array([[-1 if v & 1 else 1, -1 if v & 2 else 1, -1 if v & 4 else 1] for v in range(8)],
+                         np.float32)
+CUBE_FACES = ((0, 1, 2, 3), (3, 2, 6, 7), (7, 6, 5, 4), (4, 5, 1, 0), (1, 5, 6, 2), (4, 0, 3, 7))
+CUBE_COLOR = (1, 0.5, 0.2)
+
+# Unit pyramid: four side triangles around the apex, one color each (no base)
+PYRAMID_TRIANGLES = np.array([
+    [[0, 1, 0], [-1, -1, 1], [1, -1, 1]],
+    [[0, 1, 0], [1, -1, 1], [1, -1, -1]],
+    [[0, 1, 0], [1, -1, -1], [-1, -1, -1]],
+    [[0, 1, 0], [-1, -1, -1], [-1, -1, 1]],
+], np.float32)
+PYRAMID_COLORS = ((1, 0, 0), (0, 1, 0), (0, 0, 1), (1, 1, 0))
+
+SPHERE_COLOR = (0.3, 0.6, 1)
+
+
+def model_matrices(pos, scale, rotation):
+    """
+    (n, 4, 4) float32 model matrices of n shapes: translate * scale * Rx * Ry * Rz,
+    the same transform as glTranslatef / glScalef / glRotatef(x, y, z) in that order.
+    pos and rotation (degrees) are (n, 3), scale is (n,).
+    """
+    pos = np.asarray(pos, np.float32).reshape(-1, 3)
+    scale = np.asarray(scale, np.float32).reshape(-1)
+    a = np.radians(np.asarray(rotation, np.float32).reshape(-1, 3))
+    c, s = np.cos(a), np.sin(a)
+    n = len(pos)
+
+    rx = np.zeros((n, 3, 3), np.float32)
+    rx[:, 0, 0] = 1
+    rx[:, 1, 1], rx[:, 1, 2], rx[:, 2, 1], rx[:, 2, 2] = c[:, 0], -s[:, 0], s[:, 0], c[:, 0]
+    ry = np.zeros((n, 3, 3), np.float32)
+    ry[:, 1, 1] = 1
+    ry[:, 0, 0], ry[:, 0, 2], ry[:, 2, 0], ry[:, 2, 2] = c[:, 1], s[:, 1], -s[:, 1], c[:, 1]
+    rz = np.zeros((n, 3, 3), np.float32)
+    rz[:, 2, 2] = 1
+    rz[:, 0, 0], rz[:, 0, 1], rz[:, 1, 0], rz[:, 1, 1] = c[:, 2], -s[:, 2], s[:, 2], c[:, 2]
+
+    m = np.zeros((n, 4, 4), np.float32)
+    m[:, :3, :3] = (rx @ ry @ rz) * scale[:, None, None]
+    m[:, :3, 3] = pos
+    m[:, 3, 3] = 1
+    return m
+
 
 class Shape3DManager:
-    def __init__(self):
+    """
+    3D shapes drawn with PyOpenGL in a pygame window.
+
+    Each shape type's geometry is compiled once into a display list (the sphere from a single
+    quadric), so drawing a shape is one glLoadMatrixf of its NumPy model matrix plus one
+    glCallList. gl, glu and display default to OpenGL.GL, OpenGL.GLU and pygame, imported on
+    first use; pass other modules (e.g. mocks) to run without a window or GPU.
+    """
+
+    def __init__(self, gl=None, glu=None, display=None):
         self.shapes = []
+        self.gl = gl
+        self.glu = glu
+        self.display = display
+        self.lists = {}      # shape type -> display list id
+        self.quadric = None
+        # Immutable copy of the shapes for a render thread; replaced as a whole by publish()
+        self.snapshot = ()
+
+    def _load_gl(self):
+        if self.gl is None:
+            from OpenGL import GL
+            self.gl = GL
+        if self.glu is None:
+            from OpenGL import GLU
+            self.glu = GLU
+        if self.display is None:
+            import pygame
+            self.display = pygame
 
     def init_window(self):
+        self._load_gl()
+        pygame = self.display
         pygame.init()
-        pygame.display.set_mode((800, 600), DOUBLEBUF | OPENGL)
-        glEnable(GL_DEPTH_TEST)
-        glMatrixMode(GL_PROJECTION)
-        gluPerspective(45, (800 / 600), 0.1, 50.0)
-        glTranslatef(0.0, 0.0, -5)
+        pygame.display.set_mode((800, 600), pygame.DOUBLEBUF | pygame.OPENGL)
+        self.init_gl()
+
+    def init_gl(self):
+        """Set up the projection and compile the shape geometry; needs a current GL context."""
+        self._load_gl()
+        gl, glu = self.gl, self.glu
+        gl.glEnable(gl.GL_DEPTH_TEST)
+        gl.glMatrixMode(gl.GL_PROJECTION)
+        gl.glLoadIdentity()
+        glu.gluPerspective(45, (800 / 600), 0.1, 50.0)
+        gl.glTranslatef(0.0, 0.0, -5)
+        gl.glMatrixMode(gl.GL_MODELVIEW)
+        gl.glLoadIdentity()
+        self._build_lists()
+
+    def _build_lists(self):
+        gl = self.gl
+        self.quadric = self.glu.gluNewQuadric()
+        for shape_type, emit in (("cube", self._emit_cube), ("sphere", self._emit_sphere),
+                                 ("pyramid", self._emit_pyramid)):
+            list_id = gl.glGenLists(1)
+            gl.glNewList(list_id, gl.GL_COMPILE)
+            emit()
+            gl.glEndList()
+            self.lists[shape_type] = list_id
+
+    def _emit_cube(self):
+        gl = self.gl
+        gl.glColor3fv(CUBE_COLOR)
+        gl.glBegin(gl.GL_QUADS)
+        for surface in CUBE_FACES:
+            for vertex in surface:
+                gl.glVertex3fv(CUBE_VERTICES[vertex])
+        gl.glEnd()
+
+    def _emit_sphere(self):
+        self.gl.glColor3fv(SPHERE_COLOR)
+        self.glu.gluSphere(self.quadric, 1, SPHERE_SLICES, SPHERE_SLICES)
+
+    def _emit_pyramid(self):
+        gl = self.gl
+        gl.glBegin(gl.GL_TRIANGLES)
+        for triangle, color in zip(PYRAMID_TRIANGLES, PYRAMID_COLORS):
+            gl.glColor3fv(color)
+            for vertex in triangle:
+                gl.glVertex3fv(vertex)
+        gl.glEnd()
+
+    def close(self):
+        """Free the display lists and the quadric."""
+        for list_id in self.lists.values():
+            self.gl.glDeleteLists(list_id, 1)
+        self.lists = {}
+        if self.quadric is not None:
+            self.glu.gluDeleteQuadric(self.quadric)
+            self.quadric = None
 
     def create_shape(self, shape_type):
         shape = {"type": shape_type, "scale": 1.0, "rotation": [0, 0, 0], "pos": [0, 0, 0]}
         self.shapes.append(shape)
         return shape
 
+    def _draw_list(self, shape_type, size):
+        gl = self.gl
+        gl.glPushMatrix()
+        gl.glScalef(size, size, size)
+        gl.glCallList(self.lists[shape_type])
+        gl.glPopMatrix()
+
     def draw_cube(self, size=1):
-        glBegin(GL_QUADS)
-        for surface in (
-            (0, 1, 2, 3),
-            (3, 2, 6, 7),
-            (7, 6, 5, 4),
-            (4, 5, 1, 0),
-            (1, 5, 6, 2),
-            (4, 0, 3, 7),
-        ):
-            for vertex in surface:
-                glColor3fv((1, 0.5, 0.2))
-                glVertex3fv([
-                    (-1 if vertex & 1 else 1) * size,
-                    (-1 if vertex & 2 else 1) * size,
-                    (-1 if vertex & 4 else 1) * size,
-                ])
-        glEnd()
+        self._draw_list("cube", size)
 
     def draw_sphere(self, radius=1):
-        quad = gluNewQuadric()
-        glColor3f(0.3, 0.6, 1)
-        gluSphere(quad, radius, 32, 32)
+        self._draw_list("sphere", radius)
 
     def draw_pyramid(self, size=1):
-        glBegin(GL_TRIANGLES)
-        glColor3f(1, 0, 0)
-        glVertex3f(0, size, 0)
-        glVertex3f(-size, -size, size)
-        glVertex3f(size, -size, size)
-
-        glColor3f(0, 1, 0)
-        glVertex3f(0, size, 0)
-        glVertex3f(size, -size, size)
-        glVertex3f(size, -size, -size)
-
-        glColor3f(0, 0, 1)
-        glVertex3f(0, size, 0)
-        glVertex3f(size, -size, -size)
-        glVertex3f(-size, -size, -size)
-
-        glColor3f(1, 1, 0)
-        glVertex3f(0, size, 0)
-        glVertex3f(-size, -size, -size)
-        glVertex3f(-size, -size, size)
-        glEnd()
+        self._draw_list("pyramid", size)
 
-    def render_scene(self):
+    @staticmethod
+    def take_snapshot(shapes):
+        """Immutable (type, pos, scale, rotation) tuples of the shapes."""
+        return tuple((s["type"], tuple(s["pos"]), s["scale"], tuple(s["rotation"])) for s in shapes)
+
+    def publish(self):
+        """Hand the current shapes to the render thread (a single reference swap, no lock)."""
+        self.snapshot = self.take_snapshot(self.shapes)
+
+    def draw_snapshot(self, snapshot):
+        """Draw a snapshot grouped by type: one glLoadMatrixf + glCallList per shape."""
+        if not snapshot:
+            return
+        gl = self.gl
+        types, pos, scale, rotation = zip(*snapshot)
+        matrices = model_matrices(pos, np.asarray(scale, np.float32) * SHAPE_SIZE, rotation)
+        # OpenGL reads matrices column-major
+        matrices = np.ascontiguousarray(matrices.transpose(0, 2, 1))
+        types = np.array(types)
+        for shape_type, list_id in self.lists.items():
+            for i in np.flatnonzero(types == shape_type):
+                gl.glLoadMatrixf(matrices[i])
+                gl.glCallList(list_id)
+        gl.glLoadIdentity()
+
+    def draw_shapes(self, shapes):
+        self.draw_snapshot(self.take_snapshot(shapes))
+
+    def poll_events(self):
+        """Drain the window events; returns False (and closes the window) when it was closed."""
+        pygame = self.display
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                self.close()
                 pygame.quit()
-                return
-
-        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-
-        for shape in self.shapes:
-            glPushMatrix()
-            glTranslatef(*shape["pos"])
-            glScalef(shape["scale"], shape["scale"], shape["scale"])
-            glRotatef(shape["rotation"][0], 1, 0, 0)
-            glRotatef(shape["rotation"][1], 0, 1, 0)
-            glRotatef(shape["rotation"][2], 0, 0, 1)
+                return False
+        return True
 
-            if shape["type"] == "cube":
-                self.draw_cube(0.5)
-            elif shape["type"] == "sphere":
-                self.draw_sphere(0.5)
-            elif shape["type"] == "pyramid":
-                self.draw_pyramid(0.5)
-            glPopMatrix()
+    def render_frame(self, snapshot):
+        self.gl.glClear(self.gl.GL_COLOR_BUFFER_BIT | self.gl.GL_DEPTH_BUFFER_BIT)
+        self.draw_snapshot(snapshot)
+        self.display.display.flip()
 
-        pygame.display.flip()
-        pygame.time.wait(10)
+    def render_scene(self):
+        """Render the current shapes once, on the calling thread."""
+        if self.poll_events():
+            self.render_frame(self.take_snapshot(self.shapes))
 
     def move_shape(self, shape, cursor):
         x, y = cursor
@@ -109,32 +230,113 @@ class Shape3DManager:
         shape["scale"] += factor
         shape["scale"] = max(0.2, min(3.0, shape["scale"]))
 
+
+class Renderer3D:
+    """
+    Renders a Shape3DManager on its own thread at a target frame rate, decoupled from the
+    vision loop. The window and GL context are created on that thread, which then draws the
+    manager's latest published snapshot once per frame and sleeps until the next frame's
+    deadline. The vision side only mutates its shapes and calls manager.publish().
+    (pygame needs the window on the main thread on macOS; this targets Linux/Windows kiosks.)
+    """
+
+    def __init__(self, manager, fps=60):
+        self.manager = manager
+        self.fps = fps
+        self.frames = 0
+        self.late_frames = 0  # frames that missed their deadline
+        self.running = False
+        self.error = None  # exception that kept the window from opening
+        self._thread = None
+        self._ready = threading.Event()
+
+    def start(self, timeout=5.0):
+        """Start the render thread and wait until its window is open; raises if opening it failed."""
+        if self._thread is not None:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._loop, name="render-3d", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+        if self.error is not None:
+            self._thread.join()
+            self._thread = None
+            raise self.error
+
+    def stop(self):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _loop(self):
+        manager = self.manager
+        try:
+            manager.init_window()
+        except Exception as e:  # raised by start()
+            self.error = e
+            self.running = False
+            return
+        finally:
+            self._ready.set()
+        period = 1.0 / self.fps
+        deadline = time.perf_counter()
+        while self.running and manager.poll_events():
+            manager.render_frame(manager.snapshot)
+            self.frames += 1
+
+            deadline += period
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                self.late_frames += 1
+                if delay < -period:
+                    # More than a frame behind: restart the schedule instead of rushing to catch up
+                    deadline = time.perf_counter()
+        manager.close()  # no-op when the window was closed by the user
+        self.running = False
+
     # ------------------------------------------------------------
 # Compatibility wrappers for main.py
 # ------------------------------------------------------------
 
-_manager = Shape3DManager()
-_manager.init_window()
+# The window opens on first use, never as a side effect of importing this module
+_manager = None
+_renderer = None
+
+def _get_manager():
+    global _manager, _renderer
+    if _manager is None:
+        manager = Shape3DManager()
+        renderer = Renderer3D(manager)
+        renderer.start()  # raises if the window cannot be opened; the next call tries again
+        _manager, _renderer = manager, renderer
+    return _manager
 
 def create_shape_3d(shape_type, pos):
     """Create a 3D shape at the given screen position."""
-    shape = _manager.create_shape(shape_type)
+    shape = _get_manager().create_shape(shape_type)
     # Convert 2D position to OpenGL 3D coordinate
     x, y = pos
     shape["pos"] = [(x - 640) / 320, -(y - 360) / 320, 0]
+    _manager.publish()
     return shape
 
 def draw_shape_3d(img, shape=None):
-    """Render the 3D scene using PyOpenGL and pygame."""
-    _manager.render_scene()
+    """Publish the 3D scene to the render thread; returns immediately."""
+    _get_manager().publish()
     return img
 
 # Optional helper for movement, rotation, scaling
 def move_shape_3d(shape, cursor):
-    _manager.move_shape(shape, cursor)
+    _get_manager().move_shape(shape, cursor)
+    _manager.publish()
 
 def rotate_shape_3d(shape, x_angle, y_angle, z_angle):
-    _manager.rotate_shape(shape, x_angle, y_angle, z_angle)
+    _get_manager().rotate_shape(shape, x_angle, y_angle, z_angle)
+    _manager.publish()
 
 def scale_shape_3d(shape, factor):
-    _manager.scale_shape(shape, factor)
+    _get_manager().scale_shape(shape, factor)
+    _manager.publish()
@@ -3,12 +3,54 @@ import cv2
 import numpy as np
 import random
 import math
+from itertools import count
+
+from modules.spatial_index import GridIndex
+from modules.stroke import Stroke, StrokeBuilder
+
+
+# Unit polygon templates, built once. Vertices are center + radius * template, truncated like int().
+# The angles go through math.cos/sin exactly as the per-shape loops did, so the pixels do not change.
+def _unit_polygon(angles):
+    return np.array([(math.cos(a), math.sin(a)) for a in angles], np.float64)
+
+
+STAR_TEMPLATE = _unit_polygon(math.radians(i * 36) for i in range(10))
+STAR_OUTER = (np.arange(10) % 2 == 0)[:, None]  # even vertices use the outer radius
+REGULAR_TEMPLATES = {
+    "pentagon": _unit_polygon(2 * math.pi * i / 5 for i in range(5)),
+    "hexagon": _unit_polygon(2 * math.pi * i / 6 for i in range(6)),
+}
+# Triangle in box coordinates: vertex = (x, y) + HALF * (size // 2) + FULL * size
+TRIANGLE_HALF = np.array([[1, 0], [0, 0], [0, 0]], np.int64)
+TRIANGLE_FULL = np.array([[0, 0], [0, 1], [1, 1]], np.int64)
+POLYGON_TYPES = ("triangle", "star", "pentagon", "hexagon")
+MAX_POLY_BATCH = 64
+# Freehand stroke width per UI detail level (see ShapeManager.set_ui_detail). Strokes are the
+# most expensive thing drawn live: a long 4 px polyline costs ~10x the same line at 1 px.
+STROKE_WIDTHS = (1, 2, 4)
+UI_DETAIL_FULL = len(STROKE_WIDTHS) - 1
+
 
 class ShapeManager:
     def __init__(self, width, height):
         self.width = width
         self.height = height
         self.shapes = []
+        # Bounding boxes of self.shapes keyed by shape["id"]; ids grow with draw order (topmost = largest)
+        self.index = GridIndex(cell_size=64)
+        self._by_id = {}
+        self._ids = count(1)
+        # Cached render layers, see draw_ui()
+        self._layer = None
+        self._mask = None
+        self._ui = None
+        self._ui_mask = None
+        self._ui_rects = []
+        self._baked = {}         # shape id -> bbox it was rasterized with
+        self._dirty_ids = set()  # shapes changed since the last draw_ui()
+        self._prev_active = set()
+        self._vertex_cache = {}  # shape id -> ((x, y, size), int32 vertices)
         self.selected_left = None
         self.selected_right = None
         self.last_left_pos = None
@@ -16,6 +58,13 @@ class ShapeManager:
         self.drawing_points = []  # store points for draw mode
         self.drawing = False
         self.current_draw = None
+        self.stroke_builder = None
+        self.stroke_params = {}  # StrokeBuilder options, e.g. {"smoothing": False}
+        self.ui_detail = UI_DETAIL_FULL
+        # Called as observer(op, shape) after each change to a scene shape, op one of
+        # "add", "move", "resize", "delete" (see SceneStore)
+        self.observer = None
+        self.stroke_width = STROKE_WIDTHS[self.ui_detail]
 
         # Button areas
         self.buttons = [
@@ -34,6 +83,63 @@ class ShapeManager:
     def _random_color(self):
         return tuple(random.randint(80, 255) for _ in range(3))
 
+    @staticmethod
+    def shape_bbox(shape):
+        """Inclusive (x0, y0, x1, y1) box used for hit-testing, or None for an empty stroke."""
+        if shape["type"] == "draw":
+            return shape["points"].bbox()
+        return (int(shape["x"]), int(shape["y"]),
+                int(shape["x"] + shape["size"]), int(shape["y"] + shape["size"]))
+
+    def _append(self, shape):
+        shape["id"] = next(self._ids)
+        self.shapes.append(shape)
+        self._by_id[shape["id"]] = shape
+        self._reindex(shape)
+        self._notify("add", shape)
+
+    def _notify(self, op, shape):
+        if self.observer is not None:
+            self.observer(op, shape)
+
+    def load_shapes(self, shapes, bboxes=None):
+        """
+        Replace the scene with shapes that already carry their ids (e.g. restored by SceneStore),
+        in draw order. bboxes: their shape_bbox() values if already known. The observer is not
+        notified.
+        """
+        self.shapes = list(shapes)
+        self._by_id = {s["id"]: s for s in self.shapes}
+        self._ids = count(max(self._by_id, default=0) + 1)
+        self.index = GridIndex(cell_size=self.index.cell_size)
+        if bboxes is None:
+            bboxes = [self.shape_bbox(s) for s in self.shapes]
+        boxed = [(s["id"], b) for s, b in zip(self.shapes, bboxes) if b is not None]
+        self.index.bulk_insert([i for i, _ in boxed], [b for _, b in boxed])
+        self.selected_left = self.selected_right = None
+        self.last_left_pos = self.last_right_pos = None
+        self._vertex_cache = {}
+        self._baked = {}
+        self._dirty_ids = set()
+        self._prev_active = set()
+        self._layer = None
+
+    def _reindex(self, shape):
+        self._dirty_ids.add(shape["id"])
+        bbox = self.shape_bbox(shape)
+        if bbox is None:
+            self.index.remove(shape["id"])
+        else:
+            self.index.update(shape["id"], bbox)
+
+    @staticmethod
+    def _hit(shape, px, py):
+        if shape["type"] in ["circle", "triangle", "star"]:
+            cx, cy = shape["x"] + shape["size"] // 2, shape["y"] + shape["size"] // 2
+            return (px - cx)**2 + (py - cy)**2 <= (shape["size"] // 2)**2
+        # Squares, pentagons, hexagons and strokes: the bounding box is the hit area
+        return True
+
     def add_shape(self, shape_type):
         size = random.randint(60, 120)
         x = random.randint(100, self.width - 300)
@@ -41,36 +147,46 @@ class ShapeManager:
         color = self._random_color()
 
         if shape_type == "draw":
-            self.drawing = True
-            self.current_draw = {"type": "draw", "points": [], "color": color}
+            self.start_draw(color)
         else:
-            self.shapes.append({"x": x, "y": y, "size": size, "color": color, "type": shape_type})
+            self._append({"x": x, "y": y, "size": size, "color": color, "type": shape_type})
+
+    def start_draw(self, color=None):
+        """Enter draw mode with a new, empty stroke."""
+        self.drawing = True
+        self.stroke_builder = StrokeBuilder(**self.stroke_params)
+        self.current_draw = {"type": "draw", "points": self.stroke_builder.stroke,
+                             "color": color or self._random_color()}
+
+    def add_draw_point(self, point, t=None):
+        """Feed one pinch position, seen at time t, to the stroke being drawn (filtered and simplified on the fly)."""
+        if self.stroke_builder is not None:
+            self.stroke_builder.add(point, t)
 
     def finish_draw(self):
         """End the draw mode and save it as a shape."""
-        if self.current_draw and len(self.current_draw["points"]) > 5:
-            self.shapes.append(self.current_draw)
+        # Length check on the raw input: a simplified straight stroke may only have two points
+        if self.current_draw and self.stroke_builder.raw_count > 5:
+            self.stroke_builder.finish()
+            if len(self.current_draw["points"]) > 1:
+                self._append(self.current_draw)
         self.drawing = False
         self.current_draw = None
+        self.stroke_builder = None
         self.drawing_points.clear()
 
+    def add_stroke(self, points, color=None):
+        """Add a finished freehand stroke from an (n, 2) point sequence, without filtering."""
+        shape = {"type": "draw", "points": Stroke(points), "color": color or self._random_color()}
+        self._append(shape)
+        return shape
+
     def select_shape(self, px, py):
-        for shape in reversed(self.shapes):
-            if shape["type"] in ["square", "pentagon", "hexagon"]:
-                if shape["x"] <= px <= shape["x"] + shape["size"] and shape["y"] <= py <= shape["y"] + shape["size"]:
-                    return shape
-            elif shape["type"] in ["circle", "triangle", "star"]:
-                cx, cy = shape["x"] + shape["size"] // 2, shape["y"] + shape["size"] // 2
-                if (px - cx)**2 + (py - cy)**2 <= (shape["size"] // 2)**2:
-                    return shape
-            elif shape["type"] == "draw":
-                # Approximate bounding box check
-                pts = np.array(shape["points"])
-                if len(pts) > 0:
-                    x_min, y_min = np.min(pts[:, 0]), np.min(pts[:, 1])
-                    x_max, y_max = np.max(pts[:, 0]), np.max(pts[:, 1])
-                    if x_min <= px <= x_max and y_min <= py <= y_max:
-                        return shape
+        """Topmost shape under the point, looked up through the spatial index."""
+        for shape_id in sorted(self.index.query_point(px, py), reverse=True):
+            shape = self._by_id[shape_id]
+            if self._hit(shape, px, py):
+                return shape
         return None
 
     def move_shape(self, shape, px, py, last_pos):
@@ -78,93 +194,282 @@ class ShapeManager:
             dx = px - last_pos[0]
             dy = py - last_pos[1]
             if shape["type"] == "draw":
-                shape["points"] = [(x + dx, y + dy) for (x, y) in shape["points"]]
+                shape["points"].translate(dx, dy)
             else:
                 shape["x"] += int(dx)
                 shape["y"] += int(dy)
                 shape["x"] = np.clip(shape["x"], 0, self.width - shape["size"])
                 shape["y"] = np.clip(shape["y"], 0, self.height - shape["size"])
+            if "id" in shape:
+                self._reindex(shape)
+                self._notify("move", shape)
         return (px, py)
 
+    def resize_shape(self, shape, size):
+        shape["size"] = size
+        if "id" in shape:
+            self._reindex(shape)
+            self._notify("resize", shape)
+
     def remove_shape_if_in_bin(self, shape):
         bx, by, bw, bh = self.bin.values()
         if shape["type"] == "draw":
-            pts = np.array(shape["points"])
-            if len(pts) == 0:
+            if len(shape["points"]) == 0:
                 return False
-            cx, cy = np.mean(pts[:, 0]), np.mean(pts[:, 1])
+            cx, cy = shape["points"].centroid()
         else:
             cx, cy = shape["x"] + shape["size"] / 2, shape["y"] + shape["size"] / 2
 
         if bx < cx < bx + bw and by < cy < by + bh:
             self.shapes.remove(shape)
+            self._by_id.pop(shape.get("id"), None)
+            self.index.remove(shape.get("id"))
+            self._dirty_ids.add(shape.get("id"))
+            self._vertex_cache.pop(shape.get("id"), None)
+            self._notify("delete", shape)
             return True
         return False
 
+    def set_ui_detail(self, level):
+        """
+        Overlay detail from UI_DETAIL_FULL down to 0: lower levels draw freehand strokes thinner
+        (and Sandbox drops its help line at 0). Changing it re-renders the cached layer once.
+        """
+        level = max(0, min(int(level), UI_DETAIL_FULL))
+        if level == self.ui_detail:
+            return
+        self.ui_detail = level
+        self.stroke_width = STROKE_WIDTHS[level]
+        self._layer = None  # baked strokes change width too
+
     def check_button_click(self, px, py):
         for btn in self.buttons:
             if btn["x"] <= px <= btn["x"] + btn["w"] and btn["y"] <= py <= btn["y"] + btn["h"]:
                 return btn["type"]
         return None
 
+    @staticmethod
+    def _color(frame, color):
+        """Colors drawn into the 4-channel cached layer also set its alpha."""
+        if frame.ndim == 3 and frame.shape[2] == 4:
+            return tuple(color) + (255,)
+        return color
+
+    @staticmethod
+    def _polygon_vertices(shape_type, x, y, size):
+        if shape_type == "triangle":
+            pts = (x, y) + TRIANGLE_HALF * (size // 2) + TRIANGLE_FULL * size
+        elif shape_type == "star":
+            cx, cy = x + size // 2, y + size // 2
+            r = np.where(STAR_OUTER, size // 2, size // 4)
+            pts = (cx, cy) + r * STAR_TEMPLATE
+        else:
+            cx, cy = x + size // 2, y + size // 2
+            pts = (cx, cy) + size // 2 * REGULAR_TEMPLATES[shape_type]
+        return pts.astype(np.int32)
+
+    def polygon(self, shape):
+        """Vertex array of a triangle/star/pentagon/hexagon, cached until the shape moves or resizes."""
+        key = (int(shape["x"]), int(shape["y"]), int(shape["size"]))
+        shape_id = shape.get("id")
+        cached = self._vertex_cache.get(shape_id)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        pts = self._polygon_vertices(shape["type"], *key)
+        if shape_id is not None:
+            self._vertex_cache[shape_id] = (key, pts)
+        return pts
+
     def draw_shape(self, frame, shape):
-        color = shape["color"]
-        if shape["type"] == "square":
-            cv2.rectangle(frame, (shape["x"], shape["y"]),
-                        (shape["x"] + shape["size"], shape["y"] + shape["size"]), color, -1)
+        color = self._color(frame, shape["color"])
+        if shape["type"] == "draw":
+            cv2.polylines(frame, [shape["points"].points], False, color, self.stroke_width)
+        elif shape["type"] == "square":
+            x, y, size = int(shape["x"]), int(shape["y"]), int(shape["size"])
+            cv2.rectangle(frame, (x, y), (x + size, y + size), color, -1)
         elif shape["type"] == "circle":
-            center = (shape["x"] + shape["size"] // 2, shape["y"] + shape["size"] // 2)
-            cv2.circle(frame, center, shape["size"] // 2, color, -1)
-        elif shape["type"] == "triangle":
-            pts = np.array([
-                [shape["x"] + shape["size"] // 2, shape["y"]],
-                [shape["x"], shape["y"] + shape["size"]],
-                [shape["x"] + shape["size"], shape["y"] + shape["size"]],
-            ], np.int32)
-            cv2.fillPoly(frame, [pts], color)
-        elif shape["type"] == "star":
-            cx, cy = shape["x"] + shape["size"] // 2, shape["y"] + shape["size"] // 2
-            pts = []
-            for i in range(10):
-                angle = i * 36
-                r = shape["size"] // 2 if i % 2 == 0 else shape["size"] // 4
-                x = int(cx + r * math.cos(math.radians(angle)))
-                y = int(cy + r * math.sin(math.radians(angle)))
-                pts.append([x, y])
-            cv2.fillPoly(frame, [np.array(pts, np.int32)], color)
-        elif shape["type"] in ["pentagon", "hexagon"]:
-            sides = 5 if shape["type"] == "pentagon" else 6
-            cx, cy = shape["x"] + shape["size"] // 2, shape["y"] + shape["size"] // 2
-            pts = np.array([
-                (int(cx + shape["size"] // 2 * math.cos(2 * math.pi * i / sides)),
-                 int(cy + shape["size"] // 2 * math.sin(2 * math.pi * i / sides)))
-                for i in range(sides)
-            ], np.int32)
-            cv2.fillPoly(frame, [pts], color)
-        elif shape["type"] == "draw":
-            for i in range(1, len(shape["points"])):
-                cv2.line(frame, shape["points"][i - 1], shape["points"][i], color, 4)
+            x, y, size = int(shape["x"]), int(shape["y"]), int(shape["size"])
+            cv2.circle(frame, (x + size // 2, y + size // 2), size // 2, color, -1)
+        elif shape["type"] in POLYGON_TYPES:
+            cv2.fillPoly(frame, [self.polygon(shape)], color)
 
-    def draw_ui(self, frame):
-        for shape in self.shapes:
-            self.draw_shape(frame, shape)
+    def draw_shapes(self, frame, shapes):
+        """
+        Draw shapes in order. Consecutive polygons of the same color go through one cv2.fillPoly
+        call, as long as they do not overlap (fillPoly fills overlapping polygons even-odd).
+        """
+        batch, boxes, batch_color = [], [], None
 
-        # Draw current drawing
-        if self.drawing and self.current_draw:
-            for i in range(1, len(self.current_draw["points"])):
-                cv2.line(frame, self.current_draw["points"][i - 1],
-                        self.current_draw["points"][i], self.current_draw["color"], 4)
+        for shape in shapes:
+            if shape["type"] not in POLYGON_TYPES:
+                if batch:
+                    cv2.fillPoly(frame, batch, batch_color)
+                    batch, boxes = [], []
+                self.draw_shape(frame, shape)
+                continue
 
+            color = self._color(frame, shape["color"])
+            x0, y0, size = int(shape["x"]), int(shape["y"]), int(shape["size"])
+            box = (x0, y0, x0 + size, y0 + size)
+            overlaps = any(b[0] <= box[2] and box[0] <= b[2] and b[1] <= box[3] and box[1] <= b[3] for b in boxes)
+            if batch and (color != batch_color or overlaps or len(batch) >= MAX_POLY_BATCH):
+                cv2.fillPoly(frame, batch, batch_color)
+                batch, boxes = [], []
+            batch.append(self.polygon(shape))
+            boxes.append(box)
+            batch_color = color
+
+        if batch:
+            cv2.fillPoly(frame, batch, batch_color)
+
+    def _draw_static_ui(self, frame):
         # Buttons
         for btn in self.buttons:
-            cv2.rectangle(frame, (btn["x"], btn["y"]), (btn["x"] + btn["w"], btn["y"] + btn["h"]), (0, 0, 0), -1)
-            cv2.rectangle(frame, (btn["x"], btn["y"]), (btn["x"] + btn["w"], btn["y"] + btn["h"]), (255, 255, 255), 2)
-            cv2.putText(frame, btn["label"], (btn["x"] + 20, btn["y"] + 45),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+            x, y = btn["x"], btn["y"]
+            cv2.rectangle(frame, (x, y), (x + btn["w"], y + btn["h"]), self._color(frame, (0, 0, 0)), -1)
+            cv2.rectangle(frame, (x, y), (x + btn["w"], y + btn["h"]), self._color(frame, (255, 255, 255)), 2)
+            cv2.putText(frame, btn["label"], (x + 20, y + 45),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, self._color(frame, (255, 255, 255)), 2)
 
         # Bin
         bx, by, bw, bh = self.bin.values()
-        cv2.rectangle(frame, (bx, by), (bx + bw, by + bh), (0, 0, 255), 2)
-        cv2.putText(frame, "bin", (bx + 30, by + 80), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 255), 4)
+        cv2.rectangle(frame, (bx, by), (bx + bw, by + bh), self._color(frame, (0, 0, 255)), 2)
+        cv2.putText(frame, "bin", (bx + 30, by + 80), cv2.FONT_HERSHEY_SIMPLEX, 2, self._color(frame, (0, 0, 255)), 4)
+
+    # ------------------------------------------------------------
+    # Retained-mode rendering
+    # ------------------------------------------------------------
+    # Every shape that is not currently held by a hand is rasterized once into a cached layer
+    # plus coverage mask (taken from the alpha channel it was drawn with, see _coverage). Each
+    # frame the layer is copied onto the camera frame through the mask in a single cv2.copyTo;
+    # only shapes that were added, moved, resized or removed are re-rendered, inside their old
+    # and new bounding boxes. The buttons and the bin have a layer of their own, copied last
+    # (within the row bands they cover) so that they stay on top of everything, as before.
+
+    DIRTY_PAD = max(STROKE_WIDTHS)  # stroke lines are up to 4 px wide and may leave their bounding box
+
+    def _active_ids(self):
+        return {s["id"] for s in (self.selected_left, self.selected_right) if s is not None and "id" in s}
+
+    def _rasterize(self, ids):
+        """Draw the given baked shapes, in draw order, into a fresh BGRA image."""
+        scratch = np.zeros(self._layer.shape[:2] + (4,), np.uint8)
+        self.draw_shapes(scratch, [self._by_id[i] for i in sorted(ids)])
+        return scratch
+
+    @staticmethod
+    def _coverage(scratch):
+        """
+        (BGR, mask) of a rasterized BGRA image for the binary copyTo. Antialiased edges (OpenCV 5
+        always antialiases text) are cut at half coverage; the kept edge pixels were blended with
+        the transparent background, so their color is scaled back up instead of coming out dark.
+        """
+        alpha = scratch[..., 3]
+        bgr = scratch[..., :3]
+        mask = alpha >= 128
+        partial = mask & (alpha < 255)
+        if partial.any():
+            bgr[partial] = bgr[partial].astype(np.uint16) * 255 // alpha[partial][:, None]
+        return bgr, mask
+
+    def _rebuild_layer(self, h, w):
+        self._layer = np.zeros((h, w, 3), np.uint8)
+        self._mask = np.zeros((h, w), np.uint8)
+        self._dirty_ids = set()
+        active = self._active_ids()
+        self._prev_active = active
+        self._baked = {i: self.index.bbox(i) for i in self._by_id if i not in active and i in self.index}
+        self._layer[:], self._mask[:] = self._coverage(self._rasterize(self._baked))
+
+        scratch = np.zeros((h, w, 4), np.uint8)
+        self._draw_static_ui(scratch)
+        self._ui = np.zeros((h, w, 3), np.uint8)
+        self._ui_mask = np.zeros((h, w), np.uint8)
+        self._ui[:], self._ui_mask[:] = self._coverage(scratch)
+        # Row bands holding UI pixels, each cut to the columns it uses
+        rows = np.flatnonzero(self._ui_mask.any(axis=1))
+        bands = np.split(rows, np.flatnonzero(np.diff(rows) > 1) + 1) if len(rows) else []
+        self._ui_rects = []
+        for band in bands:
+            y0, y1 = int(band[0]), int(band[-1]) + 1
+            cols = np.flatnonzero(self._ui_mask[y0:y1].any(axis=0))
+            self._ui_rects.append((int(cols[0]), y0, int(cols[-1]) + 1, y1))
+
+    def _dirty_region(self, rect):
+        """
+        (x0, y0, x1, y1) of a shape's box grown by DIRTY_PAD and clipped to the layer, plus the
+        baked shapes that may draw into it; None if it is off the layer.
+        """
+        h, w = self._mask.shape
+        pad = self.DIRTY_PAD
+        x0, y0 = max(0, rect[0] - pad), max(0, rect[1] - pad)
+        x1, y1 = min(w, rect[2] + pad + 1), min(h, rect[3] + pad + 1)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        ids = [i for i in self.index.query_rect((x0 - pad, y0 - pad, x1 + pad, y1 + pad)) if i in self._baked]
+        return (x0, y0, x1, y1), ids
+
+    def _redraw_rect(self, rect):
+        region = self._dirty_region(rect)
+        if region is None:
+            return
+        (x0, y0, x1, y1), ids = region
+        # Shapes are re-rasterized at full-frame coordinates so OpenCV clips them exactly like an
+        # immediate-mode draw would; only the dirty rect is copied back. np.zeros is lazily
+        # zeroed, so pages the shapes never touch cost nothing.
+        self._layer[y0:y1, x0:x1], self._mask[y0:y1, x0:x1] = self._coverage(self._rasterize(ids)[y0:y1, x0:x1])
+
+    def _restore_above(self, frame, shape):
+        """Composite the baked shapes drawn after a held shape back over it, within its box."""
+        bbox = self.shape_bbox(shape)
+        region = bbox and self._dirty_region(bbox)
+        if not region:
+            return
+        (x0, y0, x1, y1), ids = region
+        ids = [i for i in ids if i > shape.get("id", 0)]
+        if ids:
+            bgr, mask = self._coverage(self._rasterize(ids)[y0:y1, x0:x1])
+            frame[y0:y1, x0:x1][mask] = bgr[mask]
+
+    def _sync_layer(self, frame):
+        h, w = frame.shape[:2]
+        if self._layer is None or self._layer.shape[:2] != (h, w):
+            self._rebuild_layer(h, w)
+            return
+
+        active = self._active_ids()
+        changed = self._dirty_ids | (active ^ self._prev_active)
+        self._dirty_ids = set()
+        self._prev_active = active
+
+        rects = []
+        for shape_id in changed:
+            old = self._baked.pop(shape_id, None)
+            if old is not None:
+                rects.append(old)
+            if shape_id not in active and shape_id in self.index:
+                bbox = self.index.bbox(shape_id)
+                self._baked[shape_id] = bbox
+                rects.append(bbox)
+        for rect in rects:
+            self._redraw_rect(rect)
+
+    def draw_ui(self, frame):
+        self._sync_layer(frame)
+        cv2.copyTo(self._layer, self._mask, frame)
+
+        # Shapes held by a hand change every frame: draw them live, in draw order, keeping the
+        # shapes above them on top
+        held = {id(s): s for s in (self.selected_left, self.selected_right) if s is not None}
+        for shape in sorted(held.values(), key=lambda s: s.get("id", 0)):
+            self.draw_shape(frame, shape)
+            self._restore_above(frame, shape)
+
+        # Draw current drawing
+        if self.drawing and self.current_draw and len(self.current_draw["points"]) > 1:
+            cv2.polylines(frame, [self.current_draw["points"].points], False, self.current_draw["color"],
+                          self.stroke_width)
 
-        return frame
\ No newline at end of file
+        for x0, y0, x1, y1 in self._ui_rects:
+            cv2.copyTo(self._ui[y0:y1, x0:x1], self._ui_mask[y0:y1, x0:x1], frame[y0:y1, x0:x1])
+        return frame
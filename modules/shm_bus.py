@@ -0,0 +1,303 @@
+# modules/shm_bus.py
+"""
+Shared-memory hand bus: one process runs the camera and hand model and publishes every
+frame's landmarks and gesture events; any number of local processes read them.
+
+Layout of the shared memory block:
+    header  64 bytes: magic, version, max_hands, max_events, slots, then the u64 sequence
+            number of the newest complete frame (0 = nothing published yet)
+    ring    `slots` fixed-size frame records (see frame_dtype), frame n in slot n % slots
+
+Each record is a seqlock: the publisher sets its `lock` to 2n - 1 before writing frame n and
+to 2n after. A reader copies the record and accepts it when `lock` read 2n both before and
+after the copy; otherwise it was overwritten meanwhile and the reader moves on. There is no
+lock, syscall or serialization on either side, so readers never slow the publisher down.
+(CPython has no memory fences: this relies on stores becoming visible in program order,
+as they do on x86-64.)
+"""
+import math
+import struct
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from modules.gestures import HANDS, GestureEvent
+from modules.hand_features import NUM_LANDMARKS
+
+
+DEFAULT_NAME = "visiontouch_hands"
+MAGIC = b"VTSB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")  # magic, version, max_hands, max_events, slots
+HEADER_SIZE = 64
+HEAD_OFFSET = 32  # u64 sequence number of the newest complete frame
+
+EVENT_TYPES = ("pinch_start", "click", "pinch_move", "pinch_end", "zoom_start", "zoom", "zoom_end")
+EVENT_CODES = {name: i for i, name in enumerate(EVENT_TYPES)}
+HAND_CODES = dict(HANDS)  # "left"/"right" -> hand_features.LEFT / RIGHT
+HAND_NAMES = {code: name for name, code in HANDS}
+
+EVENT_DTYPE = np.dtype([
+    ("type", "u1"),
+    ("hand", "i1"),           # LEFT / RIGHT, -1 for two-hand (zoom) events
+    ("x", "<i4"),             # pinch center; zoom: left hand center
+    ("y", "<i4"),
+    ("x2", "<i4"),            # zoom: right hand center
+    ("y2", "<i4"),
+    ("t", "<f8"),
+    ("value", "<f4"),         # NaN = no value
+])
+
+
+def frame_dtype(max_hands, max_events):
+    """One frame: landmarks in pixels of the (mirrored) display frame, handedness as the user sees it."""
+    return np.dtype([
+        ("lock", "<u8"),
+        ("seq", "<u8"),
+        ("timestamp", "<f8"),
+        ("width", "<u4"),
+        ("height", "<u4"),
+        ("measured", "u1"),
+        ("n_hands", "u1"),
+        ("n_events", "u1"),
+        ("handedness", "i1", (max_hands,)),
+        ("landmarks", "<f4", (max_hands, NUM_LANDMARKS, 3)),
+        ("events", EVENT_DTYPE, (max_events,)),
+    ])
+
+
+class BusFrame:
+    """One frame read from the bus; events are GestureEvents as the publisher's sandbox saw them."""
+
+    __slots__ = ("seq", "timestamp", "width", "height", "measured", "landmarks", "handedness", "events")
+
+    def __init__(self, rec):
+        """rec: a private 1-record copy; landmarks and handedness are (read-only) views of it."""
+        # One item() call converts every scalar; field-by-field access costs ~0.5 us per field
+        _, self.seq, self.timestamp, self.width, self.height, measured, n, n_events, _, _, events = rec.item()
+        self.measured = bool(measured)
+        self.landmarks = rec["landmarks"][0, :n]
+        self.handedness = rec["handedness"][0, :n]
+        self.events = [_decode_event(*e) for e in events[:n_events].tolist()]
+
+    def __repr__(self):
+        return f"BusFrame(seq={self.seq}, hands={len(self.handedness)}, events={self.events})"
+
+
+def _encode_event(event):
+    if event.hand is not None:
+        (x, y), (x2, y2) = event.pos, (0, 0)
+    else:
+        (x, y), (x2, y2) = event.pos or ((0, 0), (0, 0))
+    value = math.nan if event.value is None else event.value
+    return EVENT_CODES[event.type], HAND_CODES.get(event.hand, -1), x, y, x2, y2, event.t, value
+
+
+def _decode_event(kind, hand, x, y, x2, y2, t, value):
+    kind = EVENT_TYPES[kind]
+    if hand >= 0:
+        pos = (x, y)
+    elif kind == "zoom_end":
+        pos = None
+    else:
+        pos = ((x, y), (x2, y2))
+    return GestureEvent(kind, HAND_NAMES.get(hand), pos, t, None if math.isnan(value) else value)
+
+
+def _attach(name):
+    """Open an existing block without handing it to this process's resource tracker."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Older versions register every attached block, and the tracker unlinks it when this
+    # process exits, taking the bus down for everyone; only the publisher owns the block.
+    # The patch is process-wide: a block created by another thread meanwhile would go
+    # untracked too, so attach subscribers before starting threads that create blocks.
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _views(buf, dtype, slots):
+    """(head, raw ring bytes (slots, itemsize), per-slot lock words) over the block."""
+    head = np.ndarray((1,), "<u8", buf, offset=HEAD_OFFSET)
+    raw = np.ndarray((slots, dtype.itemsize), np.uint8, buf, offset=HEADER_SIZE)
+    locks = np.ndarray((slots,), "<u8", buf, offset=HEADER_SIZE, strides=(dtype.itemsize,))
+    return head, raw, locks
+
+
+class LandmarkPublisher:
+    """
+    Creates the shared memory block and publishes one record per frame.
+
+        publisher = LandmarkPublisher()
+        publisher.publish(landmarks, handedness, sandbox.events, measured, img.shape[1], img.shape[0])
+    """
+
+    def __init__(self, name=DEFAULT_NAME, slots=64, max_hands=2, max_events=16):
+        """slots: frames kept in the ring; a reader that falls further behind skips ahead."""
+        self.name = name
+        self.slots = slots
+        self.max_hands = max_hands
+        self.max_events = max_events
+        self.dtype = frame_dtype(max_hands, max_events)
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=HEADER_SIZE + slots * self.dtype.itemsize)
+        HEADER.pack_into(self.shm.buf, 0, MAGIC, VERSION, max_hands, max_events, slots)
+        self._head, self._raw, self._locks = _views(self.shm.buf, self.dtype, slots)
+        self._head[0] = 0
+        # Each frame is assembled here and copied into its slot in one go
+        self._staging = np.zeros(1, self.dtype)
+        self._staging_bytes = self._staging.view(np.uint8)
+        self.seq = 0
+        self.dropped_events = 0
+
+    def publish(self, landmarks, handedness, events=(), measured=True, width=0, height=0, timestamp=None):
+        """
+        Publish one frame: (n, 21, 3) landmarks, (n,) handedness codes and GestureEvents.
+        Returns its sequence number.
+        """
+        seq = self.seq + 1
+        slot = seq % self.slots
+        rec = self._staging
+        n = min(len(handedness), self.max_hands)
+        if len(events) > self.max_events:
+            self.dropped_events += len(events) - self.max_events
+            events = events[:self.max_events]
+
+        rec["lock"] = 2 * seq - 1
+        rec["seq"] = seq
+        rec["timestamp"] = time.perf_counter() if timestamp is None else timestamp
+        rec["width"] = width
+        rec["height"] = height
+        rec["measured"] = measured
+        rec["n_hands"] = n
+        rec["n_events"] = len(events)
+        rec["handedness"][0, :n] = handedness[:n]
+        rec["landmarks"][0, :n] = landmarks[:n]
+        if events:
+            rec["events"][0, :len(events)] = [_encode_event(e) for e in events]
+
+        self._locks[slot] = 2 * seq - 1  # readers now reject the slot...
+        self._raw[slot] = self._staging_bytes
+        self._locks[slot] = 2 * seq  # ...until the whole frame is in
+        self._head[0] = seq
+        self.seq = seq
+        return seq
+
+    def close(self):
+        """Remove the block; subscribers still attached keep their mapping until they close."""
+        if self.shm is None:
+            return
+        self._head = self._raw = self._locks = None
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LandmarkSubscriber:
+    """
+    Reads frames published by a LandmarkPublisher in another process.
+
+        with LandmarkSubscriber() as bus:
+            while True:
+                for frame in bus.wait(timeout=1.0):
+                    for event in frame.events: ...
+
+    poll() returns every frame published since the previous call that is still in the ring;
+    frames overwritten before they were read are counted in `missed`. Timestamps are the
+    publisher's time.perf_counter(), which is system-wide on Linux and Windows, so
+    time.perf_counter() - frame.timestamp is the delivery latency.
+    """
+
+    def __init__(self, name=DEFAULT_NAME):
+        self.name = name
+        self.shm = _attach(name)
+        magic, version, max_hands, max_events, slots = HEADER.unpack_from(self.shm.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self.shm.close()
+            if magic != MAGIC:
+                raise ValueError(f"Shared memory {name!r} is not a hand bus")
+            raise ValueError(f"Unsupported hand bus version {version}")
+        self.max_hands = max_hands
+        self.max_events = max_events
+        self.slots = slots
+        self.dtype = frame_dtype(max_hands, max_events)
+        self._head, self._raw, self._locks = _views(self.shm.buf, self.dtype, slots)
+        self.last_seq = self.head  # poll() starts with the frames published after attaching
+        self.missed = 0
+
+    @property
+    def head(self):
+        """Sequence number of the newest published frame."""
+        return int(self._head[0])
+
+    def read(self, seq):
+        """Frame `seq`, or None when it is not (or no longer) in the ring."""
+        slot = seq % self.slots
+        lock = 2 * seq
+        if self._locks[slot] != lock:
+            return None
+        rec = np.frombuffer(self._raw[slot].tobytes(), self.dtype)
+        if self._locks[slot] != lock:
+            return None
+        return BusFrame(rec)
+
+    def latest(self):
+        """The newest frame (None before the first one), without affecting poll()."""
+        head = self.head
+        while head:
+            frame = self.read(head)
+            if frame is not None:
+                return frame
+            head = self.head  # overwritten while reading: take the newer one
+        return None
+
+    def poll(self):
+        """Frames published since the last poll(), oldest first."""
+        head = self.head
+        start = self.last_seq + 1
+        if head - start >= self.slots:
+            # Too far behind: the oldest of these are overwritten or about to be
+            self.missed += head - self.slots + 1 - start
+            start = head - self.slots + 1
+        frames = []
+        for seq in range(start, head + 1):
+            frame = self.read(seq)
+            if frame is None:
+                self.missed += 1
+            else:
+                frames.append(frame)
+        self.last_seq = max(self.last_seq, head)
+        return frames
+
+    def wait(self, timeout=None, interval=0.0002):
+        """Like poll(), but wait up to `timeout` seconds for at least one new frame."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while self.head <= self.last_seq:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return []
+            time.sleep(interval)
+        return self.poll()
+
+    def close(self):
+        if self.shm is None:
+            return
+        self._head = self._raw = self._locks = None
+        self.shm.close()
+        self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,136 @@
+# modules/spatial_index.py
+import numpy as np
+
+
+class GridIndex:
+    """
+    Uniform grid over axis-aligned bounding boxes (x0, y0, x1, y1), inclusive.
+    Each key is registered in every cell its box overlaps, so a point query only
+    looks at the keys of a single cell.
+    """
+
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}   # (col, row) -> set of keys
+        self.bboxes = {}  # key -> bbox
+        self._spans = {}  # key -> (col0, row0, col1, row1)
+
+    def __len__(self):
+        return len(self.bboxes)
+
+    def __contains__(self, key):
+        return key in self.bboxes
+
+    def _span(self, bbox):
+        cs = self.cell_size
+        x0, y0, x1, y1 = bbox
+        return int(x0 // cs), int(y0 // cs), int(x1 // cs), int(y1 // cs)
+
+    def _add_cells(self, key, span):
+        c0, r0, c1, r1 = span
+        for col in range(c0, c1 + 1):
+            for row in range(r0, r1 + 1):
+                self.cells.setdefault((col, row), set()).add(key)
+
+    def _remove_cells(self, key, span):
+        c0, r0, c1, r1 = span
+        for col in range(c0, c1 + 1):
+            for row in range(r0, r1 + 1):
+                cell = self.cells.get((col, row))
+                if cell is not None:
+                    cell.discard(key)
+                    if not cell:
+                        del self.cells[(col, row)]
+
+    def insert(self, key, bbox):
+        if key in self.bboxes:
+            self.update(key, bbox)
+            return
+        span = self._span(bbox)
+        self.bboxes[key] = bbox
+        self._spans[key] = span
+        self._add_cells(key, span)
+
+    def bulk_insert(self, keys, bboxes):
+        """
+        Insert many new keys at once; bboxes is an (n, 4) integer array. Cell membership is
+        worked out with NumPy, so loading a large scene does not loop over every covered cell.
+        """
+        bboxes = np.asarray(bboxes, np.int64).reshape(-1, 4)
+        if not len(bboxes):
+            return
+        keys = np.asarray(keys)
+        spans = bboxes // self.cell_size
+        key_list = keys.tolist()
+        self.bboxes.update(zip(key_list, zip(*bboxes.T.tolist())))
+        self._spans.update(zip(key_list, zip(*spans.T.tolist())))
+
+        # One (key, col, row) triple per covered cell
+        cols = spans[:, 2] - spans[:, 0] + 1
+        rows = spans[:, 3] - spans[:, 1] + 1
+        counts = cols * rows
+        owner = np.repeat(np.arange(len(keys)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        col = spans[owner, 0] + local % cols[owner]
+        row = spans[owner, 1] + local // cols[owner]
+
+        # Group by cell; rows are offset so negative ones sort correctly within a column
+        cell = col * (1 << 32) + (row + (1 << 31))
+        order = np.argsort(cell, kind="stable")
+        cell, col, row, members = cell[order], col[order], row[order], keys[owner[order]]
+        starts = np.flatnonzero(np.r_[True, cell[1:] != cell[:-1]])
+        ends = np.r_[starts[1:], len(cell)]
+        for c, r, a, b in zip(col[starts].tolist(), row[starts].tolist(), starts.tolist(), ends.tolist()):
+            self.cells.setdefault((c, r), set()).update(members[a:b].tolist())
+
+    def update(self, key, bbox):
+        old_span = self._spans.get(key)
+        if old_span is None:
+            self.insert(key, bbox)
+            return
+        span = self._span(bbox)
+        self.bboxes[key] = bbox
+        if span != old_span:
+            self._remove_cells(key, old_span)
+            self._add_cells(key, span)
+            self._spans[key] = span
+
+    def remove(self, key):
+        span = self._spans.pop(key, None)
+        if span is None:
+            return
+        del self.bboxes[key]
+        self._remove_cells(key, span)
+
+    def bbox(self, key):
+        return self.bboxes.get(key)
+
+    def query_point(self, px, py):
+        """Keys whose bbox contains the point."""
+        cs = self.cell_size
+        cell = self.cells.get((int(px // cs), int(py // cs)))
+        if not cell:
+            return []
+        hits = []
+        for key in cell:
+            x0, y0, x1, y1 = self.bboxes[key]
+            if x0 <= px <= x1 and y0 <= py <= y1:
+                hits.append(key)
+        return hits
+
+    def query_rect(self, rect):
+        """Keys whose bbox intersects rect (x0, y0, x1, y1)."""
+        c0, r0, c1, r1 = self._span(rect)
+        x0, y0, x1, y1 = rect
+        found = set()
+        for col in range(c0, c1 + 1):
+            for row in range(r0, r1 + 1):
+                cell = self.cells.get((col, row))
+                if cell:
+                    found.update(cell)
+        hits = []
+        for key in found:
+            bx0, by0, bx1, by1 = self.bboxes[key]
+            if bx0 <= x1 and x0 <= bx1 and by0 <= y1 and y0 <= by1:
+                hits.append(key)
+        return hits
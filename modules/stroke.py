@@ -0,0 +1,279 @@
+# modules/stroke.py
+import math
+import time
+
+import numpy as np
+
+
+class Stroke:
+    """
+    Freehand stroke stored as a growable int32 (n, 2) buffer.
+
+    Moving a stroke only changes its offset; bounding box and centroid are kept up to date
+    as points are appended, so dragging and hit-testing cost the same for any stroke length.
+    """
+
+    def __init__(self, points=(), capacity=64):
+        points = np.asarray(points, np.int32).reshape(-1, 2)
+        self._buf = np.empty((max(capacity, len(points)), 2), np.int32)
+        self._n = 0
+        self._min = None     # (x, y) of the raw points
+        self._max = None
+        self._sum = [0, 0]
+        self.offset = (0, 0)
+        self._view = None    # cached offset points
+        self.extend(points)
+
+    @classmethod
+    def from_raw(cls, raw, offset=(0, 0), bounds=None):
+        """
+        Wrap an (n, 2) int32 array of untranslated points without copying it, e.g. a slice of a
+        memory-mapped scene snapshot. bounds: precomputed (min, max, sum) of the raw points as
+        [x, y] lists, so that none of them has to be read. Appending copies the points first.
+        """
+        stroke = cls.__new__(cls)
+        stroke._buf = raw
+        stroke._n = len(raw)
+        if bounds is None:
+            if len(raw):
+                bounds = (raw.min(axis=0).tolist(), raw.max(axis=0).tolist(),
+                          raw.sum(axis=0, dtype=np.int64).tolist())
+            else:
+                bounds = (None, None, [0, 0])
+        stroke._min, stroke._max, stroke._sum = (list(v) if v is not None else None for v in bounds)
+        stroke.offset = (int(offset[0]), int(offset[1]))
+        stroke._view = None
+        return stroke
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, i):
+        # One row of the raw buffer: going through `points` would translate the whole stroke
+        x, y = self._buf[:self._n][i].tolist()
+        return x + self.offset[0], y + self.offset[1]
+
+    def __iter__(self):
+        return iter(map(tuple, self.points.tolist()))
+
+    def append(self, point):
+        x, y = int(point[0]) - self.offset[0], int(point[1]) - self.offset[1]
+        if self._n == len(self._buf):
+            grown = np.empty((2 * len(self._buf), 2), np.int32)
+            grown[:self._n] = self._buf[:self._n]
+            self._buf = grown
+        self._buf[self._n] = (x, y)
+        self._n += 1
+        if self._min is None:
+            self._min, self._max = [x, y], [x, y]
+        else:
+            self._min = [min(self._min[0], x), min(self._min[1], y)]
+            self._max = [max(self._max[0], x), max(self._max[1], y)]
+        self._sum[0] += x
+        self._sum[1] += y
+        self._view = None
+
+    def extend(self, points):
+        points = np.asarray(points, np.int32).reshape(-1, 2)
+        if not len(points):
+            return
+        raw = points - np.array(self.offset, np.int32)
+        needed = self._n + len(raw)
+        if needed > len(self._buf):
+            grown = np.empty((max(needed, 2 * len(self._buf)), 2), np.int32)
+            grown[:self._n] = self._buf[:self._n]
+            self._buf = grown
+        self._buf[self._n:needed] = raw
+        self._n = needed
+        lo, hi = raw.min(axis=0).tolist(), raw.max(axis=0).tolist()
+        if self._min is None:
+            self._min, self._max = lo, hi
+        else:
+            self._min = [min(self._min[0], lo[0]), min(self._min[1], lo[1])]
+            self._max = [max(self._max[0], hi[0]), max(self._max[1], hi[1])]
+        total = raw.sum(axis=0, dtype=np.int64).tolist()
+        self._sum = [self._sum[0] + total[0], self._sum[1] + total[1]]
+        self._view = None
+
+    def replace_last(self, point):
+        """Move the last point (used when a new point continues the last segment)."""
+        x, y = int(point[0]) - self.offset[0], int(point[1]) - self.offset[1]
+        old_x, old_y = self._buf[self._n - 1].tolist()
+        self._buf[self._n - 1] = (x, y)
+        self._min = [min(self._min[0], x), min(self._min[1], y)]
+        self._max = [max(self._max[0], x), max(self._max[1], y)]
+        self._sum = [self._sum[0] - old_x + x, self._sum[1] - old_y + y]
+        self._view = None
+
+    def truncate(self, n):
+        """Keep only the first n points."""
+        self._n = min(n, self._n)
+        raw = self._buf[:self._n]
+        if self._n:
+            self._min, self._max = raw.min(axis=0).tolist(), raw.max(axis=0).tolist()
+            self._sum = raw.sum(axis=0, dtype=np.int64).tolist()
+        else:
+            self._min = self._max = None
+            self._sum = [0, 0]
+        self._view = None
+
+    def translate(self, dx, dy):
+        self.offset = (self.offset[0] + int(dx), self.offset[1] + int(dy))
+        self._view = None
+
+    @property
+    def raw(self):
+        """(n, 2) int32 array of the points without the offset. Do not modify."""
+        return self._buf[:self._n]
+
+    @property
+    def points(self):
+        """(n, 2) int32 array of the stroke's current coordinates. Do not modify."""
+        if self._view is None:
+            self._view = self._buf[:self._n] + np.array(self.offset, np.int32)
+        return self._view
+
+    def bbox(self):
+        """Inclusive (x0, y0, x1, y1), or None for an empty stroke."""
+        if self._min is None:
+            return None
+        ox, oy = self.offset
+        return self._min[0] + ox, self._min[1] + oy, self._max[0] + ox, self._max[1] + oy
+
+    def centroid(self):
+        if not self._n:
+            return None
+        return self._sum[0] / self._n + self.offset[0], self._sum[1] / self._n + self.offset[1]
+
+
+def rdp(points, epsilon):
+    """Ramer-Douglas-Peucker simplification of an (n, 2) array; the end points are always kept."""
+    n = len(points)
+    if n < 3:
+        return points.copy()
+    pts = points.astype(np.float64)
+    keep = np.zeros(n, bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j <= i + 1:
+            continue
+        seg = pts[j] - pts[i]
+        d = pts[i + 1:j] - pts[i]
+        length = math.hypot(seg[0], seg[1])
+        if length == 0:
+            dist = np.hypot(d[:, 0], d[:, 1])
+        else:
+            dist = np.abs(seg[0] * d[:, 1] - seg[1] * d[:, 0]) / length
+        k = int(np.argmax(dist))
+        if dist[k] > epsilon:
+            m = i + 1 + k
+            keep[m] = True
+            stack.append((i, m))
+            stack.append((m, j))
+    return points[keep]
+
+
+class OneEuroFilter:
+    """One Euro filter for 2D points: smooths jitter at low speed, follows fast moves with little lag."""
+
+    def __init__(self, min_cutoff=1.0, beta=0.02, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self._x = None
+        self._dx = (0.0, 0.0)
+        self._t = None
+
+    @staticmethod
+    def _alpha(dt, cutoff):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, point, t):
+        x, y = float(point[0]), float(point[1])
+        if self._x is None:
+            self._x, self._t = (x, y), t
+            return x, y
+        dt = t - self._t if t > self._t else 1.0 / 30
+        self._t = t
+
+        a_d = self._alpha(dt, self.d_cutoff)
+        dx = a_d * (x - self._x[0]) / dt + (1 - a_d) * self._dx[0]
+        dy = a_d * (y - self._x[1]) / dt + (1 - a_d) * self._dx[1]
+        self._dx = (dx, dy)
+
+        a = self._alpha(dt, self.min_cutoff + self.beta * math.hypot(dx, dy))
+        self._x = (a * x + (1 - a) * self._x[0], a * y + (1 - a) * self._x[1])
+        return self._x
+
+
+class StrokeBuilder:
+    """
+    Builds a Stroke from raw pinch positions while they arrive:
+      - One Euro smoothing (smoothing=False turns it off),
+      - points closer than min_distance to the last kept point are dropped,
+      - a point continuing the last segment (within angle_tolerance degrees and epsilon pixels)
+        moves the segment end instead of adding a point,
+      - every `window` new points the open tail is simplified with RDP and frozen.
+    finish() simplifies the remaining tail; the builder's stroke is what gets stored.
+
+    The defaults keep a slow stroke with 1 px fingertip jitter within 3 px of the drawn path at
+    a tenth of the points, and a pinch held still with 2 px jitter at a few points. Without the
+    smoothing, jitter alone keeps about a third of the points.
+    """
+
+    def __init__(self, min_distance=3.0, angle_tolerance=10.0, epsilon=3.0, window=48,
+                 smoothing=True, min_cutoff=1.0, beta=0.1):
+        self.stroke = Stroke()
+        self.min_distance = min_distance
+        self.cos_tolerance = math.cos(math.radians(angle_tolerance))
+        self.epsilon = epsilon
+        self.window = window
+        self.filter = OneEuroFilter(min_cutoff, beta) if smoothing else None
+        self.raw_count = 0
+        self._anchor = 0  # index of the last frozen point
+
+    def __len__(self):
+        return len(self.stroke)
+
+    def _continues_segment(self, x, y):
+        (px, py), (lx, ly) = self.stroke[-2], self.stroke[-1]
+        ax, ay, bx, by = lx - px, ly - py, x - lx, y - ly
+        la, lb = math.hypot(ax, ay), math.hypot(bx, by)
+        if la == 0 or lb == 0 or (ax * bx + ay * by) < self.cos_tolerance * la * lb:
+            return False
+        # Distance of the point being dropped from the new segment
+        sx, sy = x - px, y - py
+        return abs(sx * (ly - py) - sy * (lx - px)) <= self.epsilon * math.hypot(sx, sy)
+
+    def add(self, point, t=None):
+        self.raw_count += 1
+        x, y = point
+        if self.filter is not None:
+            x, y = self.filter((x, y), time.perf_counter() if t is None else t)
+        x, y = int(round(x)), int(round(y))
+
+        n = len(self.stroke)
+        if n:
+            lx, ly = self.stroke[-1]
+            if math.hypot(x - lx, y - ly) < self.min_distance:
+                return
+        if n >= 2 and n - 1 > self._anchor and self._continues_segment(x, y):
+            self.stroke.replace_last((x, y))
+            return
+
+        self.stroke.append((x, y))
+        if len(self.stroke) - self._anchor > self.window:
+            self._simplify_tail()
+
+    def _simplify_tail(self):
+        tail = rdp(self.stroke.points[self._anchor:], self.epsilon)
+        self.stroke.truncate(self._anchor)
+        self.stroke.extend(tail)
+        self._anchor = max(0, len(self.stroke) - 1)
+
+    def finish(self):
+        self._simplify_tail()
+        return self.stroke
@@ -0,0 +1,194 @@
+# modules/telemetry.py
+import csv
+import json
+import time
+
+import cv2
+import numpy as np
+
+
+PERCENTILES = (50, 95, 99)
+
+
+class RollingHistogram:
+    """Last `window` samples in a ring buffer; percentiles are computed on demand."""
+
+    def __init__(self, window=600):
+        self.samples = np.zeros(window, np.float64)
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+
+    def add(self, value):
+        self.samples[self.count % len(self.samples)] = value
+        self.count += 1
+        self.total += value
+        self.last = value
+
+    def values(self):
+        return self.samples[:min(self.count, len(self.samples))]
+
+    def percentiles(self, q=PERCENTILES):
+        values = self.values()
+        if not len(values):
+            return [0.0] * len(q)
+        return np.percentile(values, q).tolist()
+
+
+class _StageTimer:
+    __slots__ = ("hist", "t0")
+
+    def __init__(self, hist):
+        self.hist = hist
+        self.t0 = 0.0
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.add(time.perf_counter() - self.t0)
+        return False
+
+
+class FrameProfiler:
+    """
+    Per-stage frame timing with rolling p50/p95/p99.
+
+        with profiler.stage("find_hands"):
+            detector.find_hands(frame)
+
+    Stage names keep the order they were first seen. "frame" is the whole loop iteration,
+    measured between start_frame() and end_frame().
+
+    mark(name) records one-off events as seconds since `started` (by default the profiler's
+    creation), e.g. mark("first_frame") for the time to first frame.
+
+    sample(name, value) records values that are not timings, e.g. queue depths; they are kept
+    apart from the stages as gauges.
+
+    `extra` holds further sections of the JSON export, e.g. the quality governor's stats.
+    """
+
+    def __init__(self, window=600, started=None):
+        self.window = window
+        self.stages = {}
+        self.gauges = {}
+        self.marks = {}
+        self.extra = {}
+        self._timers = {}
+        self._frame_start = None
+        self.started = time.perf_counter() if started is None else started
+
+    def _hist(self, name):
+        hist = self.stages.get(name)
+        if hist is None:
+            hist = self.stages[name] = RollingHistogram(self.window)
+            self._timers[name] = _StageTimer(hist)
+        return hist
+
+    def stage(self, name):
+        timer = self._timers.get(name)
+        if timer is None:
+            self._hist(name)
+            timer = self._timers[name]
+        return timer
+
+    def record(self, name, seconds):
+        self._hist(name).add(seconds)
+
+    def sample(self, name, value):
+        hist = self.gauges.get(name)
+        if hist is None:
+            hist = self.gauges[name] = RollingHistogram(self.window)
+        hist.add(value)
+
+    def mark(self, name):
+        self.marks[name] = time.perf_counter() - self.started
+
+    def start_frame(self):
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if self._frame_start is not None:
+            self.record("frame", time.perf_counter() - self._frame_start)
+            self._frame_start = None
+
+    def summary(self):
+        """{stage: {count, last_ms, mean_ms, p50_ms, p95_ms, p99_ms}} plus fps of the frame stage."""
+        out = {}
+        for name, hist in self.stages.items():
+            values = hist.values()
+            p50, p95, p99 = hist.percentiles()
+            out[name] = {
+                "count": hist.count,
+                "last_ms": hist.last * 1000,
+                "mean_ms": float(values.mean()) * 1000 if len(values) else 0.0,
+                "p50_ms": p50 * 1000,
+                "p95_ms": p95 * 1000,
+                "p99_ms": p99 * 1000,
+            }
+        frame = out.get("frame")
+        if frame and frame["mean_ms"] > 0:
+            frame["fps"] = 1000.0 / frame["mean_ms"]
+        return out
+
+    def gauge_summary(self):
+        """{gauge: {count, last, mean, max}} over the rolling window."""
+        out = {}
+        for name, hist in self.gauges.items():
+            values = hist.values()
+            out[name] = {
+                "count": hist.count,
+                "last": hist.last,
+                "mean": float(values.mean()) if len(values) else 0.0,
+                "max": float(values.max()) if len(values) else 0.0,
+            }
+        return out
+
+    def draw_hud(self, img, origin=(40, 160)):
+        """Overlay the per-stage p50/p95 and the gauges on the frame."""
+        x, y = origin
+        lines = []
+        for name, s in self.summary().items():
+            text = f"{name:<12} p50 {s['p50_ms']:5.1f}  p95 {s['p95_ms']:5.1f} ms"
+            if "fps" in s:
+                text += f"  ({s['fps']:.0f} FPS)"
+            lines.append(text)
+        for name, g in self.gauge_summary().items():
+            lines.append(f"{name:<12} mean {g['mean']:5.2f}  max {g['max']:g}")
+        for text in lines:
+            cv2.putText(img, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 255, 0), 1)
+            y += 22
+        return img
+
+    def export_json(self, path):
+        with open(path, "w") as f:
+            json.dump({"timestamp": time.time(), "marks": self.marks, "stages": self.summary(),
+                       "gauges": self.gauge_summary(), **self.extra}, f, indent=2)
+
+    def export_csv(self, path):
+        fields = ["stage", "count", "last_ms", "mean_ms", "p50_ms", "p95_ms", "p99_ms"]
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            for name, s in self.summary().items():
+                writer.writerow({"stage": name, **s})
+            for name, seconds in self.marks.items():
+                writer.writerow({"stage": name, "count": 1, "last_ms": seconds * 1000})
+
+    def export(self, path):
+        """Write JSON or CSV depending on the file extension."""
+        if path.lower().endswith(".csv"):
+            self.export_csv(path)
+        else:
+            self.export_json(path)
+
+    def print_summary(self):
+        for name, s in self.summary().items():
+            print(f"  {name:<12} p50 {s['p50_ms']:6.2f}  p95 {s['p95_ms']:6.2f}  "
+                  f"p99 {s['p99_ms']:6.2f} ms  (n={s['count']})")
+        for name, g in self.gauge_summary().items():
+            print(f"  {name:<12} mean {g['mean']:6.2f}  max {g['max']:g}  (n={g['count']})")
+        for name, seconds in self.marks.items():
+            print(f"  {name:<12} at {seconds * 1000:.0f} ms")
@@ -0,0 +1,120 @@
+# tests/test_draw_utils.py
+import numpy as np
+
+from modules.draw_utils import AirDrawer
+
+
+WIDTH, HEIGHT = 640, 480
+
+
+def pan(drawer, dx, dy, start=(300, 300)):
+    drawer.draw(None, *start, "MOVE")
+    drawer.draw(None, start[0] + dx, start[1] + dy, "MOVE")
+    drawer.draw(None, 0, 0, "NONE")
+
+
+def ink(drawer):
+    """Boolean (HEIGHT, WIDTH) map of the screen pixels the drawer composites ink onto."""
+    frame = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+    drawer.overlay_on_frame(frame)
+    return frame.any(axis=2)
+
+
+def stroke(drawer, x0, x1, y):
+    for x in range(x0, x1 + 1, 5):
+        drawer.draw(None, x, y, "DRAW")
+    drawer.draw(None, 0, 0, "NONE")
+
+
+def test_draw_without_pan():
+    drawer = AirDrawer(WIDTH, HEIGHT)
+    stroke(drawer, 100, 200, 240)
+    assert ink(drawer)[240, 100:201].all()
+
+
+def test_draw_after_pan_outside_the_original_canvas():
+    drawer = AirDrawer(WIDTH, HEIGHT)
+    pan(drawer, 300, 0)
+    stroke(drawer, 100, 200, 240)
+    screen = ink(drawer)
+    assert screen[240, 100:201].all()
+    assert screen.sum() == screen[230:251, 90:211].sum()  # nothing anywhere else
+
+    pan(drawer, -300, 0)
+    assert not ink(drawer).any()  # moved off screen, not lost
+    pan(drawer, 300, 0)
+    assert ink(drawer)[240, 100:201].all()
+
+
+def test_canvas_grows_in_every_direction():
+    drawer = AirDrawer(WIDTH, HEIGHT)
+    stroke(drawer, 300, 400, 200)
+    pan(drawer, -200, -100)
+    stroke(drawer, 500, 600, 400)  # past the canvas' right and bottom edges
+    pan(drawer, 400, 300)
+    stroke(drawer, 10, 60, 20)     # past its left and top edges
+    screen = ink(drawer)
+    assert screen[400, 500:601].all()  # first stroke, panned by (200, 200) in total
+    assert screen[20, 10:61].all()
+    # Nothing else on screen: the second stroke is at (900..1000, 700) now
+    assert screen.sum() == screen[390:411, 490:611].sum() + screen[10:31, 0:71].sum()
+
+    pan(drawer, -400, -300)
+    screen = ink(drawer)
+    assert screen[400, 500:601].all()  # second stroke back where it was drawn
+    assert screen[100, 100:201].all()  # first stroke
+
+
+def test_erase_after_pan():
+    drawer = AirDrawer(WIDTH, HEIGHT)
+    pan(drawer, 300, 0)
+    stroke(drawer, 100, 200, 240)
+    drawer.draw(None, 150, 240, "ERASE")
+    screen = ink(drawer)
+    assert not screen[240, 120:181].any()
+    assert screen[240, 100:110].all() and screen[240, 195:201].all()
+    # Erasing where there has never been ink is a no-op
+    drawer.draw(None, 600, 50, "ERASE")
+    assert (ink(drawer) == screen).all()
+
+
+def test_clear_resets_canvas():
+    drawer = AirDrawer(WIDTH, HEIGHT)
+    pan(drawer, 300, 0)
+    stroke(drawer, 100, 200, 240)
+    drawer.clear()
+    assert drawer.tiles == {} and drawer.offset == (0, 0)
+    assert not ink(drawer).any()
+
+
+def test_memory_follows_the_ink_not_the_pans():
+    drawer = AirDrawer(WIDTH, HEIGHT)
+    for _ in range(10):
+        pan(drawer, -WIDTH, -HEIGHT)  # diagonal, a full screen each time
+    assert drawer.tiles == {}
+    for _ in range(10):
+        stroke(drawer, 100, 200, 240)
+        pan(drawer, -WIDTH, -HEIGHT)
+    assert len(drawer.tiles) <= 10 * 2  # a short stroke touches one or two tiles
+    pan(drawer, 10 * WIDTH, 10 * HEIGHT)
+    assert ink(drawer)[240, 100:201].all()  # the first stroke is still there
+
+
+def test_tiles_are_capped_keeping_those_near_the_screen():
+    drawer = AirDrawer(WIDTH, HEIGHT, max_tiles=4)
+    for _ in range(10):
+        stroke(drawer, 100, 110, 100)  # inside a single tile
+        pan(drawer, -WIDTH, 0)
+    pan(drawer, WIDTH, 0)
+    assert len(drawer.tiles) == 4
+    assert ink(drawer)[100, 100:111].all()  # the newest stroke is kept
+    pan(drawer, 9 * WIDTH, 0)
+    assert not ink(drawer).any()  # the oldest was evicted
+
+
+def test_erasing_all_ink_frees_the_tile():
+    drawer = AirDrawer(WIDTH, HEIGHT)
+    stroke(drawer, 100, 120, 100)
+    assert len(drawer.tiles) == 1
+    drawer.draw(None, 110, 100, "ERASE")
+    assert drawer.tiles == {} and not ink(drawer).any()
@@ -0,0 +1,78 @@
+# tests/test_gestures.py
+import numpy as np
+
+from modules.gestures import GestureEngine
+from modules.hand_features import INDEX_TIP, LEFT, NUM_LANDMARKS, RIGHT, THUMB_TIP, empty_landmarks
+
+
+def hands(*specs):
+    """Landmarks and handedness for (code, center x, center y, thumb-index distance) hands."""
+    landmarks = np.zeros((len(specs), NUM_LANDMARKS, 3), np.float32)
+    handedness = np.zeros(len(specs), np.int8)
+    for i, (code, x, y, gap) in enumerate(specs):
+        landmarks[i, :, :2] = (x, y)
+        landmarks[i, THUMB_TIP, :2] = (x - gap / 2, y)
+        landmarks[i, INDEX_TIP, :2] = (x + gap / 2, y)
+        handedness[i] = code
+    return landmarks, handedness
+
+
+def types(events):
+    return [e.type for e in events]
+
+
+def test_pinch_start_move_end_with_debounce():
+    engine = GestureEngine(debounce=0.04)
+    assert engine.update(*hands((LEFT, 100, 100, 80)), t=0.0) == []
+    # Closed, but not yet for the debounce time
+    assert engine.update(*hands((LEFT, 100, 100, 10)), t=0.01) == []
+    events = engine.update(*hands((LEFT, 100, 100, 10)), t=0.06)
+    assert types(events) == ["pinch_start", "click", "pinch_move"]
+    assert events[0].hand == "left" and events[0].pos == (100, 100)
+
+    events = engine.update(*hands((LEFT, 150, 120, 10)), t=0.1)
+    assert types(events) == ["pinch_move"] and events[0].pos == (150, 120)
+
+    engine.update(*hands((LEFT, 150, 120, 80)), t=0.12)
+    events = engine.update(*hands((LEFT, 150, 120, 80)), t=0.2)
+    assert types(events) == ["pinch_end"]
+    assert not engine.pinching("left")
+
+
+def test_release_hysteresis():
+    engine = GestureEngine(debounce=0.0)
+    engine.update(*hands((RIGHT, 100, 100, 10)), t=0.0)
+    assert engine.pinching("right")
+    # Between the pinch and release thresholds: still pinching
+    assert types(engine.update(*hands((RIGHT, 100, 100, 50)), t=0.1)) == ["pinch_move"]
+    assert types(engine.update(*hands((RIGHT, 100, 100, 60)), t=0.2)) == ["pinch_end"]
+
+
+def test_lost_hand_ends_pinch_after_timeout():
+    engine = GestureEngine(debounce=0.0, lost_timeout=0.15)
+    engine.update(*hands((LEFT, 100, 100, 10)), t=0.0)
+    assert engine.update(*empty_landmarks(), t=0.1) == []
+    events = engine.update(*empty_landmarks(), t=0.3)
+    assert types(events) == ["pinch_end"] and events[0].pos == (100, 100)
+
+
+def test_zoom_ratio_between_two_pinching_hands():
+    engine = GestureEngine(debounce=0.0)
+    events = engine.update(*hands((LEFT, 100, 100, 10), (RIGHT, 300, 100, 10)), t=0.0)
+    assert types(events)[-1] == "zoom_start"
+    assert events[-1].pos == ((100, 100), (300, 100)) and events[-1].value == 1.0
+
+    events = engine.update(*hands((LEFT, 100, 100, 10), (RIGHT, 500, 100, 10)), t=0.1)
+    assert types(events) == ["pinch_move", "pinch_move", "zoom"]
+    assert events[-1].value == 2.0
+
+    events = engine.update(*hands((LEFT, 100, 100, 10), (RIGHT, 500, 100, 80)), t=0.2)
+    assert types(events) == ["pinch_move", "pinch_end", "zoom_end"]
+
+
+def test_predicted_frames_do_not_change_pinch_state():
+    engine = GestureEngine(debounce=0.0, require_measured=True)
+    assert engine.update(*hands((LEFT, 100, 100, 10)), t=0.0, measured=False) == []
+    assert types(engine.update(*hands((LEFT, 100, 100, 10)), t=0.1)) == ["pinch_start", "click", "pinch_move"]
+    events = engine.update(*hands((LEFT, 120, 100, 80)), t=0.2, measured=False)
+    assert types(events) == ["pinch_move"] and events[0].pos == (120, 100)
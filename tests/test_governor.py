@@ -0,0 +1,134 @@
+# tests/test_governor.py
+from modules.governor import QualityGovernor, configurable_detector
+from modules.shape_utils import ShapeManager
+
+
+BUDGET = 0.010
+
+
+class FakeDetector:
+    def __init__(self, inference_scale=1.0, model_complexity=1, max_hands=2):
+        self.current = {"inference_scale": inference_scale, "model_complexity": model_complexity,
+                        "max_hands": max_hands}
+        self.configured = []
+
+    def settings(self):
+        return dict(self.current)
+
+    def configure(self, **knobs):
+        self.configured.append(knobs)
+        self.current.update(knobs)
+
+
+class Wrapper:
+    """Like InferenceScheduler or ReplayDetector: no configure() of its own."""
+
+    def __init__(self, detector):
+        self.detector = detector
+
+
+def feed(governor, frame_time, start, seconds, step=0.1):
+    """
+    Feed a constant frame time every step from start, for at most seconds. Stops at the first
+    change; returns (event or None, time of the last update).
+    """
+    t = start
+    for i in range(1, round(seconds / step) + 1):
+        t = start + i * step
+        event = governor.update(frame_time, now=t)
+        if event is not None:
+            return event, t
+    return None, t
+
+
+def test_downgrade_needs_a_sustained_overrun_and_the_band_between_thresholds_holds():
+    governor = QualityGovernor(BUDGET, FakeDetector(), downgrade_after=1.0, upgrade_after=3.0)
+    # Between budget * headroom and the budget: never changes
+    event, t = feed(governor, 0.009, 0.0, 20.0)
+    assert event is None and governor.level == 0
+
+    # Short spikes over the budget do not count
+    for _ in range(5):
+        event, t = feed(governor, 0.020, t, 0.3)
+        assert event is None
+        event, t = feed(governor, 0.002, t, 0.7)
+        assert event is None
+    start = t
+    event, t = feed(governor, 0.020, t, 5.0)
+    assert (event["previous"], event["level"], event["direction"]) == (0, 1, "down")
+    assert 1.0 <= t - start <= 1.5  # the EWMA crosses the budget a few frames in
+
+    # Back under the headroom, but not for long enough
+    event, t = feed(governor, 0.005, t, 2.5)
+    assert event is None and governor.level == 1
+    event, t = feed(governor, 0.005, t, 1.0)
+    assert (event["level"], event["direction"]) == (0, "up")
+    assert governor.stats()["downgrades"] == 1 and governor.stats()["upgrades"] == 1
+
+
+def test_failed_upgrades_double_the_wait_up_to_the_maximum():
+    governor = QualityGovernor(BUDGET, FakeDetector(), downgrade_after=1.0, upgrade_after=3.0,
+                               max_upgrade_after=10.0)
+    event, t = feed(governor, 0.020, 0.0, 5.0)
+    assert governor.level == 1
+
+    # Fast enough at level 1, too slow at level 0: every upgrade is followed by a downgrade
+    held, waits = [], []
+    for _ in range(4):
+        start = t
+        event, t = feed(governor, 0.005, t, 30.0)
+        assert event["direction"] == "up"
+        held.append(round(t - start, 1))
+        event, t = feed(governor, 0.020, t, 5.0)
+        assert event["direction"] == "down"
+        waits.append(governor.stats()["upgrade_wait"])
+    assert waits == [6.0, 10.0, 10.0, 10.0]
+    assert held == [3.1, 6.1, 10.1, 10.1]  # the first frame only starts the clock
+
+    # A downgrade long after the last upgrade resets the wait
+    event, t = feed(governor, 0.005, t, 30.0)
+    assert event["direction"] == "up"
+    event, t = feed(governor, 0.009, t, 20.0)
+    assert event is None
+    event, t = feed(governor, 0.020, t, 5.0)
+    assert event["direction"] == "down"
+    assert governor.stats()["upgrade_wait"] == 3.0
+
+
+def test_levels_cap_the_configured_values():
+    detector = FakeDetector(inference_scale=0.6, model_complexity=0, max_hands=2)
+    shapes = ShapeManager(640, 480)
+    shapes.set_ui_detail(1)
+    governor = QualityGovernor(BUDGET, detector, shapes)
+    t = 0.0
+    for level in range(1, 5):
+        event, t = feed(governor, 0.050, t, 5.0)
+        assert event["level"] == level
+
+    # level 1 caps inference_scale at 0.75: below the configured 0.6, nothing changes
+    changes = [e["knobs"] for e in governor.events]
+    assert changes[0] == {}
+    assert changes[1] == {}  # lite model and ui_detail 1 were configured already
+    assert changes[2] == {"inference_scale": (0.6, 0.5)}
+    assert changes[3] == {"max_hands": (2, 1), "ui_detail": (1, 0)}
+    assert detector.current == {"inference_scale": 0.5, "model_complexity": 0, "max_hands": 1}
+    assert shapes.ui_detail == 0
+    # Never above the configuration on the way back up
+    for level in range(3, -1, -1):
+        event, t = feed(governor, 0.001, t, 5.0)
+        assert event["level"] == level
+    assert detector.current == {"inference_scale": 0.6, "model_complexity": 0, "max_hands": 2}
+    assert shapes.ui_detail == 1
+
+
+def test_configurable_detector_walks_the_wrapper_chain():
+    detector = FakeDetector()
+    assert configurable_detector(detector) is detector
+    assert configurable_detector(Wrapper(Wrapper(detector))) is detector
+    assert configurable_detector(Wrapper(Wrapper(None))) is None
+    assert configurable_detector(None) is None
+
+    governor = QualityGovernor(BUDGET, Wrapper(object()))
+    assert governor.detector is None and governor.base == {}
+    event, _ = feed(governor, 0.050, 0.0, 5.0)
+    assert event["level"] == 1 and event["knobs"] == {}  # nothing to configure, still counted
@@ -0,0 +1,105 @@
+# tests/test_inference_scheduler.py
+import numpy as np
+import pytest
+
+from modules.hand_features import LEFT, NUM_LANDMARKS
+from modules.inference_scheduler import InferenceScheduler
+
+
+class Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class StubDetector:
+    """One hand at x = 0.2 + speed * t (frame widths per second), y = 0.5."""
+
+    def __init__(self, clock, speed=0.0):
+        self.clock = clock
+        self.speed = speed
+        self.calls = 0
+        self.norm_landmarks = np.zeros((0, NUM_LANDMARKS, 3), np.float32)
+        self.handedness = np.zeros(0, np.int8)
+
+    def find_hands(self, img, draw=True):
+        self.calls += 1
+        self.norm_landmarks = np.full((1, NUM_LANDMARKS, 3), 0.5)
+        self.norm_landmarks[..., 0] = 0.2 + self.speed * self.clock.t
+        self.handedness = np.array([LEFT], np.int8)
+        return img
+
+
+FRAME = np.zeros((48, 64, 3), np.uint8)
+
+
+def run(scheduler, clock, frames, dt):
+    """measured flag of each of `frames` frames, dt seconds apart."""
+    measured = []
+    for _ in range(frames):
+        clock.t += dt
+        scheduler.find_hands(FRAME, draw=False)
+        measured.append(scheduler.measured)
+    return measured
+
+
+def test_model_runs_every_n_frames():
+    clock = Clock()
+    detector = StubDetector(clock)
+    scheduler = InferenceScheduler(detector, every_n=3, clock=clock)
+    assert run(scheduler, clock, 9, 1 / 30) == [True, False, False] * 3
+    assert (detector.calls, scheduler.inferences, scheduler.predictions) == (3, 3, 6)
+    assert scheduler.every_n == 3  # fixed without a target_fps
+
+
+def test_skipped_frames_are_predicted_at_constant_velocity():
+    clock = Clock()
+    detector = StubDetector(clock, speed=0.3)
+    scheduler = InferenceScheduler(detector, every_n=2, clock=clock)
+    run(scheduler, clock, 3, 0.1)  # measured at 0.1 and 0.3: the velocity is known
+    clock.t += 0.1
+    scheduler.find_hands(FRAME, draw=False)
+    assert not scheduler.measured and detector.calls == 2
+    assert scheduler.norm_landmarks[0, :, 0] == pytest.approx(0.2 + 0.3 * clock.t)
+    assert scheduler.norm_landmarks[0, :, 1] == pytest.approx(0.5)
+    assert scheduler.handedness.tolist() == [LEFT]
+
+
+def test_fast_hands_run_the_model_every_frame():
+    clock = Clock()
+    scheduler = InferenceScheduler(StubDetector(clock, speed=3.0), every_n=4, motion_threshold=1.5,
+                                   clock=clock)
+    # The speed is only known after the second measurement; from then on nothing is skipped
+    assert run(scheduler, clock, 10, 1 / 30) == [True, False, False, False] + [True] * 6
+
+    slow = Clock()
+    scheduler = InferenceScheduler(StubDetector(slow, speed=1.0), every_n=4, motion_threshold=1.5,
+                                   clock=slow)
+    assert run(scheduler, slow, 8, 1 / 30) == [True, False, False, False] * 2
+
+
+def test_skip_rate_adapts_to_the_target_fps():
+    clock = Clock()
+    scheduler = InferenceScheduler(StubDetector(clock), every_n=1, target_fps=30, max_skip=4,
+                                   adjust_every=15, clock=clock)
+    # 20 FPS: one more skipped frame per adjustment, up to max_skip. The first frame only
+    # starts the clock.
+    run(scheduler, clock, 1, 1 / 20)
+    steps = []
+    for _ in range(5):
+        run(scheduler, clock, 15, 1 / 20)
+        steps.append(scheduler.every_n)
+    assert steps == [2, 3, 4, 4, 4]
+
+    # Within 95-115% of the target: left alone
+    run(scheduler, clock, 60, 1 / 31)
+    assert scheduler.every_n == 4
+
+    # 60 FPS: back down to every frame once the frame-time EWMA has caught up
+    steps = []
+    for _ in range(5):
+        run(scheduler, clock, 15, 1 / 60)
+        steps.append(scheduler.every_n)
+    assert steps == [3, 2, 1, 1, 1]
@@ -0,0 +1,99 @@
+# tests/test_inference_service.py
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from modules.hand_features import LEFT, NUM_LANDMARKS
+from modules.inference_service import InferenceService, ServiceDetector
+
+
+class FakeDetector:
+    """Finds one hand whose landmarks all sit at (image value / 255, 0.5); raises on value 255."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.shapes = []
+        self.threads = set()
+
+    def find_hands(self, img, draw=False):
+        self.shapes.append(img.shape[:2])
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        value = int(img[0, 0, 0])
+        if value == 255:
+            raise ValueError("unlucky frame")
+        self.norm_landmarks = np.full((1, NUM_LANDMARKS, 3), 0.5, np.float32)
+        self.norm_landmarks[..., 0] = value / 255
+        self.handedness = np.array([LEFT], np.int8)
+
+
+def image(value, w=64, h=48):
+    return np.full((h, w, 3), value, np.uint8)
+
+
+def test_each_request_gets_its_own_result():
+    service = InferenceService(FakeDetector, pool_size=2)
+    futures = [service.submit(image(v), session=v % 3) for v in range(40)]
+    for v, future in enumerate(futures):
+        landmarks, handedness = future.result(timeout=5)
+        assert landmarks[0, 0, 0] == pytest.approx(v / 255) and handedness.tolist() == [LEFT]
+    service.close()
+    assert service.stats()["requests"] == 40
+
+
+def test_requests_go_to_the_next_free_detector():
+    service = InferenceService(lambda: FakeDetector(delay=0.05), pool_size=2)
+    futures = [service.submit(image(v)) for v in range(4)]
+    for future in futures:
+        future.result(timeout=5)
+    assert all(len(d.shapes) == 2 for d in service.detectors)  # busy for 50 ms each: two at a time
+    service.close()
+
+
+def test_affinity_keeps_each_session_on_one_detector():
+    service = InferenceService(FakeDetector, pool_size=3, affinity=True)
+    for v in range(30):
+        service.infer(image(v), session=v % 3, timeout=5)
+    service.close()
+    assert [len(d.shapes) for d in service.detectors] == [10, 10, 10]
+    assert all(len(d.threads) == 1 for d in service.detectors)
+
+
+def test_errors_reach_the_caller_through_the_future():
+    service = InferenceService(FakeDetector, pool_size=1)
+    failed, fine = service.submit(image(255)), service.submit(image(14))
+    with pytest.raises(ValueError, match="unlucky"):
+        failed.result(timeout=5)
+    assert fine.result(timeout=5)[0][0, 0, 0] == pytest.approx(14 / 255)
+    service.close()
+
+
+def test_close_finishes_queued_requests_then_refuses_new_ones():
+    service = InferenceService(lambda: FakeDetector(delay=0.005), pool_size=2)
+    futures = [service.submit(image(v)) for v in range(20)]
+    service.close()
+    assert all(f.done() and f.exception() is None for f in futures)
+    with pytest.raises(RuntimeError):
+        service.submit(image(1)).result(timeout=1)
+
+
+def test_service_detector_applies_the_session_scale_and_roi():
+    service = InferenceService(FakeDetector, pool_size=1)
+    detector = ServiceDetector(service, session=0, timeout=5, inference_scale=0.5, roi_tracking=True)
+    frame = image(128, 640, 480)
+    detector.find_hands(frame)
+    assert service.detectors[0].shapes[-1] == (240, 320)  # full frame, downscaled
+    landmarks, handedness = detector.find_arrays(frame)
+    assert landmarks[0, 0, :2].tolist() == [321, 240]  # int(128 / 255 * 640)
+
+    # The hand is a single point: its padded box is too small to crop, so the full frame is used;
+    # spread it out and the next frame is cropped around it
+    detector._input_landmarks = detector._input_landmarks.copy()
+    detector._input_landmarks[0, :, :2] = np.linspace((0.3, 0.3), (0.5, 0.6), NUM_LANDMARKS)
+    detector.find_hands(frame)
+    assert detector.roi is not None
+    x0, y0, x1, y1 = detector.roi
+    assert service.detectors[0].shapes[-1] == (round((y1 - y0) * 0.5), round((x1 - x0) * 0.5))
+    service.close()
@@ -0,0 +1,44 @@
+# tests/test_pipeline.py
+import threading
+import time
+
+from modules.pipeline import LatestQueue, Pipeline
+
+
+def test_latest_queue_drops_oldest():
+    dropped = []
+    q = LatestQueue(maxsize=2, on_drop=dropped.append)
+    for item in range(5):
+        q.put(item)
+    assert q.dropped == 3 and dropped == [0, 1, 2]
+    assert q.get() == 3 and q.get() == 4
+    assert q.get(timeout=0.01) is None
+
+
+def test_latest_queue_close_wakes_getter():
+    q = LatestQueue()
+    got = []
+    t = threading.Thread(target=lambda: got.append(q.get()))
+    t.start()
+    q.close()
+    t.join(timeout=2)
+    assert got == [None]
+    q.put(1)
+    assert q.drain() == [1] and q.qsize() == 0
+
+
+def test_report_shows_queue_depths_seen_while_running():
+    images = iter(range(100))
+
+    def capture():
+        time.sleep(0.001)
+        return next(images, None)
+
+    def render(image, result):
+        time.sleep(0.005)  # slower than capture and inference: results back up
+
+    report = Pipeline(capture, lambda image: image, render).run()
+    results = report["queues"]["results"]
+    assert results["dropped"] > 0 and results["depth_max"] == 1
+    assert 0 < results["depth_mean"] <= 1
+    assert "queue.results" not in report["stages"]  # a gauge, not a timing
@@ -0,0 +1,65 @@
+# tests/test_preprocess.py
+import threading
+import time
+
+import numpy as np
+
+from modules.pipeline import Pipeline
+from modules.preprocess import FramePreprocessor
+
+
+def test_preprocessor_lends_buffers_until_released():
+    pre = FramePreprocessor(slots=2)
+    frame = np.zeros((4, 6, 3), np.uint8)
+    a, b = pre.process(frame), pre.process(frame)
+    assert a[0] is not b[0]
+
+    waiting = threading.Thread(target=pre.process, args=(frame,))
+    waiting.start()
+    waiting.join(timeout=0.1)
+    assert waiting.is_alive()  # no free buffer set
+    pre.release(a)
+    waiting.join(timeout=2)
+    assert not waiting.is_alive()
+
+
+def test_preprocessor_single_slot_is_reused():
+    pre = FramePreprocessor()
+    frame = np.zeros((4, 6, 3), np.uint8)
+    assert pre.process(frame)[0] is pre.process(frame)[0]
+
+
+def test_pipeline_frames_are_not_overwritten_in_flight():
+    """Unthrottled capture with slower inference and render: every frame is rendered intact."""
+    pre = FramePreprocessor(slots=6)
+    released = []
+    count = {"n": 0}
+
+    def capture():
+        count["n"] += 1
+        if count["n"] > 1500:
+            return None
+        time.sleep(0.0002)
+        return pre.process(np.full((24, 32, 3), count["n"] % 256, np.uint8))
+
+    def infer(frame):
+        value = int(frame[0][0, 0, 0])
+        time.sleep(0.002)
+        return value
+
+    corrupted = []
+
+    def render(frame, value):
+        time.sleep(0.001)
+        if not (frame[0] == value).all():
+            corrupted.append(value)
+
+    def release(frame):
+        released.append(frame)
+        pre.release(frame)
+
+    report = Pipeline(capture, infer, render, release=release).run()
+    assert report["frames"] > 0 and report["queues"]["frames"]["dropped"] > 0
+    assert corrupted == []
+    assert len(released) == 1500  # once per captured frame
+    assert len(pre._free) == pre.slots  # every buffer set came back
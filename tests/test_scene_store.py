@@ -0,0 +1,125 @@
+# tests/test_scene_store.py
+import os
+import random
+
+import pytest
+
+from modules.scene_store import SceneStore, _generations, _journal_path
+from modules.shape_utils import ShapeManager
+
+
+WIDTH, HEIGHT = 1280, 720
+
+
+def scene(manager):
+    """Comparable description of a ShapeManager's shapes, in draw order."""
+    out = []
+    for s in manager.shapes:
+        if s["type"] == "draw":
+            out.append((s["id"], "draw", tuple(s["color"]), [tuple(p) for p in s["points"]]))
+        else:
+            out.append((s["id"], s["type"], int(s["x"]), int(s["y"]), int(s["size"]), tuple(s["color"])))
+    return out
+
+
+def restored(path):
+    manager = ShapeManager(WIDTH, HEIGHT)
+    SceneStore(path).restore(manager)
+    return manager
+
+
+@pytest.fixture
+def edited(tmp_path):
+    """A journaled scene with every kind of operation, including empty strokes."""
+    random.seed(0)
+    manager = ShapeManager(WIDTH, HEIGHT)
+    store = SceneStore(str(tmp_path))
+    store.attach(manager)
+    for shape_type in ("square", "circle", "triangle", "star", "pentagon", "hexagon"):
+        manager.add_shape(shape_type)
+    manager.add_stroke([])
+    stroke = manager.add_stroke([(10, 20), (30, 40), (50, 10)])
+    pos = (0, 0)
+    for step in range(1, 30):
+        pos = manager.move_shape(manager.shapes[0], step, step, pos)
+    manager.move_shape(stroke, 100, 50, (0, 0))
+    manager.resize_shape(manager.shapes[1], 150)
+    manager.shapes[2]["x"], manager.shapes[2]["y"] = manager.bin["x"] + 10, manager.bin["y"] + 10
+    assert manager.remove_shape_if_in_bin(manager.shapes[2])
+    manager.add_stroke([])  # empty last stroke
+    return manager, store
+
+
+def test_round_trip_through_snapshot(edited, tmp_path):
+    manager, store = edited
+    store.close()
+    assert store.stats()["compactions"] == 1
+    again = restored(str(tmp_path))
+    assert scene(again) == scene(manager)
+    assert [s["points"].bbox() for s in again.shapes if s["type"] == "draw"] == \
+           [s["points"].bbox() for s in manager.shapes if s["type"] == "draw"]
+
+    # The restored scene is indexed and keeps getting new ids
+    centers = [(s["x"] + s["size"] // 2, s["y"] + s["size"] // 2) for s in manager.shapes if s["type"] != "draw"]
+    for x, y in centers + [s["points"][0] for s in manager.shapes if len(s.get("points", ()))]:
+        hit, restored_hit = manager.select_shape(x, y), again.select_shape(x, y)
+        assert (hit and hit["id"]) == (restored_hit and restored_hit["id"])
+    again.add_shape("circle")
+    assert again.shapes[-1]["id"] > max(s["id"] for s in manager.shapes)
+
+
+def test_changes_after_restore_are_journaled(edited, tmp_path):
+    manager, store = edited
+    store.close()
+    again = restored(str(tmp_path))
+    store = SceneStore(str(tmp_path))
+    store.attach(again)
+    again.move_shape(again.shapes[0], 300, 300, (200, 200))
+    again.add_stroke([(1, 1), (2, 2)])
+    store.close()
+    assert scene(restored(str(tmp_path))) == scene(again)
+
+
+def test_torn_journal_tail_is_ignored(edited, tmp_path):
+    manager, store = edited
+    store.close()
+    journal = _journal_path(str(tmp_path), _generations(str(tmp_path), "journal-")[-1])
+    with open(journal, "ab") as f:
+        f.write(b"\x02\x01\x00")  # a crash in the middle of a record
+
+    again = restored(str(tmp_path))
+    assert scene(again) == scene(manager)
+    store = SceneStore(str(tmp_path))
+    store.attach(again)
+    again.add_shape("square")
+    store.close()
+    assert scene(restored(str(tmp_path))) == scene(again)
+
+
+def test_old_generations_are_removed(edited, tmp_path):
+    _, store = edited
+    store.compact()
+    store.close()
+    names = sorted(os.listdir(tmp_path))
+    assert len([n for n in names if n.startswith("snapshot-")]) == 1
+    assert len([n for n in names if n.startswith("journal-")]) == 1
+
+
+def test_writer_failure_is_logged_once_and_stops_journaling(tmp_path, capsys):
+    manager = ShapeManager(WIDTH, HEIGHT)
+    store = SceneStore(str(tmp_path))
+    store.attach(manager)
+
+    def fail(ops):
+        raise OSError("disk full")
+    store._write = fail
+    manager.add_stroke([(1, 1)])
+    store._thread.join(timeout=5)
+
+    manager.add_stroke([(2, 2)])  # the frame loop is not interrupted
+    manager.add_stroke([(3, 3)])
+    assert manager.observer is None and len(manager.shapes) == 3
+    assert capsys.readouterr().err.count("disk full") == 1
+    assert "disk full" in store.stats()["error"]
+    with pytest.raises(OSError):
+        store.close()
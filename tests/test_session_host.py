@@ -0,0 +1,27 @@
+# tests/test_session_host.py
+import numpy as np
+
+from modules.hand_features import LEFT, NUM_LANDMARKS
+from modules.landmark_log import LandmarkLogWriter
+from modules.session_host import aggregate, guarded_session
+
+
+def write_log(path, frames=20):
+    writer = LandmarkLogWriter(str(path))
+    for i in range(frames):
+        writer.write(np.full((1, NUM_LANDMARKS, 3), 0.5, np.float32), np.array([LEFT], np.int8), i / 30)
+    writer.close()
+    return str(path)
+
+
+def test_a_failing_session_is_reported_not_raised(tmp_path, capsys):
+    log = write_log(tmp_path / "hands.vtlm")
+    good = guarded_session(0, {"replay_landmarks": log})
+    bad = guarded_session(1, {"replay_landmarks": log, "source": str(tmp_path / "missing.mp4")})
+    assert good["frames"] == 20 and "error" not in good
+    assert bad["frames"] == 0 and "FileNotFoundError" in bad["error"]
+    assert "Session 1 failed" in capsys.readouterr().err
+
+    totals = aggregate([good, bad], wall_seconds=1.0)
+    assert totals["sessions"] == 2 and totals["failed"] == 1 and totals["frames"] == 20
+    assert totals["min_fps"] == good["fps"]  # the failed session is not the slowest one
@@ -0,0 +1,120 @@
+# tests/test_shape_3d.py
+import itertools
+import time
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from modules.shape_3d import SHAPE_SIZE, Renderer3D, Shape3DManager, model_matrices
+
+
+def fake_gl():
+    """gl, glu and display mocks; glGenLists hands out ids 1, 2, 3, ..."""
+    gl, glu, display = mock.MagicMock(), mock.MagicMock(), mock.MagicMock()
+    gl.glGenLists.side_effect = itertools.count(1)
+    return gl, glu, display
+
+
+@pytest.fixture
+def manager():
+    manager = Shape3DManager(*fake_gl())
+    manager.init_gl()
+    return manager
+
+
+def reference_matrix(pos, scale, rotation):
+    """T * S * Rx * Ry * Rz from separate 4x4 matrices, in float64."""
+    def rotation_matrix(axis, degrees):
+        c, s = np.cos(np.radians(degrees)), np.sin(np.radians(degrees))
+        i, j = [(1, 2), (2, 0), (0, 1)][axis]
+        m = np.eye(4)
+        m[i, i], m[i, j], m[j, i], m[j, j] = c, -s, s, c
+        return m
+    t = np.eye(4)
+    t[:3, 3] = pos
+    return (t @ np.diag([scale, scale, scale, 1]) @ rotation_matrix(0, rotation[0])
+            @ rotation_matrix(1, rotation[1]) @ rotation_matrix(2, rotation[2]))
+
+
+def test_one_display_list_per_shape_type(manager):
+    gl, glu = manager.gl, manager.glu
+    assert sorted(manager.lists) == ["cube", "pyramid", "sphere"]
+    assert sorted(manager.lists.values()) == [1, 2, 3]
+    assert [c.args[0] for c in gl.glNewList.call_args_list] == [1, 2, 3]
+    assert gl.glEndList.call_count == 3
+    glu.gluNewQuadric.assert_called_once()
+    glu.gluSphere.assert_called_once()
+
+    manager.close()
+    assert sorted(c.args[0] for c in gl.glDeleteLists.call_args_list) == [1, 2, 3]
+    glu.gluDeleteQuadric.assert_called_once()
+
+
+def test_one_call_list_per_shape_and_no_geometry_per_frame(manager):
+    gl = manager.gl
+    for shape_type in ("cube", "sphere", "pyramid", "cube", "cube", "pyramid"):
+        manager.create_shape(shape_type)
+    gl.reset_mock()
+
+    manager.draw_shapes(manager.shapes)
+    called = [c.args[0] for c in gl.glCallList.call_args_list]
+    assert sorted(called) == sorted(manager.lists[s["type"]] for s in manager.shapes)
+    assert gl.glLoadMatrixf.call_count == len(manager.shapes)
+    gl.glBegin.assert_not_called()
+    gl.glVertex3fv.assert_not_called()
+
+
+def test_loaded_matrices_are_the_shape_transforms(manager):
+    gl = manager.gl
+    shape = manager.create_shape("sphere")
+    shape["pos"], shape["scale"], shape["rotation"] = [0.5, -0.25, 1.0], 1.5, [30, 45, 60]
+    manager.draw_shapes(manager.shapes)
+    loaded = gl.glLoadMatrixf.call_args.args[0]
+    # Column-major, with the shapes' common half-extent folded into the scale
+    expected = reference_matrix(shape["pos"], 1.5 * SHAPE_SIZE, shape["rotation"])
+    assert np.allclose(loaded.reshape(4, 4).T, expected, atol=1e-6)
+
+
+def test_model_matrices_match_translate_scale_rotate():
+    rng = np.random.default_rng(0)
+    pos = rng.uniform(-2, 2, (50, 3))
+    scale = rng.uniform(0.2, 3.0, 50)
+    rotation = rng.uniform(-360, 360, (50, 3))
+    matrices = model_matrices(pos, scale, rotation)
+    assert matrices.shape == (50, 4, 4) and matrices.dtype == np.float32
+    for m, p, s, r in zip(matrices, pos, scale, rotation):
+        assert np.allclose(m, reference_matrix(p, s, r), atol=1e-5)
+
+
+def run_renderer(fps, seconds, frame_time=0.0):
+    manager = Shape3DManager(*fake_gl())
+    manager.display.event.get.return_value = []
+    manager.display.display.flip.side_effect = lambda: time.sleep(frame_time)
+    renderer = Renderer3D(manager, fps=fps)
+    renderer.start()
+    time.sleep(seconds)
+    renderer.stop()
+    return renderer
+
+
+def test_renderer_paces_frames_to_the_target_rate():
+    renderer = run_renderer(fps=100, seconds=0.3)
+    assert 20 <= renderer.frames <= 32
+    assert renderer.late_frames <= 3
+    assert not renderer.running
+
+
+def test_renderer_counts_frames_that_miss_their_deadline():
+    renderer = run_renderer(fps=100, seconds=0.3, frame_time=0.015)
+    assert 10 <= renderer.frames <= 21
+    assert renderer.late_frames == renderer.frames
+
+
+def test_window_failure_is_raised_by_start():
+    manager = Shape3DManager(*fake_gl())
+    manager.display.display.set_mode.side_effect = RuntimeError("no display")
+    renderer = Renderer3D(manager)
+    with pytest.raises(RuntimeError, match="no display"):
+        renderer.start()
+    assert not renderer.running and renderer.frames == 0
@@ -0,0 +1,145 @@
+# tests/test_shape_utils.py
+import random
+
+import numpy as np
+import pytest
+
+from modules.shape_utils import ShapeManager
+from modules.stroke import Stroke
+
+
+WIDTH, HEIGHT = 1280, 720
+
+
+def square(shape_id, x, y, size, shape_type="square", color=(0, 200, 0)):
+    return {"id": shape_id, "type": shape_type, "x": x, "y": y, "size": size, "color": color}
+
+
+@pytest.fixture
+def stacked():
+    """Overlapping shapes of every kind, one of them reaching under the buttons."""
+    manager = ShapeManager(WIDTH, HEIGHT)
+    manager.load_shapes([
+        square(1, 300, 300, 120, color=(200, 0, 0)),
+        square(2, 350, 320, 120, "circle", (0, 200, 0)),
+        square(3, 320, 260, 140, "star", (0, 0, 200)),
+        {"id": 4, "type": "draw", "points": Stroke([(280, 330), (500, 360), (420, 60)]), "color": (200, 200, 0)},
+        square(5, 380, 90, 100, "hexagon", (200, 0, 200)),
+        square(6, 800, 400, 100, "triangle", (0, 200, 200)),
+    ])
+    return manager
+
+
+def render(manager):
+    frame = np.full((HEIGHT, WIDTH, 3), 40, np.uint8)
+    return manager.draw_ui(frame)
+
+
+@pytest.mark.parametrize("held_ids", [(1,), (2,), (4,), (5,), (1, 3)])
+def test_held_shapes_keep_their_place_in_the_stack(stacked, held_ids):
+    manager = stacked
+    render(manager)
+    held = [manager._by_id[i] for i in held_ids]
+    for step, (px, py) in enumerate([(0, 0), (30, 20), (-80, -250), (60, -10)]):
+        manager.selected_left, manager.selected_right = held[0], held[-1]
+        for shape in held:
+            manager.move_shape(shape, px, py, (0, 0))
+        live = render(manager)
+        manager.selected_left = manager.selected_right = None
+        baked = render(manager)
+        assert (live == baked).all(), f"step {step}: {(live != baked).any(axis=2).sum()} px differ"
+
+
+def test_buttons_stay_on_top_of_a_held_shape(stacked):
+    manager = stacked
+    empty = render(ShapeManager(WIDTH, HEIGHT))
+    manager.selected_left = shape = manager._by_id[3]
+    manager.move_shape(shape, 0, -300, (0, 0))  # clamped to the top edge, under the buttons
+    frame = render(manager)
+    ui = (empty != 40).any(axis=2)  # buttons and bin over the plain background
+    assert (frame[ui] == empty[ui]).all()
+    assert (frame[~ui] != 40).any()  # the star is there, around the buttons
+
+
+def linear_select(shapes):
+    """
+    select_shape as it was before the spatial index: a reverse scan over every shape. Stroke
+    boxes come from their points, worked out once for the current state of the shapes.
+    """
+    boxes = {}
+    for shape in shapes:
+        if shape["type"] == "draw" and len(shape["points"]):
+            pts = shape["points"].points
+            boxes[id(shape)] = (pts[:, 0].min(), pts[:, 1].min(), pts[:, 0].max(), pts[:, 1].max())
+
+    def select(px, py):
+        for shape in reversed(shapes):
+            if shape["type"] in ["square", "pentagon", "hexagon"]:
+                if shape["x"] <= px <= shape["x"] + shape["size"] and shape["y"] <= py <= shape["y"] + shape["size"]:
+                    return shape
+            elif shape["type"] in ["circle", "triangle", "star"]:
+                cx, cy = shape["x"] + shape["size"] // 2, shape["y"] + shape["size"] // 2
+                if (px - cx)**2 + (py - cy)**2 <= (shape["size"] // 2)**2:
+                    return shape
+            elif id(shape) in boxes:
+                x_min, y_min, x_max, y_max = boxes[id(shape)]
+                if x_min <= px <= x_max and y_min <= py <= y_max:
+                    return shape
+        return None
+    return select
+
+
+def random_edit(manager, rng):
+    shapes = manager.shapes
+    action = rng.choice(["add", "add", "stroke", "move", "move", "resize", "bin"] if shapes else ["add", "stroke"])
+    if action == "add":
+        manager.add_shape(rng.choice(["square", "circle", "triangle", "star", "pentagon", "hexagon"]))
+    elif action == "stroke":
+        # Anywhere, including off screen and at negative coordinates; sometimes empty
+        n = rng.choice([0, 1, 2, 5, 20])
+        x, y = rng.randint(-300, WIDTH + 300), rng.randint(-300, HEIGHT + 300)
+        manager.add_stroke([(x + rng.randint(-150, 150), y + rng.randint(-150, 150)) for _ in range(n)])
+    elif action == "move":
+        shape = rng.choice(shapes)
+        x, y = rng.randint(0, WIDTH), rng.randint(0, HEIGHT)
+        manager.move_shape(shape, x + rng.randint(-700, 700), y + rng.randint(-700, 700), (x, y))
+    elif action == "resize":
+        shape = rng.choice([s for s in shapes if s["type"] != "draw"] or shapes)
+        if shape["type"] != "draw":
+            manager.resize_shape(shape, rng.randint(10, 300))
+    else:
+        shape = rng.choice(shapes)
+        if shape["type"] != "draw":
+            shape["x"], shape["y"] = manager.bin["x"] + 10, manager.bin["y"] + 10
+            manager._reindex(shape)
+        manager.remove_shape_if_in_bin(shape)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_select_shape_matches_a_linear_scan(seed):
+    rng = random.Random(seed)
+    random.seed(seed)  # add_shape's positions, sizes and colors
+    manager = ShapeManager(WIDTH, HEIGHT)
+    for step in range(400):
+        random_edit(manager, rng)
+        if step == 200:
+            # Continue on a reloaded scene: its index is built by bulk_insert
+            reloaded = ShapeManager(WIDTH, HEIGHT)
+            reloaded.load_shapes(manager.shapes)
+            manager = reloaded
+        if step % 5:
+            continue
+        expected = linear_select(manager.shapes)
+        if step % 20 == 0:
+            for _ in range(200):
+                px, py = rng.randint(-400, WIDTH + 400), rng.randint(-400, HEIGHT + 400)
+                assert manager.select_shape(px, py) is expected(px, py), (step, px, py)
+        else:
+            # Probe the edges and centers of shapes, where off-by-one errors show
+            for shape in rng.sample(manager.shapes, min(10, len(manager.shapes))):
+                bbox = manager.shape_bbox(shape)
+                if bbox is None:
+                    continue
+                x0, y0, x1, y1 = bbox
+                for px, py in ((x0, y0), (x1, y1), (x0 - 1, y0), (x1 + 1, y1), ((x0 + x1) // 2, (y0 + y1) // 2)):
+                    assert manager.select_shape(px, py) is expected(px, py), (step, px, py)
@@ -0,0 +1,109 @@
+# tests/test_shm_bus.py
+import os
+import uuid
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from modules.gestures import GestureEvent
+from modules.hand_features import LEFT, NUM_LANDMARKS, RIGHT
+from modules.shm_bus import LandmarkPublisher, LandmarkSubscriber
+
+
+@pytest.fixture
+def name():
+    """A block name of its own, so parallel runs and a live bus are left alone."""
+    return f"vt_test_{os.getpid()}_{uuid.uuid4().hex[:8]}"
+
+
+def hands(n, value):
+    landmarks = np.full((n, NUM_LANDMARKS, 3), value, np.float32)
+    return landmarks, np.array([LEFT, RIGHT][:n], np.int8)
+
+
+def test_publish_poll_and_latest(name):
+    with LandmarkPublisher(name, slots=8) as publisher, LandmarkSubscriber(name) as bus:
+        assert bus.latest() is None and bus.poll() == []
+        for i in range(3):
+            publisher.publish(*hands(i % 3, i), measured=i != 1, width=640, height=480, timestamp=10.0 + i)
+
+        frames = bus.poll()
+        assert [f.seq for f in frames] == [1, 2, 3]
+        assert [f.measured for f in frames] == [True, False, True]
+        assert [len(f.handedness) for f in frames] == [0, 1, 2]
+        assert frames[2].handedness.tolist() == [LEFT, RIGHT]
+        assert frames[2].landmarks.shape == (2, NUM_LANDMARKS, 3) and (frames[2].landmarks == 2).all()
+        assert (frames[1].timestamp, frames[1].width, frames[1].height) == (11.0, 640, 480)
+        assert bus.poll() == []
+
+        # latest() does not move poll() along
+        publisher.publish(*hands(1, 7))
+        assert bus.latest().seq == 4
+        assert [f.seq for f in bus.poll()] == [4]
+
+        # A late subscriber starts after the frames already published
+        with LandmarkSubscriber(name) as late:
+            assert late.last_seq == 4 and late.poll() == []
+            assert late.latest().seq == 4
+
+
+def test_overrun_and_torn_frames_are_counted_as_missed(name):
+    with LandmarkPublisher(name, slots=8) as publisher, LandmarkSubscriber(name) as bus:
+        for i in range(20):
+            publisher.publish(*hands(1, i))
+        frames = bus.poll()
+        # Only the last `slots` frames are still in the ring
+        assert [f.seq for f in frames] == list(range(13, 21))
+        assert bus.missed == 12
+
+        publisher.publish(*hands(1, 0))
+        publisher.publish(*hands(1, 0))
+        publisher._locks[22 % 8] = 2 * 22 - 1  # frame 22 caught mid-write
+        assert [f.seq for f in bus.poll()] == [21]
+        assert bus.missed == 13
+        assert bus.read(22) is None and bus.read(5) is None
+
+
+def test_events_round_trip(name):
+    events = [
+        GestureEvent("pinch_start", "right", (10, 20), 1.5),
+        GestureEvent("click", "right", (10, 20), 1.5),
+        GestureEvent("pinch_move", "left", (-3, 700), 1.6),
+        GestureEvent("zoom_start", None, ((100, 200), (300, 400)), 1.7, 1.0),
+        GestureEvent("zoom", None, ((90, 200), (310, 400)), 1.8, 1.25),
+        GestureEvent("zoom_end", None, None, 1.9),
+    ]
+    with LandmarkPublisher(name, max_events=4) as publisher, LandmarkSubscriber(name) as bus:
+        publisher.publish(*hands(2, 0), events=events[:3])
+        publisher.publish(*hands(2, 0), events=events[3:])
+        # Over max_events: the rest are dropped and counted
+        publisher.publish(*hands(2, 0), events=events)
+        frames = bus.poll()
+
+    received = frames[0].events + frames[1].events
+    assert [(e.type, e.hand, e.pos, e.t, e.value) for e in received] == \
+        [(e.type, e.hand, e.pos, e.t, e.value) for e in events]
+    assert received[-1].pos is None and received[0].value is None  # NaN on the wire
+    assert [e.type for e in frames[2].events] == [e.type for e in events[:4]]
+    assert publisher.dropped_events == 2
+
+
+def test_closing_a_subscriber_leaves_the_block(name):
+    with LandmarkPublisher(name) as publisher:
+        publisher.publish(*hands(1, 0))
+        LandmarkSubscriber(name).close()
+        with LandmarkSubscriber(name) as bus:
+            assert bus.latest().seq == 1
+    with pytest.raises(FileNotFoundError):
+        LandmarkSubscriber(name)
+
+
+def test_rejects_a_block_that_is_not_a_bus(name):
+    block = shared_memory.SharedMemory(name=name, create=True, size=4096)
+    try:
+        with pytest.raises(ValueError, match="not a hand bus"):
+            LandmarkSubscriber(name)
+    finally:
+        block.close()
+        block.unlink()
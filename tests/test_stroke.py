@@ -0,0 +1,43 @@
+# tests/test_stroke.py
+import numpy as np
+
+from modules.stroke import StrokeBuilder
+
+
+FPS = 30
+
+
+def build(points, **options):
+    builder = StrokeBuilder(**options)
+    for i, point in enumerate(points):
+        builder.add(point, t=i / FPS)
+    return builder.finish().points
+
+
+def distance_to_polyline(points, polyline):
+    """Distance of each point to the nearest segment of the polyline."""
+    a, b = polyline[:-1].astype(np.float64), polyline[1:].astype(np.float64)
+    ab = b - a
+    length = np.maximum((ab ** 2).sum(axis=1), 1e-9)
+    p = points[:, None].astype(np.float64)
+    t = np.clip(((p - a) * ab).sum(axis=2) / length, 0, 1)
+    return np.hypot(*(p - (a + t[..., None] * ab)).transpose(2, 0, 1)).min(axis=1)
+
+
+def test_jittery_stroke_is_reduced_tenfold_close_to_the_drawn_path():
+    # A doodle drawn at 60 px/s with 1 px fingertip jitter
+    t = np.arange(3000) * 2 / 160
+    path = np.stack([640 + 300 * np.cos(t) + 80 * np.cos(3.1 * t), 360 + 200 * np.sin(1.3 * t)], axis=1)
+    jittery = path + np.random.default_rng(0).normal(0, 1.0, path.shape)
+
+    stroke = build(jittery)
+    assert len(stroke) * 10 <= len(jittery)
+    assert distance_to_polyline(path, stroke).max() <= 4   # nothing of the path is cut off
+    assert distance_to_polyline(stroke, path).max() <= 4   # and nothing is added
+
+
+def test_pinch_held_still_keeps_a_few_points():
+    jittery = (640, 360) + np.random.default_rng(0).normal(0, 2.0, (1000, 2))
+    assert len(build(jittery)) <= 50
+    # Unsmoothed, the same jitter is kept as it would be drawn
+    assert len(build(jittery, smoothing=False)) > 100